@@ -6,14 +6,19 @@ import re
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from qwen_agent.agents import Assistant
-from qwen_agent.tools import ImageGen
-from config import get_llm_config, configure_environment
+from config import get_llm_config, configure_environment, is_llm_cache_enabled, get_agent_tier
+from agents.llm_cache import LLMCache, run_agent
 
 class ImageAgent:
-    def __init__(self):
+    def __init__(self, use_cache: bool = None, model_tier: str = None):
         """
         Initializes the ImageAgent.
         This agent is responsible for creating a cover image for the blog post.
+
+        Args:
+            use_cache (bool): Whether to use the shared LLM response cache.
+                Defaults to the LLM_CACHE_* environment settings.
+            model_tier (str): "fast" or "max". Defaults to the 'image' entry of AGENT_MODELS.
         """
         # Load environment variables from .env file
         configure_environment()
@@ -27,7 +32,11 @@ class ImageAgent:
         )
 
         # Get the LLM configuration
-        llm_config = get_llm_config()
+        self.tier = model_tier or get_agent_tier('image')
+        llm_config = get_llm_config('image', self.tier)
+
+        # Imported here because qwen_agent.tools loads every built-in tool
+        from qwen_agent.tools import ImageGen
 
         # THE FIX: Initialize ImageGen without arguments. It automatically finds the
         # DASHSCOPE_API_KEY from the environment, which we loaded above.
@@ -40,12 +49,17 @@ class ImageAgent:
             function_list=tools
         )
 
-    def run(self, topic: str):
+        # Responses are cached under a hash of this agent's model, prompt and tools
+        self.use_cache = is_llm_cache_enabled('image') if use_cache is None else use_cache
+        self.cache_scope = LLMCache.make_scope(llm_config, system_prompt, tools=['image_gen'])
+
+    def run(self, topic: str, bypass_cache: bool = False):
         """
         Runs the agent to generate an image for the given topic.
 
         Args:
             topic (str): The topic for the blog post.
+            bypass_cache (bool): Skip the LLM cache lookup and always call the model.
 
         Returns:
             str: The URL of the generated image, or None if an error occurs.
@@ -55,9 +69,8 @@ class ImageAgent:
         # We explicitly ask the agent to generate the image
         messages = [{"role": "user", "content": f"Generate a blog post cover image about: {topic}"}]
         
-        response = []
-        for res in self.agent.run(messages=messages):
-            response.extend(res)
+        response = run_agent(self.agent, messages, self.cache_scope,
+                             use_cache=self.use_cache, bypass_cache=bypass_cache, agent_name="image")
 
         # The tool returns the image as a markdown string.
         if response and isinstance(response[-1], dict) and 'content' in response[-1]:
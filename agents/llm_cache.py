@@ -0,0 +1,240 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import metrics
+from ratelimit import get_upstream
+from token_utils import estimate_tokens, estimate_message_tokens
+from tools.search_cache import SearchCache
+from agents.streaming import StreamConsumer, message_text
+from config import get_llm_cache_config
+
+
+class MemoryBackend:
+    """
+    An in-process LRU store. Fast, but forgotten when the process exits.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DiskBackend(SearchCache):
+    """
+    A persistent store shared between runs and processes. It reuses the
+    SQLite TTL/LRU store behind the search cache, which works for any
+    JSON-serializable value.
+    """
+
+
+class LLMCache:
+    """
+    A content-addressed cache for agent responses.
+
+    The key is a hash of everything that determines an agent's answer: the model
+    and server, the system prompt, the names of the tools it may call and the full
+    message list (including any tool results already in the conversation). The
+    cached value is the final message list the agent produced.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_scope(llm_config: dict, system_prompt: str, tools=()):
+        """
+        Hashes the fixed part of an agent's configuration. Agents compute this once
+        and pass it to `run_agent` with every call.
+        """
+        scope = {
+            'model': llm_config.get('model'),
+            'model_server': llm_config.get('model_server'),
+            'system_prompt': system_prompt,
+            'tools': sorted(tools),
+        }
+        # Sampling settings change the answer; the request timeout does not
+        generate_cfg = {k: v for k, v in llm_config.get('generate_cfg', {}).items() if k != 'timeout'}
+        if generate_cfg:
+            scope['generate_cfg'] = generate_cfg
+        payload = json.dumps(scope, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(scope: str, messages: list):
+        payload = json.dumps({'scope': scope, 'messages': messages}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value):
+        self.backend.set(key, value)
+
+    def delete(self, key: str):
+        self.backend.delete(key)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Returns the process-wide LLM cache, built from the environment on first use.
+
+    Returns:
+        LLMCache: The shared cache, or None if caching is disabled.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            cache_config = get_llm_cache_config()
+            if cache_config['backend'] == 'memory':
+                _cache = LLMCache(MemoryBackend(max_entries=cache_config['max_entries']))
+            elif cache_config['backend'] == 'disk':
+                _cache = LLMCache(DiskBackend(
+                    cache_config['path'],
+                    ttl_seconds=cache_config['ttl_seconds'],
+                    max_entries=cache_config['max_entries'],
+                ))
+            else:
+                _cache = False
+    return _cache or None
+
+
+def collect_response(assistant, messages: list, on_delta=None):
+    """
+    Runs an Assistant to completion and returns its final message list.
+    Only the latest streamed snapshot is kept; new text is passed to `on_delta`.
+    """
+    consumer = StreamConsumer(assistant.run(messages=messages))
+    if on_delta is None:
+        return consumer.consume()
+
+    for delta in consumer.deltas():
+        on_delta(delta)
+    return consumer.messages
+
+
+def call_model(assistant, messages: list, on_delta=None):
+    """
+    Runs an Assistant within the shared rate limits of the model server, retrying
+    throttled and transient failures (see ratelimit.Upstream).
+
+    A request is only retried while none of its answer has been streamed yet,
+    so a listener never receives the same text twice.
+    """
+    upstream = get_upstream("llm")
+    streamed = []
+
+    def forward(delta):
+        streamed.append(True)
+        on_delta(delta)
+
+    prompt_tokens = estimate_tokens(getattr(assistant, 'system_message', '') or '') + estimate_message_tokens(messages)
+    response = upstream.call(collect_response, assistant, messages, forward if on_delta is not None else None,
+                             tokens=prompt_tokens, can_retry=lambda: not streamed)
+    # Later requests of a tool-calling run and the answer itself only count once known
+    _, input_tokens, output_tokens = usage_estimate(assistant, messages, response)
+    upstream.tokens.debit(max(0, input_tokens - prompt_tokens) + output_tokens)
+    return response
+
+
+def usage_estimate(assistant, messages: list, response: list):
+    """
+    Estimates the LLM requests and tokens behind a response. Every assistant
+    message in the response is one request, whose prompt is the system prompt,
+    the conversation and the response so far (e.g. an earlier tool result).
+
+    Returns:
+        tuple: (llm_calls, input_tokens, output_tokens)
+    """
+    base = estimate_tokens(getattr(assistant, 'system_message', '') or '') + estimate_message_tokens(messages)
+    llm_calls = input_tokens = output_tokens = 0
+    for index, message in enumerate(response):
+        if isinstance(message, dict) and message.get('role') == 'assistant':
+            llm_calls += 1
+            input_tokens += base + estimate_message_tokens(response[:index])
+            output_tokens += estimate_message_tokens([message])
+    return llm_calls, input_tokens, output_tokens
+
+
+def run_agent(assistant, messages: list, scope: str, use_cache: bool = True,
+              bypass_cache: bool = False, on_delta=None, agent_name: str = "agent"):
+    """
+    Runs an Assistant, answering from the shared LLM cache when possible.
+    Every run is timed and recorded in the metrics, see `metrics.record_llm_call`.
+
+    Args:
+        assistant: The qwen-agent Assistant to run.
+        messages (list): The conversation to send.
+        scope (str): The agent's configuration hash from `LLMCache.make_scope`.
+        use_cache (bool): Whether this agent takes part in caching at all.
+        bypass_cache (bool): Skip the cache lookup and always call the model.
+            The fresh response still replaces the cached one.
+        on_delta (callable): Optional callback receiving each new piece of the
+            answer's text as it streams in. A cached answer arrives in one piece.
+        agent_name (str): The name the run is recorded under, e.g. "writer".
+
+    Returns:
+        list: The agent's response messages.
+    """
+    start = time.perf_counter()
+    cache = get_llm_cache() if use_cache else None
+    key = LLMCache.make_key(scope, messages) if cache is not None else None
+    if cache is not None and not bypass_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            if on_delta is not None:
+                on_delta(message_text(cached[-1]))
+            metrics.record_llm_call(agent_name, time.perf_counter() - start, cached=True,
+                                    llm_calls=0, input_tokens=0, output_tokens=0)
+            return cached
+
+    response = call_model(assistant, messages, on_delta)
+    llm_calls, input_tokens, output_tokens = usage_estimate(assistant, messages, response)
+    metrics.record_llm_call(agent_name, time.perf_counter() - start, cached=False, llm_calls=llm_calls,
+                            input_tokens=input_tokens, output_tokens=output_tokens)
+
+    # Only complete answers are worth keeping, and callers only read the final message
+    if cache is not None and response and isinstance(response[-1], dict) and response[-1].get('content'):
+        cache.set(key, response[-1:])
+    return response
+
+
+def invalidate(messages: list, scope: str):
+    """
+    Drops a cached response, e.g. one the caller could not parse.
+    """
+    cache = get_llm_cache()
+    if cache is not None:
+        cache.delete(LLMCache.make_key(scope, messages))
@@ -6,37 +6,61 @@ import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from qwen_agent.agents import Assistant
-from config import get_llm_config
+from config import get_llm_config, is_llm_cache_enabled, get_agent_tier, get_escalation_tier
+from agents.llm_cache import LLMCache, run_agent, invalidate
+from outline_stream import OutlineStreamParser
+import metrics
 
 class OutlineAgent:
-    def __init__(self):
+    def __init__(self, use_cache: bool = None, model_tier: str = None):
         """
         Initializes the OutlineAgent.
         This agent is responsible for creating a blog post outline.
+
+        Args:
+            use_cache (bool): Whether to use the shared LLM response cache.
+                Defaults to the LLM_CACHE_* environment settings.
+            model_tier (str): "fast" or "max". Defaults to the 'outline' entry of
+                AGENT_MODELS. If the outline is malformed, it is generated again
+                with the next larger tier.
         """
         # Define the persona and instructions for the agent
-        system_prompt = (
+        self.system_prompt = (
             "You are a senior content strategist. Your task is to take a given topic and "
             "create a comprehensive, well-structured blog post outline. "
             "The outline should include an introduction, 3-5 main body sections with sub-points, and a conclusion. "
             "Output the result as a JSON object with a single key 'outline' which contains a list of strings."
         )
 
+        self.use_cache = is_llm_cache_enabled('outline') if use_cache is None else use_cache
+        self.tier = model_tier or get_agent_tier('outline')
+        self.agent, self.cache_scope = self._build(self.tier)
+        # The larger model is only built if an outline ever needs escalating
+        self._escalation = None
+
+    def _build(self, tier: str):
         # Get the LLM configuration from our central config file
-        llm_config = get_llm_config()
+        llm_config = get_llm_config('outline', tier)
 
         # Initialize the Assistant agent from the qwen-agent library
-        self.agent = Assistant(
+        agent = Assistant(
             llm=llm_config,
-            system_message=system_prompt
+            system_message=self.system_prompt
         )
 
-    def run(self, topic: str):
+        # Responses are cached under a hash of this agent's model, prompt and tools
+        return agent, LLMCache.make_scope(llm_config, self.system_prompt, tools=[])
+
+    def run(self, topic: str, bypass_cache: bool = False, on_item=None):
         """
         Runs the agent to generate an outline for the given topic.
 
         Args:
             topic (str): The topic for the blog post.
+            bypass_cache (bool): Skip the LLM cache lookup and always call the model.
+            on_item (callable): Optional callback receiving (index, text) for each
+                outline item as soon as it has streamed in. The items are a preview:
+                the returned outline may differ, e.g. after an escalation.
 
         Returns:
             list: A list of strings representing the blog post outline, or None if an error occurs.
@@ -45,11 +69,37 @@ class OutlineAgent:
         
         # We will structure the user message to be clear and direct
         messages = [{"role": "user", "content": f"Generate a blog post outline for the topic: {topic}"}]
-        
-        # The agent's run method returns a generator, so we iterate through it
-        response = []
-        for res in self.agent.run(messages=messages):
-            response.extend(res)
+
+        on_delta = None
+        if on_item is not None:
+            parser = OutlineStreamParser()
+
+            def on_delta(text):
+                for item in parser.feed(text):
+                    on_item(parser.count - 1, item)
+
+        outline = self._generate(self.agent, self.cache_scope, messages, bypass_cache, on_delta)
+        escalation_tier = get_escalation_tier(self.tier)
+        if outline is None and escalation_tier is not None:
+            # A malformed answer from a smaller model is retried once on a larger one
+            print(f"OutlineAgent: Escalating from the '{self.tier}' to the '{escalation_tier}' model.")
+            metrics.registry.inc("content_team_model_escalations_total", {'agent': 'outline'},
+                                 help_text="Tasks retried on a larger model after invalid output.")
+            if self._escalation is None:
+                self._escalation = self._build(escalation_tier)
+            outline = self._generate(*self._escalation, messages, bypass_cache)
+        return outline
+
+    def _generate(self, agent, cache_scope: str, messages: list, bypass_cache: bool, on_delta=None):
+        """
+        Asks one model for the outline and parses it.
+
+        Returns:
+            list: The outline, or None if the answer was not a valid outline.
+        """
+        # run_agent drains the streamed response, keeping only the final snapshot
+        response = run_agent(agent, messages, cache_scope, use_cache=self.use_cache,
+                             bypass_cache=bypass_cache, on_delta=on_delta, agent_name="outline")
 
         # The final response from the agent should contain the outline
         if response and isinstance(response[-1], dict) and 'content' in response[-1]:
@@ -61,11 +111,16 @@ class OutlineAgent:
                 json_str = content_str[json_start:json_end]
                 
                 outline_data = json.loads(json_str)
+                outline = outline_data.get("outline", [])
+                if not isinstance(outline, list) or not all(isinstance(item, str) for item in outline):
+                    raise ValueError("'outline' is not a list of strings")
                 print("OutlineAgent: Successfully generated and parsed the outline.")
-                return outline_data.get("outline", [])
-            except json.JSONDecodeError as e:
+                return outline
+            except (json.JSONDecodeError, AttributeError, ValueError) as e:
                 print(f"Error: Could not decode JSON from the agent's response. Error: {e}")
                 print(f"Raw response content: {response[-1]['content']}")
+                # Don't let a malformed answer stick in the cache
+                invalidate(messages, cache_scope)
                 return None
         
         print("Error: The agent did not return the expected outline format.")
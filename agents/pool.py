@@ -0,0 +1,44 @@
+import threading
+from contextlib import contextmanager
+
+
+class AgentPool:
+    """
+    Lends out agent instances so that no instance is used by two callers at once.
+
+    qwen-agent's Assistant is not documented as thread-safe, so instead of
+    sharing a single agent between workers, each caller checks one out for the
+    duration of a call and returns it afterwards. Idle agents are reused, so a
+    long-lived team only builds as many agents as it ever needed at the same time.
+    """
+
+    def __init__(self, factory, size: int = 0):
+        """
+        Args:
+            factory (callable): A zero-argument callable that builds a new agent,
+                e.g. the agent class itself.
+            size (int): The number of agents to build up front.
+        """
+        self.factory = factory
+        self._idle = [factory() for _ in range(size)]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self):
+        """
+        Checks out an idle agent, building a new one if none is available.
+
+        Usage:
+            with pool.acquire() as agent:
+                agent.run(...)
+        """
+        with self._lock:
+            agent = self._idle.pop() if self._idle else None
+        if agent is None:
+            agent = self.factory()
+
+        try:
+            yield agent
+        finally:
+            with self._lock:
+                self._idle.append(agent)
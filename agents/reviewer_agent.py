@@ -1,17 +1,85 @@
 import sys
 import os
+import json
+import time
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from qwen_agent.agents import Assistant
-from config import get_llm_config
+from config import get_llm_config, is_llm_cache_enabled, get_agent_tier
+from agents.llm_cache import LLMCache, run_agent, invalidate
+from token_utils import estimate_tokens
+
+# Review the whole draft in one call
+FULL_MODE = "full"
+# Review groups of sections in parallel, then smooth the boundaries between them
+CHUNKED_MODE = "chunked"
+# Ask for a list of targeted edits and apply them locally
+EDITS_MODE = "edits"
+
+# Used to estimate the time saved when the measured edit response is too short to time reliably
+DEFAULT_DECODE_TOKENS_PER_SECOND = 40
+
+class EditError(ValueError):
+    """Raised when a list of edits cannot be applied to the draft."""
+
+def parse_edits(response_text: str):
+    """
+    Extracts the JSON list of edits from the model's answer.
+
+    Raises:
+        EditError: If the answer does not contain a well-formed list of edits.
+    """
+    json_start = response_text.find('[')
+    json_end = response_text.rfind(']') + 1
+    if json_start == -1 or json_end == 0:
+        raise EditError("The response does not contain a JSON list.")
+    try:
+        edits = json.loads(response_text[json_start:json_end])
+    except json.JSONDecodeError as e:
+        raise EditError(f"The edit list is not valid JSON: {e}")
+
+    if not isinstance(edits, list):
+        raise EditError("The edits must be a JSON list.")
+    for edit in edits:
+        if not (isinstance(edit, dict) and isinstance(edit.get('find'), str) and isinstance(edit.get('replace'), str)):
+            raise EditError(f"Malformed edit: {edit!r}")
+    return edits
+
+def apply_edits(draft: str, edits: list):
+    """
+    Applies edits to the draft, in order. Each edit's 'find' text must occur
+    exactly once in the text at the time it is applied, so an ambiguous or
+    hallucinated span never changes the wrong place.
+
+    Raises:
+        EditError: If any edit cannot be applied unambiguously.
+    """
+    text = draft
+    for edit in edits:
+        find = edit['find']
+        if not find:
+            raise EditError("An edit has an empty 'find' span.")
+        occurrences = text.count(find)
+        if occurrences != 1:
+            raise EditError(f"Edit span found {occurrences} times instead of once: {find[:60]!r}")
+        text = text.replace(find, edit['replace'], 1)
+    return text
 
 class ReviewerAgent:
-    def __init__(self):
+    def __init__(self, use_cache: bool = None, model_tier: str = None, transition_tier: str = None):
         """
         Initializes the ReviewerAgent.
         This agent is responsible for reviewing and polishing a draft.
+
+        Args:
+            use_cache (bool): Whether to use the shared LLM response cache.
+                Defaults to the LLM_CACHE_* environment settings.
+            model_tier (str): "fast" or "max" for reviewing and polishing.
+                Defaults to the 'reviewer' entry of AGENT_MODELS.
+            transition_tier (str): The tier for the short transition rewrites of the
+                chunked review. Defaults to the 'transition' entry of AGENT_MODELS.
         """
         # Define the persona and instructions for the agent
         system_prompt = (
@@ -22,8 +90,19 @@ class ReviewerAgent:
             "Provide only the final, polished version of the full text as your response."
         )
 
+        edit_system_prompt = (
+            "You are a meticulous and professional editor. You will receive a draft of a blog post. "
+            "Review it for clarity, grammar, tone, and flow, and fix awkward phrasing. "
+            "Do not add any new information. "
+            "Do not return the full text. Instead, respond only with a JSON list of edits, each an object "
+            "{\"find\": \"<exact text copied from the draft>\", \"replace\": \"<improved text>\"}. "
+            "Each 'find' span must appear exactly once in the draft; include just enough words to make it unique. "
+            "Respond with [] if the draft needs no changes."
+        )
+
         # Get the LLM configuration
-        llm_config = get_llm_config()
+        self.tier = model_tier or get_agent_tier('reviewer')
+        llm_config = get_llm_config('reviewer', self.tier)
 
         # Initialize the Assistant agent. This agent does not need any tools.
         self.agent = Assistant(
@@ -31,12 +110,37 @@ class ReviewerAgent:
             system_message=system_prompt
         )
 
-    def run(self, draft_content: str):
+        # Responses are cached under a hash of this agent's model, prompt and tools
+        self.use_cache = is_llm_cache_enabled('reviewer') if use_cache is None else use_cache
+        self.cache_scope = LLMCache.make_scope(llm_config, system_prompt, tools=[])
+
+        # A second Assistant answers with targeted edits instead of the full text
+        self.edit_agent = Assistant(
+            llm=llm_config,
+            system_message=edit_system_prompt
+        )
+        self.edit_cache_scope = LLMCache.make_scope(llm_config, edit_system_prompt, tools=[])
+
+        # Transition rewrites are short, so they may run on a faster model
+        self.transition_tier = transition_tier or get_agent_tier('transition')
+        if self.transition_tier == self.tier:
+            self.transition_agent, self.transition_cache_scope = self.agent, self.cache_scope
+        else:
+            transition_config = get_llm_config('transition', self.transition_tier)
+            self.transition_agent = Assistant(
+                llm=transition_config,
+                system_message=system_prompt
+            )
+            self.transition_cache_scope = LLMCache.make_scope(transition_config, system_prompt, tools=[])
+
+    def run(self, draft_content: str, bypass_cache: bool = False, on_delta=None):
         """
         Runs the agent to review and polish the given draft content.
 
         Args:
             draft_content (str): The draft text of the blog post.
+            bypass_cache (bool): Skip the LLM cache lookup and always call the model.
+            on_delta (callable): Optional callback receiving the polished text as it streams in.
 
         Returns:
             str: The polished, final version of the text.
@@ -45,19 +149,139 @@ class ReviewerAgent:
         
         messages = [{"role": "user", "content": draft_content}]
         
-        response = []
-        for res in self.agent.run(messages=messages):
-            response.extend(res)
-
-        # The final text is in the 'content' of the last message
-        if response and isinstance(response[-1], dict) and 'content' in response[-1]:
-            polished_content = response[-1]['content']
+        polished_content = self._complete(messages, bypass_cache, on_delta)
+        if polished_content is not None:
             print("ReviewerAgent: Draft has been successfully polished.")
             return polished_content
         
         print("Error: The ReviewerAgent did not return the expected text format.")
         return "Error: Could not review the content."
 
+    def run_edits(self, draft_content: str, bypass_cache: bool = False):
+        """
+        Reviews the draft by asking for a list of targeted edits and applying them
+        locally, which needs far fewer output tokens than a full rewrite. Falls back
+        to a full rewrite if the edits cannot be parsed or applied.
+
+        Args:
+            draft_content (str): The draft text of the blog post.
+            bypass_cache (bool): Skip the LLM cache lookup and always call the model.
+
+        Returns:
+            tuple: The polished text and a report dict with the number of edits,
+                whether the fallback was used, and the estimated output tokens and
+                seconds saved compared with a full rewrite.
+        """
+        print("\nReviewerAgent: Reviewing the draft with targeted edits...")
+        messages = [{"role": "user", "content": draft_content}]
+
+        start = time.perf_counter()
+        response_text = self._complete(messages, bypass_cache, agent=self.edit_agent, scope=self.edit_cache_scope,
+                                       agent_name="reviewer_edits")
+        latency = time.perf_counter() - start
+
+        output_tokens = estimate_tokens(response_text or "")
+        full_rewrite_tokens = estimate_tokens(draft_content)
+        report = {
+            'edits': 0,
+            'fallback': False,
+            'output_tokens': output_tokens,
+            'full_rewrite_tokens': full_rewrite_tokens,
+            'tokens_saved': 0,
+            'latency_seconds': round(latency, 2),
+            'latency_saved_seconds': 0.0,
+        }
+
+        try:
+            if response_text is None:
+                raise EditError("The model returned no answer.")
+            edits = parse_edits(response_text)
+            polished_content = apply_edits(draft_content, edits)
+        except EditError as e:
+            print(f"ReviewerAgent: Could not apply the edits ({e}); falling back to a full rewrite.")
+            # Don't let an unusable edit list stick in the cache
+            invalidate(messages, self.edit_cache_scope)
+            report['fallback'] = True
+            return self.run(draft_content, bypass_cache=bypass_cache), report
+
+        # Time saved is the output we did not have to generate, at the observed decode speed
+        decode_rate = output_tokens / latency if output_tokens >= 50 and latency > 0 else DEFAULT_DECODE_TOKENS_PER_SECOND
+        report['edits'] = len(edits)
+        report['tokens_saved'] = max(0, full_rewrite_tokens - output_tokens)
+        report['latency_saved_seconds'] = round(report['tokens_saved'] / decode_rate, 2)
+        print(f"ReviewerAgent: Applied {len(edits)} edits, saving ~{report['tokens_saved']} output tokens "
+              f"(~{report['latency_saved_seconds']}s) compared with a full rewrite.")
+        return polished_content, report
+
+    def polish_chunk(self, chunk: str, title: str, before: str = "", after: str = "",
+                     bypass_cache: bool = False):
+        """
+        Polishes one part of a longer article. The neighbouring text is passed as
+        read-only context so the tone and flow stay consistent across parts.
+
+        Args:
+            chunk (str): The part of the draft to polish.
+            title (str): The article title.
+            before (str): The end of the preceding part, if any.
+            after (str): The start of the following part, if any.
+            bypass_cache (bool): Skip the LLM cache lookup and always call the model.
+
+        Returns:
+            str: The polished part, or the original text if the model gave no usable answer.
+        """
+        context = [f"This is one part of a blog post titled '{title}'."]
+        if before:
+            context.append(f"For context only, the preceding part ends with:\n<<<\n{before}\n>>>")
+        if after:
+            context.append(f"For context only, the following part starts with:\n<<<\n{after}\n>>>")
+        context.append(
+            "Polish only the text below. Do not repeat or rewrite the context, "
+            f"and keep the markdown structure.\n\n{chunk}"
+        )
+        messages = [{"role": "user", "content": "\n\n".join(context)}]
+
+        polished_chunk = self._complete(messages, bypass_cache, agent_name="reviewer_chunk")
+        if polished_chunk is None:
+            print("Error: The ReviewerAgent did not polish a chunk; keeping the draft text.")
+            return chunk
+        return polished_chunk
+
+    def smooth_transition(self, previous_paragraph: str, paragraph: str, title: str,
+                          bypass_cache: bool = False):
+        """
+        Rewrites the opening paragraph of a part so it follows on naturally from the
+        paragraph before it, which was polished separately. Only the opening
+        paragraph is returned, which keeps this pass short and cheap.
+
+        Returns:
+            str: The smoothed paragraph, or the original one if the model gave no usable answer.
+        """
+        messages = [{"role": "user", "content": (
+            f"In a blog post titled '{title}', this paragraph:\n<<<\n{previous_paragraph}\n>>>\n\n"
+            f"is followed by this paragraph:\n<<<\n{paragraph}\n>>>\n\n"
+            "Rewrite only the second paragraph so that it follows on naturally from the first. "
+            "Change as little as possible and respond with the rewritten second paragraph only."
+        )}]
+        smoothed = self._complete(messages, bypass_cache, agent=self.transition_agent,
+                                  scope=self.transition_cache_scope, agent_name="reviewer_transition")
+        return smoothed.strip() if smoothed and smoothed.strip() else paragraph
+
+    def _complete(self, messages: list, bypass_cache: bool = False, on_delta=None, agent=None, scope=None,
+                  agent_name: str = "reviewer"):
+        """
+        Sends one request and returns the text of the final message, or None.
+        Uses the full-rewrite Assistant unless another `agent` and cache `scope` are given.
+        The run is recorded in the metrics under `agent_name`.
+        """
+        response = run_agent(agent or self.agent, messages, scope or self.cache_scope,
+                             use_cache=self.use_cache, bypass_cache=bypass_cache,
+                             on_delta=on_delta, agent_name=agent_name)
+
+        # The final text is in the 'content' of the last message
+        if response and isinstance(response[-1], dict) and 'content' in response[-1]:
+            return response[-1]['content']
+        return None
+
 # This block allows us to test the agent directly
 if __name__ == '__main__':
     # Create an instance of our agent
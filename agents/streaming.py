@@ -0,0 +1,73 @@
+def message_text(message: dict):
+    """
+    Returns the text content of a message, joining multi-part content if needed.
+    """
+    content = message.get('content') or ''
+    if isinstance(content, list):
+        content = ''.join(item.get('text', '') for item in content if isinstance(item, dict))
+    return content
+
+
+class StreamConsumer:
+    """
+    Consumes the output of `Assistant.run`.
+
+    qwen-agent yields the full, cumulative message list on every streamed step,
+    so collecting every snapshot grows quadratically with the response length.
+    This consumer only keeps the latest snapshot and works out the newly
+    generated text of the assistant's answer on each step.
+
+    Usage:
+        consumer = StreamConsumer(assistant.run(messages=messages))
+        for delta in consumer.deltas():
+            forward(delta)
+        final_messages = consumer.messages
+    """
+
+    def __init__(self, stream):
+        """
+        Args:
+            stream: The generator returned by `Assistant.run`.
+        """
+        self.stream = stream
+        self.messages = []
+        self.text = ''
+        self._message_index = None
+
+    def deltas(self):
+        """
+        Yields each new piece of assistant text as it is generated.
+        Function calls and tool results are tracked but not yielded. When the
+        assistant starts a new message (e.g. after a tool call), the text is reset.
+        """
+        for snapshot in self.stream:
+            self.messages = snapshot
+            if not snapshot:
+                continue
+
+            last_message = snapshot[-1]
+            if last_message.get('role') != 'assistant' or last_message.get('function_call'):
+                continue
+
+            index = len(snapshot) - 1
+            if index != self._message_index:
+                self._message_index = index
+                self.text = ''
+
+            text = message_text(last_message)
+            # The model normally only appends; if it rewrote earlier text, resend it all
+            delta = text[len(self.text):] if text.startswith(self.text) else text
+            self.text = text
+            if delta:
+                yield delta
+
+    def consume(self):
+        """
+        Drains the stream without forwarding anything.
+
+        Returns:
+            list: The final message list produced by the agent.
+        """
+        for _ in self.deltas():
+            pass
+        return self.messages
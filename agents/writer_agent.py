@@ -8,28 +8,75 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from qwen_agent.agents import Assistant
 # Import our new custom tool instead of the old one
 from tools.tavily_search import TavilySearchTool
-from config import get_llm_config, configure_environment
+from tools.research import build_search_query
+from config import (get_llm_config, configure_environment, is_llm_cache_enabled, get_writer_config, get_agent_tier,
+                    get_context_budget, WRITER_MODES)
+from agents.llm_cache import LLMCache, run_agent
+
+# The writer lets the model decide when to call the search tool
+TOOL_MODE = "tool"
+# The writer searches in Python and hands the results to the model in a single call
+DIRECT_MODE = "direct"
 
 class WriterAgent:
-    def __init__(self):
+    def __init__(self, use_cache: bool = None, mode: str = None, query_template: str = None, hedge: bool = None,
+                 model_tier: str = None, context_budget: int = None):
         """
         Initializes the WriterAgent with our custom Tavily search tool.
+
+        Args:
+            use_cache (bool): Whether to use the shared LLM response cache.
+                Defaults to the LLM_CACHE_* environment settings.
+            mode (str): "tool" lets the model call the search tool itself, which takes
+                at least two LLM calls per section. "direct" runs the search in Python
+                and writes the section in a single LLM call. Defaults to WRITER_MODE.
+            query_template (str): The query-expansion template used in direct mode.
+                Defaults to WRITER_QUERY_TEMPLATE.
+            hedge (bool): Whether slow searches are duplicated. Defaults to HEDGE_ENABLED.
+            model_tier (str): "fast" or "max". Defaults to the 'writer' entry of AGENT_MODELS.
+            context_budget (int): The most estimated tokens of search results per prompt;
+                larger results are compressed. Defaults to the 'writer' entry of CONTEXT_BUDGETS.
         """
         # Load environment variables from .env file.
         configure_environment()
 
+        writer_config = get_writer_config()
+        self.mode = mode or writer_config['mode']
+        if self.mode not in WRITER_MODES:
+            raise ValueError(f"Unknown writer mode '{self.mode}'. Choose from: {', '.join(WRITER_MODES)}.")
+        self.query_template = query_template or writer_config['query_template']
+
         # Define the persona and instructions for the agent
-        system_prompt = (
+        tool_system_prompt = (
             "You are an expert blog writer. You will be given a specific topic for a section of a blog post. "
             "Your task is to use your 'tavily_search' tool to gather relevant, up-to-date information. "
             "Then, write a detailed, engaging, and informative paragraph of 150-200 words for that section. "
             "Cite your sources by including a markdown link to the URL you used. "
             "Directly output the final written text without any introductory phrases like 'Here is the paragraph'."
         )
+        direct_system_prompt = (
+            "You are an expert blog writer. You will be given a specific topic for a section of a blog post, "
+            "together with research notes from a web search. "
+            "Using the research notes, write a detailed, engaging, and informative paragraph of 150-200 words for that section. "
+            "Cite your sources by including a markdown link to the URL of each note you used. "
+            "Directly output the final written text without any introductory phrases like 'Here is the paragraph'."
+        )
 
         # Get LLM config and initialize our new tool.
-        llm_config = get_llm_config()
-        tools = [TavilySearchTool()]
+        self.tier = model_tier or get_agent_tier('writer')
+        llm_config = get_llm_config('writer', self.tier)
+        if context_budget is None:
+            context_budget = get_context_budget('writer')
+        self.search_tool = TavilySearchTool({'hedge': hedge, 'context_budget': context_budget})
+
+        if self.mode == TOOL_MODE:
+            system_prompt = tool_system_prompt
+            tools = [self.search_tool]
+            tool_names = ['tavily_search']
+        else:
+            system_prompt = direct_system_prompt
+            tools = []
+            tool_names = []
 
         # Initialize the Assistant agent with our custom tool
         self.agent = Assistant(
@@ -38,20 +85,52 @@ class WriterAgent:
             function_list=tools
         )
 
-    def run(self, section_topic: str):
+        # Responses are cached under a hash of this agent's model, prompt and tools
+        self.use_cache = is_llm_cache_enabled('writer') if use_cache is None else use_cache
+        self.cache_scope = LLMCache.make_scope(llm_config, system_prompt, tools=tool_names)
+
+    def build_messages(self, section_topic: str, research: list = None):
+        """
+        Builds the conversation sent to the model. In direct mode this runs the
+        search first and puts the results into the prompt, unless `research`
+        (a list of search results gathered up front) is given.
+        """
+        if self.mode == TOOL_MODE:
+            if research is not None:
+                raise ValueError("Prefetched research can only be used in direct writer mode.")
+            return [{
+                "role": "user", 
+                "content": f"Please use your search tool to write the content for the blog post section: '{section_topic}'"
+            }]
+
+        if research is None:
+            query = build_search_query(section_topic, self.query_template)
+            research = self.search_tool.search(query).get('results', [])
+        # Compressed towards the section itself, which is what the notes are for
+        research_notes = self.search_tool.build_context(research, section_topic)
+        return [{
+            "role": "user",
+            "content": (
+                f"Blog post section: '{section_topic}'\n\n"
+                f"Research notes:\n{research_notes}\n\n"
+                "Write the content for this section."
+            )
+        }]
+
+    def run(self, section_topic: str, bypass_cache: bool = False, on_delta=None, research: list = None):
         """
         Runs the agent to write content for the given section topic.
+        If `on_delta` is given, it receives the section text as it streams in.
+        In direct mode, `research` supplies prefetched search results instead of
+        running a new search.
         """
         print(f"\nWriterAgent: Writing content for section: '{section_topic}'")
         
-        messages = [{
-            "role": "user", 
-            "content": f"Please use your search tool to write the content for the blog post section: '{section_topic}'"
-        }]
+        messages = self.build_messages(section_topic, research)
         
-        response = []
-        for res in self.agent.run(messages=messages):
-            response.extend(res)
+        response = run_agent(self.agent, messages, self.cache_scope,
+                             use_cache=self.use_cache, bypass_cache=bypass_cache, agent_name="writer",
+                             on_delta=on_delta)
 
         if response and isinstance(response[-1], dict) and 'content' in response[-1]:
             content = response[-1]['content']
@@ -1,55 +1,253 @@
-import gradio as gr
-from main import ContentTeam
-import time
+import startup
 
-# Initialize our ContentTeam once when the app starts
+import sys
+import queue
+from datetime import datetime
+
+with startup.timed("import pipeline modules"):
+    from main import ContentTeam
+    from config import get_metrics_config, get_app_config, get_work_queue_config, get_article_store_config
+    from job_queue import JobQueue, QueueFull, JOB_FINISHED
+    from work_queue import WorkQueue
+    from article_store import ArticleStore
+    import events
+    import metrics
+
+# Requests are queued and served by a fixed pool of workers, each with its own
+# ContentTeam, so users never share agents and excess load is turned away early.
+# Building the teams is cheap: the agents themselves are built on the first request.
 print("Starting the AI Content Team application...")
-content_team = ContentTeam()
+with startup.timed("start job queue"):
+    job_queue = JobQueue(ContentTeam, **get_app_config())
+article_store = ArticleStore(**get_article_store_config())
 print("Application ready.")
 
-def generate_article(topic):
+# How often a waiting request refreshes its queue position
+QUEUE_POLL_SECONDS = 1.0
+
+class ArticleView:
+    """
+    Builds the markdown shown in the UI from the pipeline's streamed events.
+    Sections are shown as they are written; once the reviewer starts, its
+    polished text replaces the draft.
+    """
+
+    def __init__(self, topic):
+        self.topic = topic
+        self.status = "🤖 Agents are assembling... Generating outline."
+        self.outline = []
+        self.sections = {}
+        self.review = None
+        self.image_url = None
+        self.final = None
+
+    def apply(self, event):
+        if event.kind == events.OUTLINE_READY:
+            self.outline = event.data["outline"]
+            self.status = f"✍️ Writing {len(self.outline)} sections..."
+        elif event.kind == events.SECTION_STARTED:
+            self.sections.setdefault(event.data["index"], "")
+        elif event.kind == events.SECTION_DELTA:
+            index = event.data["index"]
+            self.sections[index] = self.sections.get(index, "") + event.data["text"]
+        elif event.kind == events.SECTION_DONE:
+            self.sections[event.data["index"]] = event.data["content"]
+        elif event.kind == events.REVIEW_STARTED:
+            self.review = ""
+            self.status = "🧐 Reviewing and polishing the draft..."
+        elif event.kind == events.REVIEW_DELTA:
+            self.review += event.data["text"]
+        elif event.kind == events.REVIEW_DONE:
+            self.review = event.data["content"]
+            self.status = "🖼️ Waiting for the cover image..."
+        elif event.kind == events.IMAGE_READY:
+            self.image_url = event.data["image_url"]
+        elif event.kind == events.SAVED:
+            self.final = event.data["content"]
+        elif event.kind == events.HALTED:
+            self.final = event.data["message"]
+
+    def render(self):
+        if self.final is not None:
+            return self.final
+
+        parts = [f"*{self.status}*", f"# {self.topic.title()}"]
+        if self.image_url:
+            parts.append(f"![{self.topic}]({self.image_url})")
+        if self.review is not None:
+            parts.append(self.review)
+        else:
+            for index, section_topic in enumerate(self.outline):
+                text = self.sections.get(index)
+                parts.append(text if text else f"*{section_topic} — waiting for writer...*")
+        return "\n\n".join(parts)
+
+def queue_status(position: int, eta_seconds: float):
+    """
+    Renders the waiting message for a queued request.
+    """
+    ahead = "You are next in line" if position == 0 else f"{position} article(s) ahead of you"
+    return f"*⏳ Waiting for a free writer: {ahead}. Estimated start in about {max(1, round(eta_seconds / 60))} min.*"
+
+def generate_article(topic, bypass_cache=False):
     """
     The main function that Gradio will call. 
-    It takes a topic, runs the agent team, and returns the result.
+    It takes a topic, queues a run of the agent team, and streams the article
+    into the UI as the agents produce it. While the request waits, its queue
+    position and estimated start time are shown instead.
     This is a generator function to provide real-time UI updates.
     """
     if not topic:
         yield "Please provide a topic."
         return
 
-    # Immediately yield a status update to the user.
-    yield "🤖 Agents are assembling... Generating outline."
-    
-    # Run the content creation process
-    # This will print detailed progress to the console
-    final_article_md = content_team.run(topic)
-    
-    # Yield the final result to the UI
-    yield final_article_md
+    try:
+        job = job_queue.submit(topic, bypass_cache=bypass_cache)
+    except QueueFull:
+        yield "⚠️ Too many articles are being written right now. Please try again in a few minutes."
+        return
+
+    view = ArticleView(topic)
+    finished = False
+    try:
+        # Immediately yield a status update to the user.
+        position = job_queue.position(job)
+        yield queue_status(position, job_queue.eta(job)) if position is not None else view.render()
+
+        # Re-render on every event. The console still shows detailed progress.
+        while True:
+            try:
+                event = job.events.get(timeout=QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                position = job_queue.position(job)
+                if position is not None:
+                    yield queue_status(position, job_queue.eta(job))
+                continue
+            if event is JOB_FINISHED:
+                finished = True
+                break
+            view.apply(event)
+            yield view.render()
+
+        if job.error is not None:
+            yield f"Error: The article could not be generated. {job.error}"
+    finally:
+        # Gradio stops iterating when the client disconnects; don't keep writing for nobody
+        if not finished:
+            job_queue.cancel(job)
+
+def enqueue_article(topic, bypass_cache=False):
+    """
+    Adds a topic to the durable work queue, for worker processes started with
+    `python main.py --worker`. The article is saved to the article store.
+    """
+    if not topic:
+        return "Please provide a topic."
+    work_queue = WorkQueue(**get_work_queue_config())
+    job_id = work_queue.enqueue(topic, bypass_cache=bypass_cache)
+    waiting = work_queue.stats()['queued']
+    return f"📥 Queued as job {job_id} ({waiting} job(s) waiting). A background worker will save the article."
+
+def search_articles(query, limit=20):
+    """
+    Lists the saved articles matching a full-text query, or the newest ones if
+    the query is empty, as a markdown table.
+    """
+    query = (query or "").strip()
+    articles = article_store.search(query, limit=limit) if query else article_store.list(limit=limit)
+    if not articles:
+        return "No articles found." if query else "No articles saved yet."
+
+    rows = ["| ID | Title | Saved |", "| --- | --- | --- |"]
+    for article in articles:
+        created_at = datetime.fromtimestamp(article['created_at']).strftime("%Y-%m-%d %H:%M")
+        title = article['title'].replace("|", "\\|")
+        if article.get('snippet'):
+            title += "<br>" + article['snippet'].replace("|", "\\|").replace("\n", " ")
+        rows.append(f"| {article['id']} | {title} | {created_at} |")
+    return "\n".join(rows)
+
+def open_article(article_id):
+    """
+    Returns a saved article's markdown.
+    """
+    if article_id is None:
+        return "Please provide an article ID."
+    article = article_store.get(int(article_id))
+    if article is None:
+        return f"There is no article {int(article_id)}."
+    return article['markdown']
 
-# Define the Gradio interface
-with gr.Blocks(theme=gr.themes.Soft()) as demo:
-    gr.Markdown("# 🤖 AI-Powered Content Creation Team")
-    gr.Markdown("Enter a topic below and the multi-agent team will write a complete blog post with a cover image.")
+def build_demo():
+    """
+    Builds the Gradio interface. Gradio is imported here, so its import time
+    shows up in the startup report.
+    """
+    with startup.timed("import gradio"):
+        import gradio as gr
+
+    # Define the Gradio interface
+    with gr.Blocks(theme=gr.themes.Soft()) as demo:
+        gr.Markdown("# 🤖 AI-Powered Content Creation Team")
+        gr.Markdown("Enter a topic below and the multi-agent team will write a complete blog post with a cover image.")
     
-    with gr.Row():
-        topic_input = gr.Textbox(
-            label="Blog Post Topic", 
-            placeholder="e.g., The Future of Renewable Energy"
-        )
+        with gr.Row():
+            topic_input = gr.Textbox(
+                label="Blog Post Topic", 
+                placeholder="e.g., The Future of Renewable Energy"
+            )
+            bypass_cache_input = gr.Checkbox(
+                label="Bypass LLM cache",
+                value=False
+            )
     
-    submit_button = gr.Button("Generate Article", variant="primary")
+        with gr.Row():
+            submit_button = gr.Button("Generate Article", variant="primary")
+            enqueue_button = gr.Button("Queue for Background Workers")
     
-    output_markdown = gr.Markdown(label="Generated Article")
+        output_markdown = gr.Markdown(label="Generated Article")
+
+        # Define the button's click behavior
+        # Gradio automatically handles generator functions for streaming output.
+        # The job queue does the admission control, so Gradio itself must not
+        # serialize the requests (its default is one at a time per event).
+        submit_button.click(
+            fn=generate_article, 
+            inputs=[topic_input, bypass_cache_input], 
+            outputs=output_markdown,
+            concurrency_limit=None
+        )
+        enqueue_button.click(
+            fn=enqueue_article,
+            inputs=[topic_input, bypass_cache_input],
+            outputs=output_markdown
+        )
+
+        gr.Markdown("## 📚 Article Library")
+        with gr.Row():
+            search_input = gr.Textbox(
+                label="Search Articles",
+                placeholder="Leave empty to list the newest articles"
+            )
+            search_button = gr.Button("Search")
+        with gr.Row():
+            article_id_input = gr.Number(label="Article ID", precision=0)
+            open_button = gr.Button("Open Article")
+        library_markdown = gr.Markdown()
+
+        search_input.submit(fn=search_articles, inputs=search_input, outputs=library_markdown)
+        search_button.click(fn=search_articles, inputs=search_input, outputs=library_markdown)
+        open_button.click(fn=open_article, inputs=article_id_input, outputs=library_markdown)
+
+    return demo
 
-    # Define the button's click behavior
-    # Gradio automatically handles generator functions for streaming output.
-    submit_button.click(
-        fn=generate_article, 
-        inputs=topic_input, 
-        outputs=output_markdown
-    )
+# Built at import time, so `gradio app.py` (hot reload) and `from app import demo` find it
+demo = build_demo()
 
 # Launch the Gradio app
 if __name__ == "__main__":
+    if get_metrics_config()['port']:
+        metrics.serve_metrics(get_metrics_config()['port'], get_metrics_config()['host'])
+    if "--startup-report" in sys.argv:
+        startup.print_report()
     demo.launch()
@@ -0,0 +1,199 @@
+import os
+import re
+import json
+import time
+import sqlite3
+from datetime import datetime
+
+from storage import topic_slug, write_atomic, sqlite_connection, init_wal_db
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# The columns returned by list and search; get returns every column
+_SUMMARY_FIELDS = ("id", "topic", "title", "image_url", "markdown_path", "created_at")
+_SUMMARY_COLUMNS = ", ".join(_SUMMARY_FIELDS)
+
+
+def render_markdown(title: str, topic: str, body: str, image_url: str = None):
+    """
+    Renders an article as the markdown written to outputs/.
+    """
+    markdown = f"# {title}\n\n"
+    if image_url:
+        markdown += f"![{topic}]({image_url})\n\n"
+    return markdown + body
+
+
+class ArticleStore:
+    """
+    Every finished article, stored in SQLite with a full-text index over titles
+    and bodies.
+
+    Each article records its topic, outline, drafted sections, polished body,
+    cover image, the models that wrote it and its timings. An article is saved
+    in a single transaction, so it is stored completely or not at all. For
+    compatibility, each article is also exported as a markdown file, unless
+    `markdown_dir` is None.
+    """
+
+    def __init__(self, path: str, markdown_dir: str = "outputs"):
+        """
+        Args:
+            path (str): The location of the SQLite database file.
+            markdown_dir (str): Where markdown copies of the articles are written;
+                None disables the export.
+        """
+        self.path = path
+        self.markdown_dir = markdown_dir
+
+        init_wal_db(path)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " topic TEXT NOT NULL,"
+                " title TEXT NOT NULL,"
+                " body TEXT NOT NULL,"
+                " outline TEXT NOT NULL,"
+                " sections TEXT NOT NULL,"
+                " image_url TEXT,"
+                " models TEXT NOT NULL,"
+                " timings TEXT,"
+                " markdown_path TEXT,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS articles_topic ON articles (topic)")
+            conn.execute("CREATE INDEX IF NOT EXISTS articles_created_at ON articles (created_at)")
+            self.full_text = self._create_full_text_index(conn)
+
+    @staticmethod
+    def _create_full_text_index(conn):
+        # An external-content FTS5 table, kept in sync with the articles by triggers
+        try:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+                         "title, body, content='articles', content_rowid='id')")
+        except sqlite3.OperationalError as e:
+            # Some SQLite builds lack FTS5; search then falls back to a slower scan
+            print(f"Warning: Full-text search is unavailable, searching articles by scan. Error: {e}")
+            return False
+        conn.execute("CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN"
+                     " INSERT INTO articles_fts (rowid, title, body) VALUES (new.id, new.title, new.body); END")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN"
+                     " INSERT INTO articles_fts (articles_fts, rowid, title, body)"
+                     " VALUES ('delete', old.id, old.title, old.body); END")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, body ON articles BEGIN"
+                     " INSERT INTO articles_fts (articles_fts, rowid, title, body)"
+                     " VALUES ('delete', old.id, old.title, old.body);"
+                     " INSERT INTO articles_fts (rowid, title, body) VALUES (new.id, new.title, new.body); END")
+        return True
+
+    def _connect(self):
+        return sqlite_connection(self.path, row_factory=sqlite3.Row)
+
+    def markdown_path(self, topic: str):
+        """
+        Returns the path of a new markdown export: outputs/<Topic>_<timestamp>.md.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.markdown_dir, f"{topic_slug(topic)}_{timestamp}.md")
+
+    def save(self, topic: str, body: str, outline: list, sections: list, image_url: str = None,
+             models: dict = None, timings: dict = None):
+        """
+        Stores an article and exports it as markdown.
+
+        Returns:
+            dict: The stored article, see `get`.
+        """
+        title = topic.title()
+        markdown_path = self.markdown_path(topic) if self.markdown_dir else None
+        with self._connect() as conn:
+            article_id = conn.execute(
+                "INSERT INTO articles (topic, title, body, outline, sections, image_url, models, timings,"
+                " markdown_path, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (topic, title, body, json.dumps(outline, ensure_ascii=False),
+                 json.dumps(sections, ensure_ascii=False), image_url, json.dumps(models or {}),
+                 json.dumps(timings) if timings is not None else None, markdown_path, time.time()),
+            ).lastrowid
+        if markdown_path:
+            try:
+                write_atomic(markdown_path, render_markdown(title, topic, body, image_url))
+            except OSError as e:
+                # The article itself is safe in the store
+                print(f"Error: Could not export the article to {markdown_path}. Error: {e}")
+                with self._connect() as conn:
+                    conn.execute("UPDATE articles SET markdown_path = NULL WHERE id = ?", (article_id,))
+        return self.get(article_id)
+
+    def set_timings(self, article_id: int, timings: dict):
+        """
+        Records an article's timings, which are only complete once its run has finished.
+        """
+        with self._connect() as conn:
+            conn.execute("UPDATE articles SET timings = ? WHERE id = ?", (json.dumps(timings), article_id))
+
+    def get(self, article_id: int):
+        """
+        Returns:
+            dict: Every field of the article, including its rendered 'markdown',
+                or None if there is no such article.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM articles WHERE id = ?", (article_id,)).fetchone()
+        if row is None:
+            return None
+        article = dict(row)
+        for field in ("outline", "sections", "models", "timings"):
+            article[field] = json.loads(article[field]) if article[field] else None
+        article['markdown'] = render_markdown(article['title'], article['topic'], article['body'],
+                                              article['image_url'])
+        return article
+
+    def list(self, limit: int = 20, offset: int = 0, topic: str = None):
+        """
+        Returns the newest articles first, optionally only those for one topic.
+        """
+        query = f"SELECT {_SUMMARY_COLUMNS} FROM articles"
+        params = []
+        if topic is not None:
+            query += " WHERE topic = ? COLLATE NOCASE"
+            params.append(topic)
+        query += " ORDER BY id DESC LIMIT ? OFFSET ?"
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params + [limit, offset])]
+
+    def search(self, query: str, limit: int = 20):
+        """
+        Finds articles whose title or body contains every word of the query (or
+        a longer word starting with it), best matches first, each with a short
+        'snippet' around the match.
+        """
+        words = _WORD_PATTERN.findall(query)
+        if not words:
+            return []
+
+        with self._connect() as conn:
+            if self.full_text:
+                # Quoting every word keeps user input from being read as FTS5 syntax;
+                # the trailing * also matches longer words, e.g. "tomato" finds "tomatoes"
+                match = " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+                rows = conn.execute(
+                    f"SELECT {', '.join('a.' + field for field in _SUMMARY_FIELDS)},"
+                    " snippet(articles_fts, 1, '**', '**', '...', 16) AS snippet"
+                    " FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+                    " WHERE articles_fts MATCH ? ORDER BY bm25(articles_fts) LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+            else:
+                conditions = " AND ".join("(title LIKE ? OR body LIKE ?)" for _ in words)
+                params = [value for word in words for value in (f"%{word}%", f"%{word}%")]
+                rows = conn.execute(
+                    f"SELECT {_SUMMARY_COLUMNS}, substr(body, 1, 160) AS snippet FROM articles"
+                    f" WHERE {conditions} ORDER BY id DESC LIMIT ?",
+                    params + [limit],
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
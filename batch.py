@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import events
+
+# Manifest statuses
+STATUS_OK = "ok"
+STATUS_HALTED = "halted"
+STATUS_FAILED = "failed"
+
+
+def read_topics(path: str):
+    """
+    Reads one topic per line from a file, or from stdin when `path` is "-".
+    Blank lines, lines starting with '#' and repeated topics are skipped.
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    topics = []
+    seen = set()
+    for line in lines:
+        topic = line.strip()
+        if topic and not topic.startswith("#") and topic not in seen:
+            seen.add(topic)
+            topics.append(topic)
+    return topics
+
+
+def load_completed_topics(manifest_path: str):
+    """
+    Returns the topics a previous run of the batch already completed successfully.
+    """
+    completed = set()
+    if not os.path.exists(manifest_path):
+        return completed
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+            if record.get("status") == STATUS_OK:
+                completed.add(record.get("topic"))
+    return completed
+
+
+class BatchRunner:
+    """
+    Runs many topics through one long-lived ContentTeam and records the outcome of
+    each in a JSON Lines manifest. Topics already marked "ok" in the manifest are
+    skipped, so an interrupted batch can simply be started again.
+    """
+
+    def __init__(self, team, manifest_path: str, concurrency: int = 1, bypass_cache: bool = False):
+        """
+        Args:
+            team (ContentTeam): The team that writes every article.
+            manifest_path (str): Where the results manifest is appended to.
+            concurrency (int): The number of articles produced at the same time.
+            bypass_cache (bool): Ignore cached LLM responses for the whole batch.
+        """
+        self.team = team
+        self.manifest_path = manifest_path
+        self.concurrency = max(1, concurrency)
+        self.bypass_cache = bypass_cache
+        self._manifest_lock = threading.Lock()
+
+    def run(self, topics: list):
+        """
+        Produces an article for every topic not yet completed.
+
+        Returns:
+            list: The manifest records written by this run.
+        """
+        completed = load_completed_topics(self.manifest_path)
+        pending = [topic for topic in topics if topic not in completed]
+        print(f"Batch: {len(topics)} topics, {len(topics) - len(pending)} already done, "
+              f"{len(pending)} to run with concurrency {self.concurrency}.")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="article") as executor:
+            records = list(executor.map(self.run_topic, pending))
+
+        succeeded = sum(1 for record in records if record["status"] == STATUS_OK)
+        print(f"Batch finished: {succeeded}/{len(records)} articles succeeded. Manifest: {self.manifest_path}")
+        return records
+
+    def run_topic(self, topic: str):
+        """
+        Produces one article and appends its record to the manifest.
+        """
+        outcome = {"status": STATUS_FAILED, "article_id": None, "output_path": None, "stage_timings": {}}
+
+        def on_event(event):
+            if event.kind == events.SAVED:
+                outcome["status"] = STATUS_OK
+                outcome["article_id"] = event.data["article_id"]
+                outcome["output_path"] = event.data["path"]
+            elif event.kind == events.HALTED:
+                outcome["status"] = STATUS_HALTED
+                outcome["error"] = event.data["message"]
+            elif event.kind == events.FINISHED:
+                outcome["stage_timings"] = {
+                    name: {"start": round(start, 3), "end": round(end, 3)}
+                    for name, (start, end) in event.data["stage_timings"].items()
+                }
+
+        started_at = time.time()
+        try:
+            self.team.run(topic, bypass_cache=self.bypass_cache, on_event=on_event)
+        except Exception as e:
+            print(f"Error: Article for topic '{topic}' failed. Error: {e}")
+            outcome["status"] = STATUS_FAILED
+            outcome["error"] = str(e)
+
+        record = {
+            "topic": topic,
+            "status": outcome["status"],
+            "article_id": outcome["article_id"],
+            "output_path": outcome["output_path"],
+            "started_at": started_at,
+            "duration_seconds": round(time.time() - started_at, 3),
+            "stage_timings": outcome["stage_timings"],
+        }
+        if "error" in outcome:
+            record["error"] = outcome["error"]
+        self.append_record(record)
+        return record
+
+    def append_record(self, record: dict):
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._manifest_lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
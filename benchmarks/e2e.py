@@ -0,0 +1,203 @@
+import sys
+import os
+import io
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer, StubProfile
+
+
+class Scenario:
+    def __init__(self, name: str, sections: int = 5, section_words: int = 170, articles: int = 4,
+                 concurrency: int = 1, cache: str = "cold", writer_mode: str = "tool", max_workers: int = 4):
+        """
+        One benchmark configuration.
+
+        Args:
+            name (str): A short, unique label for the report.
+            sections (int): Outline items per article (article size).
+            section_words (int): Words per written section (article size).
+            articles (int): The number of articles measured.
+            concurrency (int): The number of articles produced at the same time.
+            cache (str): "cold" bypasses the LLM cache and clears the search cache
+                before measuring; "warm" runs every topic once first, unmeasured.
+            writer_mode (str): "tool" or "direct", see WriterAgent.
+            max_workers (int): Sections written concurrently within one article.
+        """
+        self.name = name
+        self.sections = sections
+        self.section_words = section_words
+        self.articles = articles
+        self.concurrency = concurrency
+        self.cache = cache
+        self.writer_mode = writer_mode
+        self.max_workers = max_workers
+
+
+SUITES = {
+    'quick': [
+        Scenario("small-cold", sections=3, section_words=80, articles=2),
+        Scenario("small-warm", sections=3, section_words=80, articles=2, cache="warm"),
+    ],
+    'standard': [
+        Scenario("small-cold", sections=3, section_words=100, articles=4),
+        Scenario("medium-cold", sections=5, section_words=170, articles=4),
+        Scenario("large-cold", sections=8, section_words=250, articles=4),
+        Scenario("medium-c4-cold", sections=5, section_words=170, articles=8, concurrency=4),
+        Scenario("medium-direct-cold", sections=5, section_words=170, articles=4, writer_mode="direct"),
+        Scenario("medium-warm", sections=5, section_words=170, articles=4, cache="warm"),
+        Scenario("medium-c4-warm", sections=5, section_words=170, articles=8, concurrency=4, cache="warm"),
+    ],
+}
+
+
+def percentile(values: list, q: float):
+    """
+    Returns the q-th percentile (0-100) of the values, interpolating linearly.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def configure_offline_environment(server_url: str, workdir: str, search_latency: float):
+    """
+    Points the pipeline at the stub server and the stub Tavily backend. Must run
+    before the pipeline reads its settings.
+    """
+    os.environ.update({
+        'LLM_MODEL_SERVER': server_url,
+        'LLM_MODEL': 'stub',
+        'DASHSCOPE_API_KEY': os.environ.get('DASHSCOPE_API_KEY') or 'stub',
+        'TAVILY_BACKEND': 'stub',
+        'TAVILY_STUB_LATENCY': str(search_latency),
+        'TAVILY_CACHE_DISABLED': '',
+        'TAVILY_CACHE_PATH': os.path.join(workdir, '.cache', 'tavily_search.sqlite3'),
+        'LLM_CACHE_BACKEND': 'memory',
+        'LLM_CACHE_AGENTS': 'outline,writer,reviewer,image',
+        # The benchmark topics are near-duplicates of each other by design
+        'TOPIC_REUSE_ENABLED': '',
+        'METRICS_FILE': os.path.join(workdir, 'metrics.prom'),
+        'METRICS_PORT': '0',
+    })
+
+
+def run_scenario(scenario: Scenario, server: StubServer, profile: StubProfile):
+    """
+    Produces the scenario's articles against the stub and measures them.
+
+    Returns:
+        dict: Throughput, latency percentiles and the stub's request counts.
+    """
+    # Imported after the environment points at the stub
+    from main import ContentTeam
+    from config import get_search_cache_config
+    from tools.search_cache import SearchCache
+
+    server.set_profile(StubProfile(ttft=profile.ttft, tokens_per_second=profile.tokens_per_second,
+                                   sections=scenario.sections, section_words=scenario.section_words))
+    team = ContentTeam(max_workers=scenario.max_workers, writer_mode=scenario.writer_mode, checkpoint_dir=None)
+    topics = [f"Benchmark {scenario.name} topic {i}" for i in range(scenario.articles)]
+    bypass_cache = scenario.cache == "cold"
+
+    def produce(topic):
+        start = time.perf_counter()
+        team.run(topic, bypass_cache=bypass_cache)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, scenario.concurrency)) as executor:
+        if scenario.cache == "warm":
+            list(executor.map(produce, topics))
+        else:
+            SearchCache(**get_search_cache_config()).clear()
+
+        server.stats.reset()
+        start = time.perf_counter()
+        latencies = list(executor.map(produce, topics))
+        wall = time.perf_counter() - start
+    team.writer_executor.shutdown()
+
+    return {
+        'scenario': scenario.name,
+        'articles': len(latencies),
+        'concurrency': scenario.concurrency,
+        'cache': scenario.cache,
+        'writer_mode': scenario.writer_mode,
+        'wall_seconds': round(wall, 3),
+        'articles_per_minute': round(len(latencies) / wall * 60, 2) if wall else 0.0,
+        'p50': round(percentile(latencies, 50), 3),
+        'p95': round(percentile(latencies, 95), 3),
+        'p99': round(percentile(latencies, 99), 3),
+        'llm': server.stats.snapshot(),
+    }
+
+
+def print_report(results: list):
+    print(f"\n{'scenario':<20} {'n':>3} {'conc':>4} {'cache':>5} {'art/min':>8} "
+          f"{'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'LLM req':>7} {'out tok':>8}")
+    for result in results:
+        print(
+            f"{result['scenario']:<20} {result['articles']:>3} {result['concurrency']:>4} {result['cache']:>5}"
+            f" {result['articles_per_minute']:>8.2f} {result['p50']:>7.2f} {result['p95']:>7.2f}"
+            f" {result['p99']:>7.2f} {result['llm']['requests']:>7} {result['llm']['completion_tokens']:>8}"
+        )
+    print("\nLatency is per article; LLM requests and tokens are counted by the stub during measurement.")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the full pipeline offline against a local LLM stub and a stub Tavily backend."
+    )
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--scenarios", nargs="+", help="Only run the scenarios with these names.")
+    parser.add_argument("--ttft", type=float, default=0.3, help="Stub seconds before the first token.")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Stub decode speed; 0 is instant.")
+    parser.add_argument("--search-latency", type=float, default=0.5, help="Stub seconds per Tavily search.")
+    parser.add_argument("--json", type=str, help="Also write the results to this JSON file.")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output.")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SUITES[args.suite] if not args.scenarios or s.name in args.scenarios]
+    if not scenarios:
+        parser.error("No scenario matches --scenarios.")
+
+    profile = StubProfile(ttft=args.ttft, tokens_per_second=args.tokens_per_second)
+    server = StubServer(profile=profile).start()
+    json_path = os.path.abspath(args.json) if args.json else None
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="content-team-bench-") as workdir:
+        configure_offline_environment(server.url, workdir, args.search_latency)
+        # Articles, traces and caches are written under the scratch directory
+        original_dir = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for scenario in scenarios:
+                print(f"Running scenario '{scenario.name}'...", flush=True)
+                output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+                with output:
+                    results.append(run_scenario(scenario, server, profile))
+        finally:
+            os.chdir(original_dir)
+            server.shutdown()
+
+    print_report(results)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+        print(f"Results written to {json_path}")
+
+
+if __name__ == '__main__':
+    main()
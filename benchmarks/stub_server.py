@@ -0,0 +1,340 @@
+import sys
+import os
+import re
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from token_utils import estimate_tokens, estimate_message_tokens
+
+FILLER_WORDS = (
+    "teams adopt new tools when they measurably shorten the path from idea to production "
+    "and the most useful results come from small experiments repeated often with clear metrics"
+).split()
+
+
+class StubProfile:
+    """
+    How the stub model behaves: its speed and the size of what it writes.
+    """
+
+    def __init__(self, ttft: float = 0.3, tokens_per_second: float = 50.0,
+                 sections: int = 5, section_words: int = 170, chunk_words: int = 4):
+        """
+        Args:
+            ttft (float): Seconds before the first token of every response.
+            tokens_per_second (float): The decode speed; 0 returns the text instantly.
+            sections (int): The number of items in a generated outline.
+            section_words (int): The length of each written section.
+            chunk_words (int): The number of words per streamed chunk.
+        """
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.sections = sections
+        self.section_words = section_words
+        self.chunk_words = chunk_words
+
+
+class StubStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.tool_calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def record(self, prompt_tokens: int, completion_tokens: int, tool_call: bool):
+        with self._lock:
+            self.requests += 1
+            self.tool_calls += int(tool_call)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'tool_calls': self.tool_calls,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+            }
+
+
+def _text(message: dict):
+    content = message.get('content') or ''
+    if isinstance(content, list):
+        content = ''.join(item.get('text', '') for item in content if isinstance(item, dict))
+    return content
+
+
+def _filler(words: int, seed: str = ""):
+    offset = sum(map(ord, seed)) % len(FILLER_WORDS)
+    return " ".join(FILLER_WORDS[(offset + i) % len(FILLER_WORDS)] for i in range(words))
+
+
+class StubModel:
+    """
+    Decides what the stub answers. It recognises each agent by its system prompt
+    and produces an answer of the right shape: an outline as JSON, a tool call
+    followed by a section, an empty edit list, or the draft echoed back as the
+    "polished" text.
+    """
+
+    def __init__(self, profile: StubProfile):
+        self.profile = profile
+
+    @staticmethod
+    def tool_names(request: dict, system: str):
+        names = [tool['function']['name'] for tool in request.get('tools') or [] if 'function' in tool]
+        names += [function['name'] for function in request.get('functions') or []]
+        if not names:
+            # Prompt-based function calling lists the tools inside the system message
+            names = re.findall(r'"name(?:_for_model)?"\s*:\s*"([\w-]+)"', system)
+        return names
+
+    @staticmethod
+    def has_tool_result(messages: list):
+        for message in messages:
+            if message.get('role') in ('tool', 'function'):
+                return True
+            if '✿RESULT✿' in _text(message) or '<tool_response>' in _text(message):
+                return True
+        return False
+
+    def respond(self, request: dict):
+        """
+        Returns:
+            tuple: (text, tool_call) where tool_call is a (name, arguments) pair or None.
+        """
+        messages = request.get('messages') or []
+        system = "\n".join(_text(m) for m in messages if m.get('role') == 'system')
+        user = next((_text(m) for m in reversed(messages) if m.get('role') == 'user'), "")
+
+        if "list of edits" in system:
+            return "[]", None
+        if "content strategist" in system:
+            items = ["Introduction"] + [f"Section {i}: Key point {i}" for i in range(2, self.profile.sections)] + ["Conclusion"]
+            return json.dumps({"outline": items[:max(1, self.profile.sections)]}), None
+        if "image_gen" in system:
+            return "![Cover image](https://example.com/cover.png)", None
+        if "blog writer" in system:
+            if "tavily_search" in self.tool_names(request, system) and not self.has_tool_result(messages):
+                return "", ("tavily_search", json.dumps({"query": user.strip()[:200]}))
+            return _filler(self.profile.section_words, user) + " [source](https://example.com/source)", None
+        # The reviewer prompts: return the text being polished unchanged
+        return self.text_to_polish(user), None
+
+    @staticmethod
+    def text_to_polish(user: str):
+        """
+        Picks the text a reviewer prompt asks to polish, without the context and
+        instructions around it (see ReviewerAgent.polish_chunk and smooth_transition).
+        """
+        if "is followed by this paragraph:" in user:
+            # A transition: the second <<< >>> block is the paragraph to rewrite
+            blocks = re.findall(r"<<<\n(.*?)\n>>>", user, re.DOTALL)
+            return blocks[1] if len(blocks) > 1 else user
+        marker = user.find("Polish only the text below.")
+        if marker != -1:
+            # A chunk: everything after the instruction paragraph
+            start = user.find("\n\n", marker)
+            return user[start + 2:] if start != -1 else user
+        # A full review or edit-less fallback: the prompt is the draft itself
+        return user
+
+    @staticmethod
+    def prompt_tool_call(system: str, name: str, arguments: str):
+        """
+        Formats a tool call for prompt-based function calling (qwen-agent's default
+        for OpenAI-compatible servers), matching the template in the system message.
+        """
+        if "<tool_call>" in system:
+            return f'<tool_call>\n{{"name": "{name}", "arguments": {arguments}}}\n</tool_call>'
+        return f"✿FUNCTION✿: {name}\n✿ARGS✿: {arguments}"
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json({'object': 'list', 'data': [{'id': 'stub', 'object': 'model'}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_error(400, "Invalid JSON")
+            return
+
+        server = self.server
+        text, tool_call = server.model.respond(request)
+        messages = request.get('messages') or []
+        native_tools = bool(request.get('tools'))
+        if tool_call and not native_tools:
+            system = "\n".join(_text(m) for m in messages if m.get('role') == 'system')
+            text, tool_call = server.model.prompt_tool_call(system, *tool_call), None
+
+        prompt_tokens = estimate_message_tokens(messages)
+        completion_tokens = estimate_tokens(text) + (estimate_tokens(tool_call[1]) if tool_call else 0)
+        server.stats.record(prompt_tokens, completion_tokens, tool_call is not None or "✿FUNCTION✿" in text)
+
+        time.sleep(server.profile.ttft)
+        response_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        if request.get('stream'):
+            self._stream(response_id, request, text, tool_call, prompt_tokens, completion_tokens)
+        else:
+            self._sleep_for_tokens(completion_tokens)
+            message = {'role': 'assistant', 'content': text or None}
+            if tool_call:
+                message['tool_calls'] = [self._tool_call(tool_call)]
+            self._send_json({
+                'id': response_id,
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': request.get('model', 'stub'),
+                'choices': [{'index': 0, 'message': message,
+                             'finish_reason': 'tool_calls' if tool_call else 'stop'}],
+                'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                          'total_tokens': prompt_tokens + completion_tokens},
+            })
+
+    def _sleep_for_tokens(self, tokens: int):
+        if self.server.profile.tokens_per_second > 0:
+            time.sleep(tokens / self.server.profile.tokens_per_second)
+
+    @staticmethod
+    def _tool_call(tool_call):
+        name, arguments = tool_call
+        return {'id': f"call_{uuid.uuid4().hex[:8]}", 'type': 'function',
+                'function': {'name': name, 'arguments': arguments}}
+
+    def _send_json(self, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, response_id, request, text, tool_call, prompt_tokens, completion_tokens):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(delta, finish_reason=None, usage=None):
+            chunk = {
+                'id': response_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': request.get('model', 'stub'),
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+            if usage:
+                chunk['usage'] = usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            send({'role': 'assistant', 'content': ''})
+            if tool_call:
+                call = self._tool_call(tool_call)
+                self._sleep_for_tokens(completion_tokens)
+                send({'tool_calls': [{'index': 0, **call}]})
+            else:
+                # Keep the whitespace so the chunks join back into the exact text
+                pieces = re.findall(r"\S+\s*|\s+", text)
+                step = max(1, self.server.profile.chunk_words)
+                for start in range(0, len(pieces), step):
+                    piece = "".join(pieces[start:start + step])
+                    self._sleep_for_tokens(estimate_tokens(piece))
+                    send({'content': piece})
+            send({}, finish_reason='tool_calls' if tool_call else 'stop',
+                 usage={'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                        'total_tokens': prompt_tokens + completion_tokens})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. a cancelled request
+            pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    A local OpenAI-compatible chat completions server with a configurable
+    latency model, for benchmarking the pipeline offline and reproducibly.
+
+    Point the agents at it with LLM_MODEL_SERVER=<server.url>. The profile can
+    be swapped between scenarios while the server runs.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, profile: StubProfile = None):
+        super().__init__((host, port), StubRequestHandler)
+        self.profile = profile or StubProfile()
+        self.model = StubModel(self.profile)
+        self.stats = StubStats()
+
+    def set_profile(self, profile: StubProfile):
+        self.profile = profile
+        self.model = StubModel(profile)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """
+        Serves requests from a background thread and returns the server.
+        """
+        threading.Thread(target=self.serve_forever, name="stub-llm-server", daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub of the LLM API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ttft", type=float, default=0.3, help="Seconds before the first token.")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Decode speed; 0 is instant.")
+    parser.add_argument("--sections", type=int, default=5, help="Items per generated outline.")
+    parser.add_argument("--section-words", type=int, default=170, help="Words per written section.")
+    args = parser.parse_args()
+
+    profile = StubProfile(ttft=args.ttft, tokens_per_second=args.tokens_per_second,
+                          sections=args.sections, section_words=args.section_words)
+    server = StubServer(args.host, args.port, profile)
+    print(f"Stub LLM server listening on {server.url}")
+    print(f"Run the pipeline against it with: LLM_MODEL_SERVER={server.url} TAVILY_BACKEND=stub")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
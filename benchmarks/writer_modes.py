@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+import argparse
+import statistics
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.writer_agent import WriterAgent, WRITER_MODES
+from agents.llm_cache import collect_response
+from token_utils import estimate_tokens, estimate_message_tokens
+
+SAMPLE_SECTIONS = [
+    "Introduction: Why AI Matters for Software Teams",
+    "Section 2: Enhanced Code Quality and Debugging",
+    "Section 3: AI-Assisted Testing",
+    "Conclusion: Preparing for the Next Decade",
+]
+
+
+def measure_section(writer: WriterAgent, section_topic: str):
+    """
+    Writes one section without the LLM cache and reports its cost.
+
+    Returns:
+        dict: Latency in seconds, the number of LLM calls and the estimated
+            input and output tokens across those calls.
+    """
+    start = time.perf_counter()
+    messages = writer.build_messages(section_topic)
+    response = collect_response(writer.agent, messages)
+    latency = time.perf_counter() - start
+
+    # Every assistant message in the final response is one LLM call. Each call
+    # re-reads the system prompt, the user message and everything produced so far.
+    system_tokens = estimate_tokens(writer.agent.system_message) if hasattr(writer.agent, 'system_message') else 0
+    conversation = list(messages)
+    llm_calls = 0
+    input_tokens = 0
+    output_tokens = 0
+    for message in response:
+        if message.get('role') == 'assistant':
+            llm_calls += 1
+            input_tokens += system_tokens + estimate_message_tokens(conversation)
+            output_tokens += estimate_message_tokens([message])
+        conversation.append(message)
+
+    return {
+        'latency': latency,
+        'llm_calls': llm_calls,
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the latency and token use of the writer modes.")
+    parser.add_argument("--modes", nargs="+", choices=WRITER_MODES, default=list(WRITER_MODES))
+    parser.add_argument("--repeat", type=int, default=1, help="How many times each section is written per mode.")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'sections':>8} {'p50 s':>8} {'mean s':>8} {'LLM calls':>10} {'in tok':>8} {'out tok':>8}")
+    for mode in args.modes:
+        writer = WriterAgent(use_cache=False, mode=mode)
+        runs = [
+            measure_section(writer, section_topic)
+            for _ in range(args.repeat)
+            for section_topic in SAMPLE_SECTIONS
+        ]
+        latencies = [run['latency'] for run in runs]
+        print(
+            f"{mode:<8} {len(runs):>8} {statistics.median(latencies):>8.2f} {statistics.mean(latencies):>8.2f}"
+            f" {sum(run['llm_calls'] for run in runs) / len(runs):>10.1f}"
+            f" {sum(run['input_tokens'] for run in runs) // len(runs):>8}"
+            f" {sum(run['output_tokens'] for run in runs) // len(runs):>8}"
+        )
+    print("\nToken counts are local estimates, averaged per section.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import os
+import json
+import hashlib
+
+from storage import topic_slug, write_atomic
+
+DEFAULT_CHECKPOINT_DIR = "checkpoints"
+
+
+def content_hash(text: str):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class RunCheckpoint:
+    """
+    Persists the output of every pipeline stage for one topic, so a failed or
+    interrupted run can pick up where it stopped.
+
+    Layout of `<root>/<topic>_<hash>/`, where the hash of the exact topic keeps
+    topics with the same file name part (e.g. "C++ tips" and "C tips") apart:
+        outline.json             the outline
+        sections/<hash>.json     one draft per section, keyed on the section's outline text
+        review.json              the polished text, with a hash of the draft it was made from
+        image.json               the cover image URL
+
+    Because drafts are keyed on their outline text, editing or regenerating the
+    outline only invalidates the sections whose text actually changed. Every
+    file also records the topic, and files of another topic are never reused.
+    """
+
+    def __init__(self, topic: str, root: str = DEFAULT_CHECKPOINT_DIR):
+        self.topic = topic
+        slug = topic_slug(topic)
+        self.directory = os.path.join(root, f"{slug}_{content_hash(topic)}" if slug else content_hash(topic))
+        os.makedirs(os.path.join(self.directory, "sections"), exist_ok=True)
+
+    def _read(self, name: str):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Ignoring unreadable checkpoint '{path}'. Error: {e}")
+            return None
+        if not isinstance(record, dict) or record.get("topic") != self.topic:
+            print(f"Warning: Ignoring checkpoint '{path}', which belongs to another topic.")
+            return None
+        return record
+
+    def _write(self, name: str, value: dict):
+        # Written atomically so a crash never leaves a half-written checkpoint
+        write_atomic(os.path.join(self.directory, name),
+                     json.dumps({"topic": self.topic, **value}, ensure_ascii=False, indent=2))
+
+    def load_outline(self):
+        record = self._read("outline.json")
+        return record["outline"] if record else None
+
+    def save_outline(self, outline: list):
+        self._write("outline.json", {"outline": outline})
+
+    def load_section(self, section_topic: str):
+        record = self._read(os.path.join("sections", f"{content_hash(section_topic)}.json"))
+        # Guard against hash collisions by checking the stored outline text
+        if record and record.get("section_topic") == section_topic:
+            return record["content"]
+        return None
+
+    def save_section(self, section_topic: str, content: str):
+        self._write(
+            os.path.join("sections", f"{content_hash(section_topic)}.json"),
+            {"section_topic": section_topic, "content": content},
+        )
+
+    def load_review(self, full_draft: str):
+        """
+        Returns the polished text, but only if it was made from this exact draft.
+        """
+        record = self._read("review.json")
+        if record and record.get("draft_hash") == content_hash(full_draft):
+            return record["content"]
+        return None
+
+    def save_review(self, full_draft: str, content: str):
+        self._write("review.json", {"draft_hash": content_hash(full_draft), "content": content})
+
+    def load_image(self):
+        record = self._read("image.json")
+        return record["image_url"] if record else None
+
+    def save_image(self, image_url: str):
+        self._write("image.json", {"image_url": image_url})
@@ -1,41 +1,572 @@
 import os
-from dotenv import load_dotenv
+import threading
+from types import MappingProxyType
+from dataclasses import dataclass
+from functools import lru_cache
+
+# The valid agent modes, kept here so they can be checked without importing the agents
+WRITER_MODES = ("tool", "direct")
+REVIEW_MODES = ("full", "chunked", "edits")
+TAVILY_BACKENDS = ("tavily", "stub")
+
+DEFAULT_MODEL = 'qwen-max-latest'
+DEFAULT_MODEL_SERVER = 'https://dashscope-intl.aliyuncs.com/compatible-mode/v1'
+
+# Model tiers, from the fastest and cheapest to the most capable
+FAST_TIER = "fast"
+MAX_TIER = "max"
+MODEL_TIERS = (FAST_TIER, MAX_TIER)
+DEFAULT_TIER_MODELS = {FAST_TIER: 'qwen-plus-latest', MAX_TIER: DEFAULT_MODEL}
+
+# The LLM tasks that can be routed to a tier. Outlines, image prompts and the
+# short transition rewrites of the chunked review are simple enough for the
+# fast tier; the outline escalates to the max tier if its JSON is malformed.
+AGENT_NAMES = ("outline", "writer", "reviewer", "transition", "image")
+DEFAULT_AGENT_TIERS = "outline=fast,writer=max,reviewer=max,transition=fast,image=fast"
+
+# Estimated tokens of retrieved context (search results) an agent's prompt may
+# carry; larger context is compressed, see tools/context_budget.py. 0 is unlimited.
+DEFAULT_CONTEXT_BUDGETS = "writer=700"
+
+_environment_lock = threading.Lock()
+_environment_loaded = False
 
 def configure_environment():
     """
     Loads environment variables from a .env file and sets them
     in the environment. This is a best practice for managing secrets
     like API keys.
+
+    The file is only read once per process; later calls return immediately.
     """
-    # Load environment variables from .env file
-    load_dotenv()
+    global _environment_loaded
+    with _environment_lock:
+        if _environment_loaded:
+            return
+
+        # Imported here so that importing config stays cheap
+        from dotenv import load_dotenv
+
+        # Load environment variables from .env file
+        load_dotenv()
+        _environment_loaded = True
 
-    # You can add other configurations here later if needed
-    # For example, setting up model names or other constants.
-    
     print("Environment configured.")
 
-def get_llm_config():
+def _env_flag(name: str, default: str = ""):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+def _env_float(name: str):
+    value = os.getenv(name, "")
+    return float(value) if value else None
+
+def parse_agent_tiers(spec: str):
+    """
+    Parses an agent-to-tier mapping such as "outline=fast,writer=max".
+
+    Raises:
+        ValueError: If an agent or tier name is unknown.
+    """
+    tiers = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        agent_name, _, tier = item.partition("=")
+        agent_name, tier = agent_name.strip().lower(), tier.strip().lower()
+        if agent_name not in AGENT_NAMES:
+            raise ValueError(f"Unknown agent '{agent_name}'. Choose from: {', '.join(AGENT_NAMES)}.")
+        if tier not in MODEL_TIERS:
+            raise ValueError(f"Unknown model tier '{tier}' for '{agent_name}'. Choose from: {', '.join(MODEL_TIERS)}.")
+        tiers[agent_name] = tier
+    return tiers
+
+def parse_context_budgets(spec: str):
+    """
+    Parses an agent-to-token-budget mapping such as "writer=700".
+
+    Raises:
+        ValueError: If an agent name is unknown or a budget is not a whole number.
+    """
+    budgets = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        agent_name, _, budget = item.partition("=")
+        agent_name = agent_name.strip().lower()
+        if agent_name not in AGENT_NAMES:
+            raise ValueError(f"Unknown agent '{agent_name}'. Choose from: {', '.join(AGENT_NAMES)}.")
+        try:
+            budgets[agent_name] = max(0, int(budget))
+        except ValueError:
+            raise ValueError(f"The context budget for '{agent_name}' must be a number of tokens, got '{budget.strip()}'.")
+    return budgets
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """
+    The model settings of one tier. Unset (None) values use the server's defaults.
+    """
+    model: str
+    model_server: str
+    max_tokens: int = None
+    temperature: float = None
+    timeout: float = None
+
+def _model_profile(tier: str, default_server: str):
+    prefix = f"LLM_{tier.upper()}_"
+    default_model = os.getenv("LLM_MODEL", DEFAULT_MODEL) if tier == MAX_TIER else DEFAULT_TIER_MODELS[tier]
+    max_tokens = os.getenv(prefix + "MAX_TOKENS", "")
+    return ModelProfile(
+        model=os.getenv(prefix + "MODEL", default_model),
+        model_server=os.getenv(prefix + "MODEL_SERVER", default_server),
+        max_tokens=int(max_tokens) if max_tokens else None,
+        temperature=_env_float(prefix + "TEMPERATURE"),
+        timeout=_env_float(prefix + "TIMEOUT"),
+    )
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Every setting read from the environment, loaded once and never modified.
+    Use `get_settings()` to obtain the shared instance.
+    """
+    dashscope_api_key: str
+    tavily_api_key: str
+    model: str
+    model_server: str
+    model_profiles: MappingProxyType
+    agent_tiers: MappingProxyType
+    context_budgets: MappingProxyType
+
+    tavily_backend: str
+    tavily_stub_latency: float
+    tavily_cache_disabled: bool
+    tavily_cache_path: str
+    tavily_cache_ttl: float
+    tavily_cache_max_entries: int
+
+    llm_cache_backend: str
+    llm_cache_path: str
+    llm_cache_ttl: float
+    llm_cache_max_entries: int
+    llm_cache_agents: frozenset
+
+    writer_mode: str
+    writer_query_template: str
+    writer_speculative: bool
+
+    research_prefetch: bool
+    research_max_results: int
+    research_top_k: int
+
+    review_mode: str
+    review_token_budget: int
+    review_context_tokens: int
+    review_smooth_transitions: bool
+
+    metrics_file: str
+    metrics_port: int
+    metrics_host: str
+
+    llm_rps: float
+    llm_tpm: float
+    llm_max_concurrency: int
+    tavily_rps: float
+    tavily_max_concurrency: int
+    upstream_max_retries: int
+    upstream_breaker_threshold: int
+    upstream_breaker_reset: float
+
+    hedge_enabled: bool
+    hedge_percentile: float
+    hedge_budget: float
+    hedge_min_samples: int
+
+    app_workers: int
+    app_max_queued: int
+
+    article_store_path: str
+    article_markdown_dir: str
+
+    topic_reuse_enabled: bool
+    topic_index_path: str
+    topic_similarity_threshold: float
+    topic_reuse_max_age_seconds: float
+
+    work_queue_path: str
+    work_queue_lease_seconds: float
+    work_queue_max_attempts: int
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """
+    Returns the process-wide settings, reading the .env file and the environment
+    the first time it is called.
+
+    Raises:
+        ValueError: If a setting has an invalid value.
+    """
+    configure_environment()
+
+    writer_mode = os.getenv("WRITER_MODE", "tool").lower()
+    if writer_mode not in WRITER_MODES:
+        raise ValueError(f"WRITER_MODE must be 'tool' or 'direct', got '{writer_mode}'.")
+
+    review_mode = os.getenv("REVIEW_MODE", "full").lower()
+    if review_mode not in REVIEW_MODES:
+        raise ValueError(f"REVIEW_MODE must be 'full', 'chunked' or 'edits', got '{review_mode}'.")
+
+    tavily_backend = os.getenv("TAVILY_BACKEND", "tavily").lower()
+    if tavily_backend not in TAVILY_BACKENDS:
+        raise ValueError(f"TAVILY_BACKEND must be 'tavily' or 'stub', got '{tavily_backend}'.")
+
+    model_server = os.getenv("LLM_MODEL_SERVER", DEFAULT_MODEL_SERVER)
+    agent_tiers = parse_agent_tiers(DEFAULT_AGENT_TIERS)
+    agent_tiers.update(parse_agent_tiers(os.getenv("AGENT_MODELS", "")))
+    context_budgets = parse_context_budgets(DEFAULT_CONTEXT_BUDGETS)
+    context_budgets.update(parse_context_budgets(os.getenv("CONTEXT_BUDGETS", "")))
+
+    # Not the image agent: its URLs are signed and expire long before the cache TTL
+    cache_agents = os.getenv("LLM_CACHE_AGENTS", "outline,writer,reviewer")
+
+    return Settings(
+        dashscope_api_key=os.getenv("DASHSCOPE_API_KEY", ""),
+        tavily_api_key=os.getenv("TAVILY_API_KEY", ""),
+        # We are selecting qwen-max because content creation benefits from the
+        # strongest model and a large context window. LLM_MODEL_SERVER points the
+        # agents at any other OpenAI-compatible server, e.g. the benchmark stub.
+        model=os.getenv("LLM_MODEL", DEFAULT_MODEL),
+        model_server=model_server,
+        model_profiles=MappingProxyType({tier: _model_profile(tier, model_server) for tier in MODEL_TIERS}),
+        agent_tiers=MappingProxyType(agent_tiers),
+        context_budgets=MappingProxyType(context_budgets),
+
+        tavily_backend=tavily_backend,
+        tavily_stub_latency=float(os.getenv("TAVILY_STUB_LATENCY", 0.5)),
+
+        tavily_cache_disabled=_env_flag("TAVILY_CACHE_DISABLED"),
+        tavily_cache_path=os.getenv("TAVILY_CACHE_PATH", os.path.join(".cache", "tavily_search.sqlite3")),
+        tavily_cache_ttl=float(os.getenv("TAVILY_CACHE_TTL", 24 * 60 * 60)),
+        tavily_cache_max_entries=int(os.getenv("TAVILY_CACHE_MAX_ENTRIES", 10000)),
+
+        llm_cache_backend=os.getenv("LLM_CACHE_BACKEND", "none").lower(),
+        llm_cache_path=os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_responses.sqlite3")),
+        llm_cache_ttl=float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 60 * 60)),
+        llm_cache_max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000)),
+        llm_cache_agents=frozenset(name.strip() for name in cache_agents.split(",") if name.strip()),
+
+        writer_mode=writer_mode,
+        writer_query_template=os.getenv("WRITER_QUERY_TEMPLATE", "{topic}"),
+        writer_speculative=_env_flag("WRITER_SPECULATIVE", "false"),
+
+        research_prefetch=_env_flag("RESEARCH_PREFETCH"),
+        research_max_results=int(os.getenv("RESEARCH_MAX_RESULTS", 5)),
+        research_top_k=int(os.getenv("RESEARCH_TOP_K", 4)),
+
+        review_mode=review_mode,
+        review_token_budget=int(os.getenv("REVIEW_TOKEN_BUDGET", 1200)),
+        review_context_tokens=int(os.getenv("REVIEW_CONTEXT_TOKENS", 80)),
+        review_smooth_transitions=_env_flag("REVIEW_SMOOTH_TRANSITIONS", "true"),
+
+        metrics_file=os.getenv("METRICS_FILE", os.path.join("outputs", "metrics.prom")),
+        metrics_port=int(os.getenv("METRICS_PORT", 0)),
+        metrics_host=os.getenv("METRICS_HOST", "127.0.0.1"),
+
+        llm_rps=float(os.getenv("LLM_RPS", 0)),
+        llm_tpm=float(os.getenv("LLM_TPM", 0)),
+        llm_max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 8)),
+        tavily_rps=float(os.getenv("TAVILY_RPS", 0)),
+        tavily_max_concurrency=int(os.getenv("TAVILY_MAX_CONCURRENCY", 8)),
+        upstream_max_retries=int(os.getenv("UPSTREAM_MAX_RETRIES", 4)),
+        upstream_breaker_threshold=int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", 5)),
+        upstream_breaker_reset=float(os.getenv("UPSTREAM_BREAKER_RESET", 30)),
+
+        hedge_enabled=_env_flag("HEDGE_ENABLED"),
+        hedge_percentile=float(os.getenv("HEDGE_PERCENTILE", 95)),
+        hedge_budget=float(os.getenv("HEDGE_BUDGET", 0.1)),
+        hedge_min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", 10)),
+
+        app_workers=int(os.getenv("APP_WORKERS", 2)),
+        app_max_queued=int(os.getenv("APP_MAX_QUEUED", 8)),
+
+        article_store_path=os.getenv("ARTICLE_STORE_PATH", os.path.join("outputs", "articles.sqlite3")),
+        article_markdown_dir=os.getenv("ARTICLE_MARKDOWN_DIR", "outputs"),
+
+        topic_reuse_enabled=_env_flag("TOPIC_REUSE_ENABLED", "false"),
+        topic_index_path=os.getenv("TOPIC_INDEX_PATH", os.path.join(".cache", "topics.sqlite3")),
+        topic_similarity_threshold=float(os.getenv("TOPIC_SIMILARITY_THRESHOLD", 0.7)),
+        topic_reuse_max_age_seconds=float(os.getenv("TOPIC_REUSE_MAX_AGE_SECONDS", 86400)),
+
+        work_queue_path=os.getenv("WORK_QUEUE_PATH", os.path.join("queue", "jobs.sqlite3")),
+        work_queue_lease_seconds=float(os.getenv("WORK_QUEUE_LEASE_SECONDS", 120)),
+        work_queue_max_attempts=int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", 3)),
+    )
+
+def get_agent_tier(agent_name: str = None):
+    """
+    Returns the model tier an agent is routed to (AGENT_MODELS), "max" by default.
+    """
+    return get_settings().agent_tiers.get(agent_name, MAX_TIER)
+
+def get_context_budget(agent_name: str):
+    """
+    Returns the estimated tokens of retrieved context an agent's prompt may carry
+    (CONTEXT_BUDGETS), or 0 for no limit.
+    """
+    return get_settings().context_budgets.get(agent_name, 0)
+
+def get_escalation_tier(tier: str):
+    """
+    Returns the next more capable tier, or None if `tier` is already the largest.
+    """
+    index = MODEL_TIERS.index(tier)
+    return MODEL_TIERS[index + 1] if index + 1 < len(MODEL_TIERS) else None
+
+def get_llm_config(agent_name: str = None, tier: str = None):
     """
     Prepares the LLM configuration dictionary for the Qwen-Agent.
     It fetches the API key from the environment variables.
+
+    Args:
+        agent_name (str): The task the model is for, e.g. "outline". Its tier
+            comes from AGENT_MODELS.
+        tier (str): "fast" or "max", overriding the agent's tier.
+            Without either, the max tier is used.
     """
-    # Ensure the environment is configured before accessing keys
-    configure_environment()
-    
-    api_key = os.getenv("DASHSCOPE_API_KEY")
+    settings = get_settings()
 
-    if not api_key:
+    if not settings.dashscope_api_key:
         raise ValueError("DASHSCOPE_API_KEY not found in environment variables. "
                          "Please check your .env file.")
 
+    profile = settings.model_profiles[tier or get_agent_tier(agent_name)]
+
     # This is the standard configuration format for using the Dashscope Qwen model
-    # with the qwen-agent framework. We are selecting qwen-long because content
-    # creation can benefit from a larger context window.
+    # with the qwen-agent framework.
+    llm_config = {
+        'model': profile.model,
+        'model_server': profile.model_server,
+        'api_key': settings.dashscope_api_key,
+    }
+    # The generation settings are passed through to the chat completions request
+    generate_cfg = {
+        key: value for key, value in (
+            ('max_tokens', profile.max_tokens),
+            ('temperature', profile.temperature),
+            ('timeout', profile.timeout),
+        ) if value is not None
+    }
+    if generate_cfg:
+        llm_config['generate_cfg'] = generate_cfg
+    return llm_config
+
+def get_search_cache_config():
+    """
+    Prepares the settings for the on-disk Tavily search cache.
+    Every value can be overridden through environment variables.
+
+    Returns:
+        dict: The cache settings, or None if caching is disabled.
+    """
+    settings = get_settings()
+    if settings.tavily_cache_disabled:
+        return None
+
+    return {
+        'path': settings.tavily_cache_path,
+        'ttl_seconds': settings.tavily_cache_ttl,
+        'max_entries': settings.tavily_cache_max_entries,
+    }
+
+def get_llm_cache_config():
+    """
+    Prepares the settings for the LLM response cache shared by all agents.
+
+    LLM_CACHE_BACKEND selects 'memory', 'disk' or 'none' (the default), and
+    LLM_CACHE_AGENTS lists the agents that take part, e.g. "outline,writer".
+    The image agent is left out by default, since the image URLs it returns expire.
+    """
+    settings = get_settings()
+    return {
+        'backend': settings.llm_cache_backend,
+        'path': settings.llm_cache_path,
+        'ttl_seconds': settings.llm_cache_ttl,
+        'max_entries': settings.llm_cache_max_entries,
+        'agents': set(settings.llm_cache_agents),
+    }
+
+def is_llm_cache_enabled(agent_name: str):
+    """
+    Tells whether the given agent ('outline', 'writer', 'reviewer' or 'image')
+    should use the LLM response cache.
+    """
+    settings = get_settings()
+    return settings.llm_cache_backend != 'none' and agent_name in settings.llm_cache_agents
+
+def get_writer_config():
+    """
+    Prepares the WriterAgent settings.
+
+    WRITER_MODE is "tool" (the model calls the search tool itself) or "direct"
+    (the search runs in Python and the section is written in one LLM call).
+    WRITER_QUERY_TEMPLATE expands the section topic into the search query used
+    in direct mode; it must contain "{topic}". With WRITER_SPECULATIVE (off by
+    default), sections start being written while the outline still streams.
+    """
+    settings = get_settings()
+    return {
+        'mode': settings.writer_mode,
+        'query_template': settings.writer_query_template,
+        'speculative': settings.writer_speculative,
+    }
+
+def get_research_config():
+    """
+    Prepares the settings for the topic-level research prefetch.
+
+    With RESEARCH_PREFETCH enabled, the whole article is researched once right
+    after the outline, and each section is written from the best matching
+    passages instead of running its own search.
+    """
+    settings = get_settings()
+    return {
+        'prefetch': settings.research_prefetch,
+        'max_results': settings.research_max_results,
+        'top_k': settings.research_top_k,
+    }
+
+def get_review_config():
+    """
+    Prepares the ReviewerAgent settings.
+
+    REVIEW_MODE is "full" (the whole draft in one request), "chunked" (groups
+    of sections polished in parallel, each at most REVIEW_TOKEN_BUDGET tokens,
+    with REVIEW_CONTEXT_TOKENS of the neighbouring text as context) or "edits"
+    (the model returns targeted edits that are applied locally).
+    """
+    settings = get_settings()
+    return {
+        'mode': settings.review_mode,
+        'token_budget': settings.review_token_budget,
+        'context_tokens': settings.review_context_tokens,
+        'smooth_transitions': settings.review_smooth_transitions,
+    }
+
+def get_metrics_config():
+    """
+    Prepares the settings for the metrics export.
+
+    METRICS_FILE is where the Prometheus text file is rewritten after every
+    article (empty disables it), and METRICS_PORT serves the same text at
+    /metrics over HTTP (0, the default, disables the endpoint). METRICS_HOST
+    is the address the endpoint binds to: 127.0.0.1 by default, so only local
+    scrapers reach it; set it to 0.0.0.0 to expose it on every interface.
+    """
+    settings = get_settings()
+    return {
+        'file': settings.metrics_file,
+        'port': settings.metrics_port,
+        'host': settings.metrics_host,
+    }
+
+def get_upstream_config(name: str):
+    """
+    Prepares the rate limit, retry and circuit breaker settings for an upstream
+    API: "llm" (the model server) or "tavily".
+
+    LLM_RPS / TAVILY_RPS cap requests per second and LLM_TPM caps estimated
+    tokens per minute (0, the default, means unlimited). LLM_MAX_CONCURRENCY /
+    TAVILY_MAX_CONCURRENCY cap the calls in flight; the cap shrinks while the
+    upstream is throttling us. UPSTREAM_MAX_RETRIES, UPSTREAM_BREAKER_THRESHOLD
+    and UPSTREAM_BREAKER_RESET apply to both.
+    """
+    settings = get_settings()
+    if name == "llm":
+        limits = {'rps': settings.llm_rps, 'tpm': settings.llm_tpm,
+                  'max_concurrency': settings.llm_max_concurrency}
+    elif name == "tavily":
+        limits = {'rps': settings.tavily_rps, 'tpm': 0,
+                  'max_concurrency': settings.tavily_max_concurrency}
+    else:
+        raise ValueError(f"Unknown upstream '{name}'.")
+
     return {
-        'model': 'qwen-max-latest',
-        'model_server': 'https://dashscope-intl.aliyuncs.com/compatible-mode/v1',
-        'api_key': api_key,
+        **limits,
+        'max_retries': settings.upstream_max_retries,
+        'breaker_threshold': settings.upstream_breaker_threshold,
+        'breaker_reset': settings.upstream_breaker_reset,
+    }
+
+def get_hedge_config():
+    """
+    Prepares the request hedging settings.
+
+    With HEDGE_ENABLED, a section write or search that is still running after
+    the HEDGE_PERCENTILE-th percentile of recent latencies (once
+    HEDGE_MIN_SAMPLES calls were seen) is duplicated, and the first answer wins.
+    HEDGE_BUDGET caps the duplicates per call on average, e.g. 0.1 for at most
+    about 10% extra calls.
+    """
+    settings = get_settings()
+    return {
+        'enabled': settings.hedge_enabled,
+        'percentile': settings.hedge_percentile,
+        'budget': settings.hedge_budget,
+        'min_samples': settings.hedge_min_samples,
+    }
+
+def get_app_config():
+    """
+    Prepares the web UI's job queue settings: APP_WORKERS articles are produced
+    at once, each by its own ContentTeam, and up to APP_MAX_QUEUED more requests
+    wait in line before new ones are turned away.
+    """
+    settings = get_settings()
+    return {
+        'workers': settings.app_workers,
+        'max_queued': settings.app_max_queued,
+    }
+
+def get_article_store_config():
+    """
+    Prepares the article store: the SQLite database every finished article is
+    saved to (ARTICLE_STORE_PATH), and the folder its markdown copies are written
+    to (ARTICLE_MARKDOWN_DIR; set it to an empty value to keep articles in the
+    database only).
+    """
+    settings = get_settings()
+    return {
+        'path': settings.article_store_path,
+        'markdown_dir': settings.article_markdown_dir or None,
+    }
+
+def get_topic_index_config():
+    """
+    Prepares the near-duplicate topic index, which lets a run reuse the outline
+    and research of an earlier topic at least TOPIC_SIMILARITY_THRESHOLD similar
+    (0-1, by character shingles) to its own, for TOPIC_REUSE_MAX_AGE_SECONDS
+    after it was stored. Reuse is opt-in (TOPIC_REUSE_ENABLED).
+    """
+    settings = get_settings()
+    return {
+        'enabled': settings.topic_reuse_enabled,
+        'path': settings.topic_index_path,
+        'threshold': settings.topic_similarity_threshold,
+        'max_age_seconds': settings.topic_reuse_max_age_seconds,
+    }
+
+def get_work_queue_config():
+    """
+    Prepares the durable work queue settings: the SQLite file shared by producers
+    and worker processes (WORK_QUEUE_PATH), how long a worker may go without a
+    heartbeat before its job is handed to another one (WORK_QUEUE_LEASE_SECONDS),
+    and how often a job is started before it is marked failed (WORK_QUEUE_MAX_ATTEMPTS).
+    """
+    settings = get_settings()
+    return {
+        'path': settings.work_queue_path,
+        'lease_seconds': settings.work_queue_lease_seconds,
+        'max_attempts': settings.work_queue_max_attempts,
     }
 
 if __name__ == '__main__':
@@ -47,6 +578,9 @@ if __name__ == '__main__':
         print(f"  Model: {llm_config['model']}")
         print(f"  Model Server: {llm_config['model_server']}")
         print(f"  API Key: {'*' * 10}")
+        print("Agent model routing:")
+        for agent_name in AGENT_NAMES:
+            agent_config = get_llm_config(agent_name)
+            print(f"  {agent_name:<11} {get_agent_tier(agent_name):<5} {agent_config['model']}")
     except ValueError as e:
         print(f"Error: {e}")
-
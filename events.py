@@ -0,0 +1,105 @@
+import threading
+from dataclasses import dataclass, field
+
+# The kinds of events emitted while an article is being produced
+OUTLINE_READY = "outline_ready"        # data: outline
+SECTION_STARTED = "section_started"    # data: index, title
+SECTION_DELTA = "section_delta"        # data: index, text
+SECTION_DONE = "section_done"          # data: index, content
+REVIEW_STARTED = "review_started"      # data: (none)
+REVIEW_DELTA = "review_delta"          # data: text
+REVIEW_DONE = "review_done"            # data: content
+IMAGE_READY = "image_ready"            # data: image_url
+SAVED = "saved"                        # data: article_id, path (None without a markdown copy), content
+HALTED = "halted"                      # data: message
+FINISHED = "finished"                  # data: stage_timings (name -> (start, end) in seconds)
+
+
+class Cancelled(Exception):
+    """
+    Base of the exceptions raised on purpose to stop work early, e.g. from a
+    stream callback. They are control flow, never an upstream failure.
+    """
+
+
+class RunCancelled(Cancelled):
+    """Raised inside a run whose caller cancelled it, e.g. a client that disconnected."""
+
+
+@dataclass
+class PipelineEvent:
+    """
+    A progress update from a running pipeline, e.g. a new piece of section text.
+    """
+    kind: str
+    data: dict = field(default_factory=dict)
+
+
+class RunContext:
+    """
+    Per-run options and callbacks, passed to every stage of a single article run.
+    Keeping them here instead of on ContentTeam lets one team serve several runs at once.
+    """
+
+    def __init__(self, bypass_cache: bool = False, on_event=None, checkpoint=None,
+                 resume: bool = False, incremental: bool = False, cancel_event=None):
+        """
+        Args:
+            bypass_cache (bool): Ignore cached LLM responses and call the models again.
+            on_event (callable): Optional callback receiving every PipelineEvent.
+                It is called from worker threads, so it must be thread-safe.
+            checkpoint (RunCheckpoint): Where stage outputs are persisted, if anywhere.
+            resume (bool): Reuse every checkpointed stage, including the outline.
+            incremental (bool): Generate a new outline, but reuse the checkpointed
+                drafts of sections whose outline text did not change.
+            cancel_event (threading.Event): Once set, the run stops at its next
+                progress event by raising RunCancelled.
+        """
+        self.bypass_cache = bypass_cache
+        self.on_event = on_event
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.incremental = incremental
+        self.cancel_event = cancel_event
+        # Set by the scheduler when a stage fails, so stages still in flight stop
+        # instead of spending more LLM calls on a run that has already failed
+        self.aborted = threading.Event()
+        # Set by the save stage to the article's id in the ArticleStore and the
+        # path of its markdown copy, if any
+        self.article_id = None
+        self.output_path = None
+        # Set by the outline stage when sections are written while the outline
+        # streams, see speculation.SpeculativeSections
+        self.speculation = None
+        # Set by the outline stage when the run reuses the outline (and research)
+        # of a near-duplicate topic, see topic_index.TopicIndex.find
+        self.similar_topic = None
+
+    @property
+    def reuse_checkpoint(self):
+        return self.checkpoint is not None and (self.resume or self.incremental)
+
+    @property
+    def streaming(self):
+        return self.on_event is not None
+
+    @property
+    def cancelled(self):
+        return self.aborted.is_set() or (self.cancel_event is not None and self.cancel_event.is_set())
+
+    def check_cancelled(self):
+        """
+        Raises RunCancelled if the run was cancelled or another of its stages failed.
+        """
+        if self.aborted.is_set():
+            raise RunCancelled("The run was stopped because another stage failed.")
+        if self.cancelled:
+            raise RunCancelled("The run was cancelled.")
+
+    def emit(self, kind: str, **data):
+        # Every stage reports progress, so this is where a cancelled run stops.
+        # The closing events are still delivered.
+        if kind not in (HALTED, FINISHED):
+            self.check_cancelled()
+        if self.on_event is not None:
+            self.on_event(PipelineEvent(kind, data))
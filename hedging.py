@@ -0,0 +1,181 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import metrics
+from config import get_hedge_config
+from events import Cancelled
+
+# Hedged attempts run here, so waiting callers never occupy the pipeline's own pools
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+
+class HedgeCancelled(Cancelled):
+    """Raised inside an attempt that lost the race, to stop it early."""
+
+
+class LatencyTracker:
+    """
+    Tracks the latency distribution of recent calls over a sliding window.
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q: float):
+        """
+        Returns the q-th percentile (0-100) of the recent latencies, or None without samples.
+        """
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        position = (len(ordered) - 1) * q / 100
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class HedgeBudget:
+    """
+    Bounds the extra load hedging creates: every call earns `ratio` of a hedge,
+    up to `burst` saved hedges, and every hedge spends one. Over any period,
+    hedges stay below ratio * calls + burst.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 2.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._credits = burst
+        self._lock = threading.Lock()
+
+    def earn(self):
+        with self._lock:
+            self._credits = min(self.burst, self._credits + self.ratio)
+
+    def spend(self):
+        """
+        Returns:
+            bool: True if a hedge may be sent.
+        """
+        with self._lock:
+            if self._credits >= 1:
+                self._credits -= 1
+                return True
+            return False
+
+
+class Hedger:
+    """
+    Sends a duplicate of a slow call and takes whichever copy finishes first.
+
+    If a call has not finished after the `percentile`-th percentile of the
+    latencies seen so far, a second attempt is started (when the budget
+    allows). The first successful result wins; the loser is told to stop
+    through its `cancelled` event and its result is ignored.
+    """
+
+    def __init__(self, name: str, percentile: float = 95, budget: float = 0.1,
+                 min_samples: int = 10, window: int = 200):
+        """
+        Args:
+            name (str): The label used in metrics, e.g. "writer".
+            percentile (float): The latency percentile after which a hedge is sent.
+            budget (float): The most hedges per call, on average.
+            min_samples (int): Calls observed before hedging starts.
+            window (int): The number of recent calls the percentile is computed over.
+        """
+        self.name = name
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.tracker = LatencyTracker(window)
+        self.budget = HedgeBudget(budget)
+        self._labels = {'name': name}
+
+    def hedge_delay(self):
+        """
+        Returns the seconds to wait before hedging, or None while there is too little data.
+        """
+        if len(self.tracker) < self.min_samples:
+            return None
+        return self.tracker.percentile(self.percentile)
+
+    def _start(self, attempt, is_hedge: bool):
+        cancelled = threading.Event()
+        started = time.perf_counter()
+        future = metrics.submit(_executor, attempt, cancelled, is_hedge)
+        return future, cancelled, started
+
+    def call(self, attempt):
+        """
+        Runs `attempt`, hedging it if it is slow.
+
+        Args:
+            attempt (callable): Called with a threading.Event that is set once the
+                attempt has lost the race, and whether it is the duplicate. It should
+                stop early when it sees the event set, and each call must use its
+                own resources (e.g. its own agent).
+
+        Returns:
+            The result of the first attempt to succeed.
+
+        Raises:
+            Exception: The first error, if every attempt failed.
+        """
+        self.budget.earn()
+        attempts = [self._start(attempt, False)]
+
+        delay = self.hedge_delay()
+        done, _ = wait([attempts[0][0]], timeout=delay)
+        if not done and self.budget.spend():
+            metrics.registry.inc("content_team_hedges_total", {**self._labels, 'outcome': 'sent'},
+                                 help_text="Hedged duplicate calls, by outcome.")
+            attempts.append(self._start(attempt, True))
+
+        errors = []
+        pending = {future for future, _, _ in attempts}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future, cancelled, started in attempts:
+                if future not in done:
+                    continue
+                if future.exception() is not None:
+                    errors.append(future.exception())
+                    continue
+
+                self.tracker.record(time.perf_counter() - started)
+                for _, other_cancelled, _ in attempts:
+                    if other_cancelled is not cancelled:
+                        other_cancelled.set()
+                if len(attempts) > 1:
+                    outcome = 'won' if future is not attempts[0][0] else 'lost'
+                    metrics.registry.inc("content_team_hedges_total", {**self._labels, 'outcome': outcome})
+                return future.result()
+
+        raise errors[0]
+
+
+_hedgers = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(name: str):
+    """
+    Returns the process-wide Hedger for a kind of call ("writer" or "search"),
+    so latencies are tracked across every article.
+    """
+    with _hedgers_lock:
+        if name not in _hedgers:
+            hedge_config = get_hedge_config()
+            _hedgers[name] = Hedger(name, percentile=hedge_config['percentile'], budget=hedge_config['budget'],
+                                    min_samples=hedge_config['min_samples'])
+        return _hedgers[name]
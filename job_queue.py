@@ -0,0 +1,181 @@
+import math
+import time
+import queue
+import uuid
+import threading
+from collections import deque
+
+import metrics
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Put on a job's event queue after its last event
+JOB_FINISHED = object()
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when no more jobs can be accepted."""
+
+
+class ArticleJob:
+    """
+    One requested article, from submission until its last event was delivered.
+    """
+
+    def __init__(self, topic: str, bypass_cache: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.topic = topic
+        self.bypass_cache = bypass_cache
+        self.state = QUEUED
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.error = None
+        # PipelineEvents from the worker, followed by JOB_FINISHED
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class JobQueue:
+    """
+    Admission control for article runs, e.g. from the web UI.
+
+    A fixed number of worker threads each own a separate ContentTeam, so
+    concurrent users never share agents and at most `workers` articles are
+    produced at once. Up to `max_queued` further requests wait in line; beyond
+    that, `submit` fails immediately instead of letting the backlog grow.
+    """
+
+    def __init__(self, team_factory, workers: int = 2, max_queued: int = 8,
+                 initial_article_seconds: float = 90.0):
+        """
+        Args:
+            team_factory (callable): Builds a ContentTeam for a worker.
+            workers (int): The maximum number of articles in flight.
+            max_queued (int): The maximum number of requests waiting for a worker.
+            initial_article_seconds (float): The assumed article duration for
+                ETAs until the first article has finished.
+        """
+        self.workers = max(1, workers)
+        self.max_queued = max(0, max_queued)
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._article_seconds = initial_article_seconds
+        self._threads = []
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(team_factory,),
+                                      name=f"article-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, topic: str, bypass_cache: bool = False):
+        """
+        Queues an article.
+
+        Returns:
+            ArticleJob: The job, whose `events` queue receives its progress.
+
+        Raises:
+            QueueFull: If `max_queued` requests are already waiting.
+        """
+        with self._condition:
+            if len(self._pending) >= self.max_queued:
+                metrics.registry.inc("content_team_jobs_total", {'outcome': 'rejected'},
+                                     help_text="Article requests, by outcome.")
+                raise QueueFull(f"{len(self._pending)} articles are already waiting.")
+            job = ArticleJob(topic, bypass_cache)
+            self._pending.append(job)
+            self._set_depth()
+            self._condition.notify()
+        return job
+
+    def cancel(self, job: ArticleJob):
+        """
+        Cancels a job: a waiting job is dropped, a running one stops at its next step.
+        """
+        job.cancel()
+        with self._condition:
+            if job in self._pending:
+                self._pending.remove(job)
+                self._set_depth()
+                job.state = CANCELLED
+                job.events.put(JOB_FINISHED)
+                metrics.registry.inc("content_team_jobs_total", {'outcome': 'cancelled'})
+
+    def position(self, job: ArticleJob):
+        """
+        Returns the number of jobs ahead of this one, or None once it has left the queue.
+        """
+        with self._condition:
+            try:
+                return self._pending.index(job)
+            except ValueError:
+                return None
+
+    def eta(self, job: ArticleJob):
+        """
+        Estimates the seconds until a waiting job starts, assuming every article
+        takes as long as recent ones did and the running ones are half done.
+        """
+        position = self.position(job)
+        if position is None:
+            return 0.0
+        rounds = math.floor(position / self.workers)
+        return self._article_seconds * (rounds + 0.5)
+
+    def _set_depth(self):
+        metrics.registry.set("content_team_jobs_queued", len(self._pending),
+                             help_text="Article requests waiting for a worker.")
+
+    def _next_job(self):
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            job = self._pending.popleft()
+            self._set_depth()
+            return job
+
+    def _work(self, team_factory):
+        # Built with the first job, and built again with the next one if that fails
+        team = None
+        while True:
+            job = self._next_job()
+            job.state = RUNNING
+            job.started_at = time.monotonic()
+            metrics.registry.observe("content_team_job_wait_seconds", job.started_at - job.submitted_at,
+                                     help_text="Time article requests spent waiting for a worker.")
+            if team is None:
+                try:
+                    team = team_factory()
+                except Exception as e:
+                    print(f"Error: Could not build a ContentTeam for the article '{job.topic}'. Error: {e}")
+                    job.error = e
+                    job.state = FAILED
+                    metrics.registry.inc("content_team_jobs_total", {'outcome': job.state})
+                    job.events.put(JOB_FINISHED)
+                    continue
+            try:
+                team.run(job.topic, bypass_cache=job.bypass_cache, on_event=job.events.put,
+                         cancel_event=job.cancel_event)
+            except Exception as e:
+                print(f"Error: The article '{job.topic}' failed. Error: {e}")
+                job.error = e
+            finally:
+                elapsed = time.monotonic() - job.started_at
+                if job.cancel_event.is_set():
+                    job.state = CANCELLED
+                elif job.error is not None:
+                    job.state = FAILED
+                else:
+                    job.state = DONE
+                    # A moving average keeps the ETA close to recent article times
+                    self._article_seconds = 0.7 * self._article_seconds + 0.3 * elapsed
+                metrics.registry.inc("content_team_jobs_total", {'outcome': job.state})
+                job.events.put(JOB_FINISHED)
@@ -1,102 +1,736 @@
+import startup
+
 import os
+import sys
+import sqlite3
+import queue
 import argparse
+import importlib
+import multiprocessing
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# The agent classes (and qwen-agent with them) are imported on first use, see lazy_factory
+with startup.timed("import pipeline modules"):
+    from agents.pool import AgentPool
+    from tools.research import prefetch_research, build_search_query
+    from tools.snippet_index import SnippetIndex
+    from config import (get_settings, get_research_config, get_writer_config, get_review_config,
+                        get_metrics_config, get_hedge_config, get_work_queue_config, get_topic_index_config,
+                        get_article_store_config, get_agent_tier, parse_agent_tiers, AGENT_NAMES,
+                        WRITER_MODES, REVIEW_MODES)
+    from token_utils import plan_chunks, text_edge
+    from scheduler import Stage, StageScheduler
+    import events
+    import metrics
+    from hedging import get_hedger, HedgeCancelled
+    from speculation import SpeculativeSections, SpeculationCancelled
+    from topic_index import TopicIndex
+    from article_store import ArticleStore
+    from events import RunContext, RunCancelled
+    from batch import BatchRunner, read_topics
+    from work_queue import WorkQueue, QueueWorker, run_worker_process
+    from checkpoint import RunCheckpoint, DEFAULT_CHECKPOINT_DIR
+
+# Default number of sections written at the same time
+DEFAULT_MAX_WORKERS = 4
 
-# Import our agent classes
-from agents.outline_agent import OutlineAgent
-from agents.writer_agent import WriterAgent
-from agents.reviewer_agent import ReviewerAgent
-from agents.image_agent import ImageAgent
+# Agents signal failures with text starting with this prefix; such output is never checkpointed
+ERROR_PREFIX = "Error:"
+
+class PipelineHalted(Exception):
+    """Raised by a stage when the rest of the pipeline cannot continue."""
+
+def lazy_factory(module_name: str, class_name: str, **kwargs):
+    """
+    Returns a factory that imports an agent's module and builds the agent only
+    when it is first called, so startup does not pay for qwen-agent, the Tavily
+    SDK or agents a run never uses.
+    """
+    def build():
+        with startup.timed(f"build {class_name}"):
+            agent_class = getattr(importlib.import_module(module_name), class_name)
+            return agent_class(**kwargs)
+    return build
 
 class ContentTeam:
-    def __init__(self):
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, writer_mode: str = None,
+                 prefetch_research: bool = None, checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR,
+                 review_mode: str = None, hedge: bool = None, agent_models: dict = None,
+                 speculative: bool = None, topic_reuse: bool = None):
         """
         Initializes the multi-agent content creation team.
+
+        Args:
+            max_workers (int): The maximum number of outline sections written concurrently.
+            writer_mode (str): "tool" or "direct", see WriterAgent. Defaults to WRITER_MODE.
+            prefetch_research (bool): Research the whole article once after the outline
+                and write every section from that shared research. This implies the
+                "direct" writer mode. Defaults to RESEARCH_PREFETCH.
+            checkpoint_dir (str): Where each topic's stage outputs are persisted.
+                None disables checkpointing.
+            review_mode (str): "full", "chunked" or "edits", see ReviewerAgent. Defaults to REVIEW_MODE.
+            hedge (bool): Duplicate section writes and searches that take unusually
+                long and keep the first answer, see hedging.Hedger. Defaults to HEDGE_ENABLED.
+            agent_models (dict): Model tiers ("fast" or "max") by agent name, e.g.
+                {'outline': 'max'}. Agents not listed use AGENT_MODELS.
+            speculative (bool): Start writing each section as soon as its outline
+                item has streamed in, see speculation.SpeculativeSections. Not used
+                with prefetched research. Defaults to WRITER_SPECULATIVE.
+            topic_reuse (bool): Reuse the outline and research of an earlier, nearly
+                identical topic instead of generating them again, see topic_index.TopicIndex.
+                Defaults to TOPIC_REUSE_ENABLED.
         """
         print("Initializing the AI Content Team...")
-        self.outline_agent = OutlineAgent()
-        self.writer_agent = WriterAgent()
-        self.reviewer_agent = ReviewerAgent()
-        self.image_agent = ImageAgent()
-        print("All agents have been initialized.")
+        self.checkpoint_dir = checkpoint_dir
+        self.review_config = get_review_config()
+        if review_mode is not None:
+            self.review_config['mode'] = review_mode
+        self.research_config = get_research_config()
+        self.metrics_config = get_metrics_config()
+        if prefetch_research is not None:
+            self.research_config['prefetch'] = prefetch_research
+        if self.research_config['prefetch']:
+            writer_mode = "direct"
+        self.hedge = get_hedge_config()['enabled'] if hedge is None else hedge
+        # Prefetched research needs the whole outline before any section can be written
+        self.speculative = get_writer_config()['speculative'] if speculative is None else speculative
+        self.speculative = self.speculative and not self.research_config['prefetch']
+        topic_index_config = get_topic_index_config()
+        topic_reuse_enabled = topic_index_config.pop('enabled')
+        if topic_reuse_enabled if topic_reuse is None else topic_reuse:
+            self.topic_index = TopicIndex(**topic_index_config)
+        else:
+            self.topic_index = None
+        self.article_store = ArticleStore(**get_article_store_config())
+
+        # Agents are checked out of pools for each call, so no Assistant instance is
+        # ever used by two sections, or two concurrent articles, at the same time.
+        # They are built lazily, the first time a stage needs one.
+        agent_models = agent_models or {}
+        self.agent_models = agent_models
+        self.outline_pool = AgentPool(lazy_factory("agents.outline_agent", "OutlineAgent",
+                                                   model_tier=agent_models.get('outline')))
+        self.writer_pool = AgentPool(lazy_factory("agents.writer_agent", "WriterAgent",
+                                                  mode=writer_mode, hedge=self.hedge,
+                                                  model_tier=agent_models.get('writer')))
+        self.search_pool = AgentPool(lazy_factory("tools.tavily_search", "TavilySearchTool",
+                                                  cfg={'hedge': self.hedge}))
+        self.reviewer_pool = AgentPool(lazy_factory("agents.reviewer_agent", "ReviewerAgent",
+                                                    model_tier=agent_models.get('reviewer'),
+                                                    transition_tier=agent_models.get('transition')))
+        self.image_pool = AgentPool(lazy_factory("agents.image_agent", "ImageAgent",
+                                                 model_tier=agent_models.get('image')))
+
+        self.max_workers = max(1, max_workers)
+        self.writer_executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="writer"
+        )
+        print("The team is ready. Agents will be created on first use.")
 
-    def run(self, topic: str):
+    def run(self, topic: str, bypass_cache: bool = False, on_event=None,
+            resume: bool = False, incremental: bool = False, cancel_event=None):
         """
         Executes the full content creation workflow.
+
+        The steps are declared as a dependency graph, so each one starts as soon
+        as its inputs are ready. The cover image only needs the topic and is
+        generated while the outline is drafted, written and reviewed.
         
         Args:
             topic (str): The main topic for the blog post.
+            bypass_cache (bool): Ignore cached LLM responses and call the models again.
+            on_event (callable): Optional callback receiving a PipelineEvent for
+                every step of progress, including streamed text.
+            resume (bool): Continue from the topic's checkpoint, reusing every stage
+                that already completed.
+            incremental (bool): Generate a fresh outline, but only write the sections
+                whose outline text is not in the checkpoint yet.
+            cancel_event (threading.Event): Set it to stop the run early; the
+                completed stages stay checkpointed.
         
         Returns:
             str: The full content of the final markdown article.
         """
-        # Step 1: Generate the outline
-        outline = self.outline_agent.run(topic)
-        if not outline:
-            message = "Halting process: Could not generate an outline."
-            print(message)
-            return message
+        checkpoint = RunCheckpoint(topic, self.checkpoint_dir) if self.checkpoint_dir else None
+        ctx = RunContext(bypass_cache=bypass_cache, on_event=on_event, checkpoint=checkpoint,
+                         resume=resume, incremental=incremental, cancel_event=cancel_event)
+        scheduler = StageScheduler(self.build_stages(topic, ctx), cancel_event=ctx.aborted)
+        trace = metrics.Trace(topic)
+        status = "failed"
+        try:
+            # Every agent run and search made by the stages is recorded in this trace
+            with metrics.use_trace(trace):
+                results = scheduler.run()
+            status = "ok"
+            self.remember_topic(topic, results, ctx)
+        except (PipelineHalted, RunCancelled) as e:
+            status = "cancelled" if isinstance(e, RunCancelled) else "halted"
+            print(e)
+            ctx.emit(events.HALTED, message=str(e))
+            return str(e)
+        finally:
+            scheduler.print_timings()
+            self.record_metrics(trace, scheduler, ctx, status)
+            ctx.emit(events.FINISHED, stage_timings=dict(scheduler.timings))
+
+        return results["save"]
+
+    def remember_topic(self, topic: str, results: dict, ctx: RunContext):
+        """
+        Adds a finished run's outline and prefetched research to the topic index,
+        so near-duplicate topics can reuse them.
+        """
+        if self.topic_index is None or ctx.similar_topic is not None:
+            # A reused outline is already indexed under the topic it was made for
+            return
+        research = results["research"].documents if results["research"] is not None else None
+        try:
+            self.topic_index.add(topic, results["outline"], research)
+        except sqlite3.Error as e:
+            print(f"Error: Could not add the topic to the topic index. Error: {e}")
+
+    def find_similar_topic(self, topic: str, ctx: RunContext):
+        """
+        Looks up an earlier topic close enough to this one to reuse its outline.
+
+        Returns:
+            dict: The match, see TopicIndex.find, or None.
+        """
+        # An incremental run asks for a fresh outline, and --no-cache for fresh answers
+        if self.topic_index is None or ctx.bypass_cache or ctx.incremental:
+            return None
+        try:
+            match = self.topic_index.find(topic)
+        except sqlite3.Error as e:
+            print(f"Error: Could not search the topic index. Error: {e}")
+            return None
+        metrics.registry.inc("content_team_topic_reuse_total", {'outcome': 'reused' if match else 'new'},
+                             help_text="Article runs, by whether they reused a similar topic's outline.")
+        return match
+
+    def record_metrics(self, trace, scheduler: StageScheduler, ctx: RunContext, status: str):
+        """
+        Adds a finished run to the aggregate metrics, writes its trace next to
+        the saved article and refreshes the Prometheus metrics file.
+        """
+        trace.stages = dict(scheduler.timings)
+        for name, (start, end) in trace.stages.items():
+            metrics.registry.observe("content_team_stage_seconds", end - start, {'stage': name},
+                                     "Wall time of one pipeline stage.")
+        if trace.stages:
+            metrics.registry.observe("content_team_article_seconds", max(end for _, end in trace.stages.values()),
+                                     help_text="Wall time of one article, from the first stage to the last.")
+        metrics.registry.inc("content_team_articles_total", {'status': status},
+                             help_text="Finished article runs, by outcome.")
+
+        try:
+            if ctx.article_id is not None:
+                summary = trace.to_dict()
+                self.article_store.set_timings(ctx.article_id, {'stages': summary['stages'],
+                                                                'agents': summary['agents']})
+        except sqlite3.Error as e:
+            print(f"Error: Could not record the article's timings. Error: {e}")
+
+        try:
+            if ctx.output_path:
+                trace_path = os.path.splitext(ctx.output_path)[0] + ".trace.json"
+                trace.write(trace_path)
+                print(f"Run trace saved to: {trace_path}")
+            if self.metrics_config['file']:
+                metrics.registry.write_prometheus(self.metrics_config['file'])
+        except OSError as e:
+            # Instrumentation must never cost us the article
+            print(f"Error: Could not write the run metrics. Error: {e}")
+
+    def stream(self, topic: str, bypass_cache: bool = False, cancel_event=None):
+        """
+        Runs the workflow in the background and yields its progress as it happens.
+
+        Args:
+            topic (str): The main topic for the blog post.
+            bypass_cache (bool): Ignore cached LLM responses and call the models again.
+            cancel_event (threading.Event): Set it to stop the run early.
+
+        Yields:
+            PipelineEvent: Outline, section, review, image and save events, in the
+                order they occur. Section events of different sections interleave.
+        """
+        event_queue = queue.Queue()
+        finished = object()
+        failure = []
+
+        def worker():
+            try:
+                self.run(topic, bypass_cache=bypass_cache, on_event=event_queue.put, cancel_event=cancel_event)
+            except Exception as e:
+                failure.append(e)
+            finally:
+                event_queue.put(finished)
+
+        threading.Thread(target=worker, name="content-team-stream", daemon=True).start()
+        while True:
+            event = event_queue.get()
+            if event is finished:
+                break
+            yield event
+
+        if failure:
+            raise failure[0]
+
+    def build_stages(self, topic: str, ctx: RunContext):
+        """
+        Declares the pipeline steps and the inputs each of them needs.
+        """
+        return [
+            Stage("outline", lambda: self.generate_outline(topic, ctx)),
+            Stage("research", lambda outline: self.research(topic, outline, ctx), inputs=["outline"]),
+            Stage("write", lambda outline, research: self.write_draft(topic, outline, research, ctx),
+                  inputs=["outline", "research"]),
+            Stage("review", lambda write: self.review_draft(topic, write, ctx), inputs=["write"]),
+            Stage("image", lambda: self.generate_image(topic, ctx)),
+            Stage("save", lambda outline, write, review, image: self.save_article(
+                topic, review, image, ctx, outline=outline, sections=write),
+                  inputs=["outline", "write", "review", "image"]),
+        ]
+
+    def generate_outline(self, topic: str, ctx: RunContext):
+        """
+        Step 1: Generate the outline.
+        """
+        outline = ctx.checkpoint.load_outline() if ctx.resume and ctx.checkpoint else None
+        match = self.find_similar_topic(topic, ctx) if not outline else None
+        if outline:
+            print("Resuming with the checkpointed outline.")
+        elif match is not None:
+            ctx.similar_topic = match
+            outline = match['outline']
+            print(f"Reusing the outline of the similar topic '{match['topic']}' "
+                  f"(similarity {match['similarity']:.2f}).")
+            if ctx.checkpoint:
+                ctx.checkpoint.save_outline(outline)
+        else:
+            on_item = None
+            if self.speculative:
+                ctx.speculation = SpeculativeSections(ctx, lambda index, title, speculation: metrics.submit(
+                    self.writer_executor, self.write_section, index, title, ctx, speculation=speculation))
+                on_item = ctx.speculation.start
+            try:
+                with self.outline_pool.acquire() as outline_agent:
+                    outline = outline_agent.run(topic, bypass_cache=ctx.bypass_cache, on_item=on_item)
+            except BaseException:
+                if ctx.speculation:
+                    ctx.speculation.cancel_unused()
+                raise
+            if not outline:
+                if ctx.speculation:
+                    ctx.speculation.cancel_unused()
+                raise PipelineHalted("Halting process: Could not generate an outline.")
+            if ctx.checkpoint:
+                ctx.checkpoint.save_outline(outline)
 
         print("\n--- Step 1: Outline Generated ---")
         for item in outline:
             print(f"- {item}")
         print("---------------------------------\n")
+        ctx.emit(events.OUTLINE_READY, outline=outline)
+        return outline
+
+    def research(self, topic: str, outline: list, ctx: RunContext):
+        """
+        Step 1b: Research the whole article up front, if prefetching is enabled.
+
+        Returns:
+            SnippetIndex: The shared research, or None when every section searches on its own.
+        """
+        if not self.research_config['prefetch']:
+            return None
+        if ctx.reuse_checkpoint and all(ctx.checkpoint.load_section(item) is not None for item in outline):
+            # Every section will come from the checkpoint; there is nothing to research
+            return None
+        if ctx.similar_topic and ctx.similar_topic['research']:
+            print(f"Reusing the research of the similar topic '{ctx.similar_topic['topic']}'.")
+            return SnippetIndex(ctx.similar_topic['research'])
 
-        # Step 2: Write content for each section in the outline
-        draft_sections = []
-        for section_topic in outline:
-            section_content = self.writer_agent.run(section_topic)
-            draft_sections.append(section_content)
+        return prefetch_research(
+            topic, outline, self.writer_executor, self.search_pool,
+            query_template=get_writer_config()['query_template'],
+            max_results=self.research_config['max_results'],
+        )
+
+    def write_draft(self, topic: str, outline: list, research_index, ctx: RunContext):
+        """
+        Step 2: Write content for each section in the outline.
+
+        Returns:
+            list: The drafted sections, in outline order.
+        """
+        draft_sections = self.write_sections(outline, ctx, topic, research_index)
         
         full_draft = "\n\n".join(draft_sections)
         print("\n--- Step 2: Full Draft Written ---")
         print(full_draft[:500] + "...") # Print a preview
         print("----------------------------------\n")
+        return draft_sections
 
-        # Step 3: Review and polish the full draft
-        polished_text = self.reviewer_agent.run(full_draft)
+    def review_draft(self, topic: str, draft_sections: list, ctx: RunContext):
+        """
+        Step 3: Review and polish the full draft.
+        """
+        ctx.emit(events.REVIEW_STARTED)
+        full_draft = "\n\n".join(draft_sections)
+        polished_text = ctx.checkpoint.load_review(full_draft) if ctx.reuse_checkpoint else None
+        if polished_text is not None:
+            print("Reusing the checkpointed review of this draft.")
+        else:
+            if self.review_config['mode'] == "chunked":
+                polished_text = self.review_chunked(topic, draft_sections, ctx)
+            elif self.review_config['mode'] == "edits":
+                with self.reviewer_pool.acquire() as reviewer_agent:
+                    polished_text, edit_report = reviewer_agent.run_edits(full_draft, bypass_cache=ctx.bypass_cache)
+                metrics.record_review_edits(edit_report)
+            else:
+                on_delta = (lambda text: ctx.emit(events.REVIEW_DELTA, text=text)) if ctx.streaming else None
+                with self.reviewer_pool.acquire() as reviewer_agent:
+                    polished_text = reviewer_agent.run(full_draft, bypass_cache=ctx.bypass_cache, on_delta=on_delta)
+            if ctx.checkpoint and not polished_text.startswith(ERROR_PREFIX):
+                ctx.checkpoint.save_review(full_draft, polished_text)
         print("\n--- Step 3: Draft Polished ---")
         print(polished_text[:500] + "...") # Print a preview
         print("------------------------------\n")
-        
-        # Step 4: Generate a cover image
+        ctx.emit(events.REVIEW_DONE, content=polished_text)
+        return polished_text
+
+    def review_chunked(self, topic: str, draft_sections: list, ctx: RunContext):
+        """
+        Polishes the draft in parallel chunks of whole sections, sized by the
+        review token budget. Each chunk sees the edges of its neighbours and the
+        article title; a final short pass smooths the opening of every chunk
+        into the end of the one before it.
+
+        Returns:
+            str: The polished article text.
+        """
+        chunks = ["\n\n".join(chunk) for chunk in plan_chunks(draft_sections, self.review_config['token_budget'])]
+        context_tokens = self.review_config['context_tokens']
+        title = topic.title()
+        print(f"\nReviewerAgent: Polishing the draft in {len(chunks)} parallel chunks...")
+
+        def polish(index):
+            ctx.check_cancelled()
+            before = text_edge(chunks[index - 1], context_tokens, from_end=True) if index > 0 else ""
+            after = text_edge(chunks[index + 1], context_tokens, from_end=False) if index + 1 < len(chunks) else ""
+            with self.reviewer_pool.acquire() as reviewer_agent:
+                return reviewer_agent.polish_chunk(chunks[index], title, before, after, bypass_cache=ctx.bypass_cache)
+
+        futures = [metrics.submit(self.writer_executor, polish, index) for index in range(len(chunks))]
+        polished_chunks = [future.result() for future in futures]
+
+        if self.review_config['smooth_transitions'] and len(polished_chunks) > 1:
+            # Each boundary only rewrites the first paragraph of the later chunk,
+            # so the boundaries are independent and can be smoothed in parallel.
+            def smooth(index):
+                ctx.check_cancelled()
+                previous_paragraph = polished_chunks[index - 1].rstrip().split("\n\n")[-1]
+                paragraphs = polished_chunks[index].lstrip().split("\n\n", 1)
+                with self.reviewer_pool.acquire() as reviewer_agent:
+                    paragraphs[0] = reviewer_agent.smooth_transition(
+                        previous_paragraph, paragraphs[0], title, bypass_cache=ctx.bypass_cache
+                    )
+                return "\n\n".join(paragraphs)
+
+            futures = [metrics.submit(self.writer_executor, smooth, index) for index in range(1, len(polished_chunks))]
+            polished_chunks = polished_chunks[:1] + [future.result() for future in futures]
+
+        print("ReviewerAgent: All chunks have been polished.")
+        return "\n\n".join(polished_chunks)
+
+    def generate_image(self, topic: str, ctx: RunContext):
+        """
+        Step 4: Generate a cover image. Only depends on the topic.
+        """
         image_topic = f"{topic}, digital art style"
-        image_url = self.image_agent.run(image_topic)
+        image_url = ctx.checkpoint.load_image() if ctx.reuse_checkpoint else None
+        if image_url is None:
+            ctx.check_cancelled()
+            with self.image_pool.acquire() as image_agent:
+                image_url = image_agent.run(image_topic, bypass_cache=ctx.bypass_cache)
+            if ctx.checkpoint and image_url:
+                ctx.checkpoint.save_image(image_url)
         print("\n--- Step 4: Cover Image Generated ---")
         print(f"Image URL: {image_url}")
         print("-------------------------------------\n")
+        ctx.emit(events.IMAGE_READY, image_url=image_url)
+        return image_url
 
-        # Step 5: Combine everything and save the final article
-        final_article = self.save_article(topic, polished_text, image_url)
-        
-        return final_article
+    def write_sections(self, outline: list, ctx: RunContext, topic: str = "", research_index=None):
+        """
+        Writes every outline section concurrently on the writer thread pool.
+
+        Args:
+            outline (list): The section topics, in article order.
+            ctx (RunContext): The options and callbacks of the current run.
+            topic (str): The article topic, used to rank prefetched research.
+            research_index (SnippetIndex): Prefetched research shared by all sections, if any.
 
-    def save_article(self, topic: str, content: str, image_url: str):
+        Returns:
+            list: The written sections, in the same order as the outline.
         """
-        Saves the final article as a markdown file and returns its content.
+        futures = []
+        for index, section_topic in enumerate(outline):
+            ctx.check_cancelled()
+            # A section already being written from the streamed outline is reused
+            speculation = ctx.speculation.adopt(index, section_topic) if ctx.speculation else None
+            if speculation is not None:
+                futures.append(speculation.future)
+                continue
+            research = None
+            if research_index is not None:
+                research = research_index.search(
+                    f"{build_search_query(section_topic)} {topic}", k=self.research_config['top_k']
+                )
+            futures.append(metrics.submit(self.writer_executor, self.write_section, index, section_topic, ctx, research))
+        if ctx.speculation:
+            ctx.speculation.cancel_unused()
+        return [future.result() for future in futures]
+
+    def write_section(self, index: int, section_topic: str, ctx: RunContext, research: list = None,
+                      speculation=None):
         """
-        safe_topic = "".join(x for x in topic if x.isalnum() or x in " -").rstrip()
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"outputs/{safe_topic.replace(' ', '_')}_{timestamp}.md"
+        Writes a single section with a WriterAgent from the pool.
+        A failure is contained to this section so the rest of the article survives.
 
-        os.makedirs("outputs", exist_ok=True)
-        
-        final_content = f"# {topic.title()}\n\n"
-        if image_url:
-            final_content += f"![{topic}]({image_url})\n\n"
-        final_content += content
+        A speculative write (see speculation.SpeculativeSection) reports through
+        `speculation.emit`, which holds its events until the final outline adopts
+        it and stops it if the outline does not.
+        """
+        emit = speculation.emit if speculation is not None else ctx.emit
+        emit(events.SECTION_STARTED, index=index, title=section_topic)
+        content = ctx.checkpoint.load_section(section_topic) if ctx.reuse_checkpoint else None
+        if content is not None:
+            print(f"Reusing the checkpointed draft of section '{section_topic}'.")
+            emit(events.SECTION_DONE, index=index, content=content)
+            return content
+
+        # Speculative writes always listen to the stream, so they can be stopped early
+        on_delta = None
+        if ctx.streaming or speculation is not None:
+            on_delta = lambda text: emit(events.SECTION_DELTA, index=index, text=text)
+        try:
+            if self.hedge:
+                content = self.write_section_hedged(section_topic, ctx, on_delta, research)
+            else:
+                with self.writer_pool.acquire() as writer_agent:
+                    content = writer_agent.run(section_topic, bypass_cache=ctx.bypass_cache,
+                                               on_delta=on_delta, research=research)
+        except (RunCancelled, SpeculationCancelled):
+            raise
+        except Exception as e:
+            print(f"Error: Writing section '{section_topic}' failed. Error: {e}")
+            content = "Error: Could not generate content for this section."
+        if ctx.checkpoint and not content.startswith(ERROR_PREFIX):
+            ctx.checkpoint.save_section(section_topic, content)
+        emit(events.SECTION_DONE, index=index, content=content)
+        return content
+
+    def write_section_hedged(self, section_topic: str, ctx: RunContext, on_delta=None, research: list = None):
+        """
+        Writes a section, sending a duplicate request to a second WriterAgent if the
+        first one is slower than usual. Only the first attempt streams its text;
+        SECTION_DONE carries the winner's text either way.
+        """
+        def attempt(cancelled, is_hedge):
+            def forward(text):
+                # Raising from the stream callback closes the losing request early
+                if cancelled.is_set():
+                    raise HedgeCancelled()
+                if on_delta is not None and not is_hedge:
+                    on_delta(text)
+
+            with self.writer_pool.acquire() as writer_agent:
+                return writer_agent.run(section_topic, bypass_cache=ctx.bypass_cache,
+                                        on_delta=forward, research=research)
+
+        return get_hedger("writer").call(attempt)
+
+    def save_article(self, topic: str, content: str, image_url: str, ctx: RunContext = None,
+                     outline: list = None, sections: list = None):
+        """
+        Saves the final article to the article store, which also exports it as
+        a markdown file, and returns its markdown content.
+        """
+        # The model each agent was routed to, e.g. to compare articles across model changes
+        model_profiles = get_settings().model_profiles
+        models = {agent_name: model_profiles[self.agent_models.get(agent_name) or get_agent_tier(agent_name)].model
+                  for agent_name in AGENT_NAMES}
+        article = self.article_store.save(topic, content, outline or [], sections or [],
+                                          image_url=image_url, models=models)
 
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(final_content)
-            
-        print(f"✅ Success! Your article has been saved to: {filename}")
-        return final_content
+        location = article['markdown_path'] or self.article_store.path
+        print(f"✅ Success! Your article has been saved as article {article['id']} to: {location}")
+        if ctx is not None:
+            ctx.article_id = article['id']
+            ctx.output_path = article['markdown_path']
+            ctx.emit(events.SAVED, path=article['markdown_path'], article_id=article['id'],
+                     content=article['markdown'])
+        return article['markdown']
 
 # The main block now only runs for direct CLI execution
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Run the AI Content Creation Team CLI.")
-    parser.add_argument("--topic", type=str, required=True, help="The topic for the blog post.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--topic", type=str, help="The topic for the blog post.")
+    source.add_argument("--topics-file", type=str,
+                        help="Batch mode: a file with one topic per line, or '-' to read from stdin.")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Batch mode: the number of articles produced at the same time.")
+    parser.add_argument("--manifest", type=str, default=os.path.join("outputs", "manifest.jsonl"),
+                        help="Batch mode: the JSON Lines results manifest. Topics it already "
+                             "lists as 'ok' are skipped, so a batch can be resumed.")
+    queue_mode = parser.add_mutually_exclusive_group()
+    queue_mode.add_argument("--enqueue", action="store_true",
+                            help="Add --topic or --topics-file to the durable work queue (WORK_QUEUE_PATH) "
+                                 "instead of writing the articles here.")
+    queue_mode.add_argument("--worker", action="store_true",
+                            help="Worker mode: produce the articles waiting in the work queue.")
+    queue_mode.add_argument("--queue-status", action="store_true",
+                            help="Print the number of queued, leased, done and failed jobs.")
+    library = parser.add_mutually_exclusive_group()
+    library.add_argument("--list-articles", action="store_true",
+                         help="List the newest saved articles (ARTICLE_STORE_PATH).")
+    library.add_argument("--search-articles", type=str, metavar="QUERY",
+                         help="Full-text search the titles and bodies of the saved articles.")
+    library.add_argument("--get-article", type=int, metavar="ID",
+                         help="Print a saved article as markdown.")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="The most articles --list-articles and --search-articles print.")
+    parser.add_argument("--worker-processes", type=int, default=1,
+                        help="Worker mode: the number of worker processes, each with its own team.")
+    parser.add_argument("--drain", action="store_true",
+                        help="Worker mode: stop once the queue is empty instead of waiting for more jobs.")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="The maximum number of sections written concurrently.")
+    parser.add_argument("--writer-mode", choices=WRITER_MODES, default=None,
+                        help="'tool' lets the model call the search tool; 'direct' searches first "
+                             "and writes each section in a single LLM call. Defaults to WRITER_MODE.")
+    parser.add_argument("--prefetch-research", action="store_true", default=None,
+                        help="Research the whole article once after the outline and share the "
+                             "results between sections (implies --writer-mode direct).")
+    parser.add_argument("--review-mode", choices=REVIEW_MODES, default=None,
+                        help="'full' reviews the whole draft in one request; 'chunked' polishes groups "
+                             "of sections in parallel; 'edits' asks for targeted edits and applies them "
+                             "locally. Defaults to REVIEW_MODE.")
+    parser.add_argument("--agent-model", action="append", default=[], metavar="AGENT=TIER",
+                        help="Route an agent (outline, writer, reviewer, transition, image) to the "
+                             "'fast' or 'max' model tier, e.g. --agent-model outline=max. "
+                             "Repeatable; overrides AGENT_MODELS.")
+    parser.add_argument("--hedge", action="store_true", default=None,
+                        help="Duplicate section writes and searches that run longer than usual and "
+                             "keep whichever answer arrives first. Defaults to HEDGE_ENABLED.")
+    parser.add_argument("--speculate", action="store_true", default=None,
+                        help="Start writing each section as soon as its outline item streams in, instead "
+                             "of waiting for the complete outline. Sections the final outline drops are "
+                             "still paid for. Defaults to WRITER_SPECULATIVE.")
+    parser.add_argument("--topic-reuse", action="store_true", default=None,
+                        help="Reuse the outline and research of a recent run on a reworded version of "
+                             "the same topic instead of generating them again. Defaults to TOPIC_REUSE_ENABLED.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass cached LLM responses and call the models again.")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve Prometheus metrics at http://<METRICS_HOST>:<port>/metrics while "
+                             "running. Defaults to METRICS_PORT; 0 disables the endpoint.")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Print how long imports, configuration and building each agent took.")
+    resume_mode = parser.add_mutually_exclusive_group()
+    resume_mode.add_argument("--resume", action="store_true",
+                             help="Continue from the topic's checkpoint, reusing every completed stage.")
+    resume_mode.add_argument("--incremental", action="store_true",
+                             help="Generate a new outline, but only write the sections whose text "
+                                  "is not already checkpointed.")
     args = parser.parse_args()
+    browsing = args.list_articles or args.search_articles is not None or args.get_article is not None
+    if not (args.topic or args.topics_file or args.worker or args.queue_status or browsing):
+        parser.error("one of the arguments --topic --topics-file --worker --queue-status "
+                     "--list-articles --search-articles --get-article is required")
+    if browsing and (args.topic or args.topics_file or args.worker or args.queue_status or args.enqueue):
+        parser.error("--list-articles, --search-articles and --get-article only read the article store")
+    if args.enqueue and not (args.topic or args.topics_file):
+        parser.error("--enqueue needs --topic or --topics-file")
+    if (args.worker or args.queue_status) and (args.topic or args.topics_file):
+        parser.error("--worker and --queue-status take their topics from the work queue")
+
+    # Read the topics before building the team, so a bad path fails fast
+    topics = read_topics(args.topics_file) if args.topics_file else None
+    try:
+        agent_models = parse_agent_tiers(",".join(args.agent_model))
+    except ValueError as e:
+        parser.error(str(e))
+
+    with startup.timed("load settings"):
+        get_settings()
+
+    if browsing:
+        article_store = ArticleStore(**get_article_store_config())
+        if args.get_article is not None:
+            article = article_store.get(args.get_article)
+            if article is None:
+                print(f"Error: There is no article {args.get_article}.")
+                sys.exit(1)
+            print(article['markdown'])
+            sys.exit(0)
+        if args.search_articles is not None:
+            articles = article_store.search(args.search_articles, limit=args.limit)
+        else:
+            articles = article_store.list(limit=args.limit)
+        for article in articles:
+            created_at = datetime.fromtimestamp(article['created_at']).strftime("%Y-%m-%d %H:%M")
+            print(f"{article['id']:>6}  {created_at}  {article['title']}")
+            if article.get('snippet'):
+                print(f"        {article['snippet']}")
+        print(f"{len(articles)} of {article_store.count()} articles")
+        sys.exit(0)
+
+    if args.enqueue or args.queue_status:
+        work_queue = WorkQueue(**get_work_queue_config())
+        if args.enqueue:
+            for topic in topics if topics is not None else [args.topic]:
+                job_id = work_queue.enqueue(topic, bypass_cache=args.no_cache)
+                print(f"Queued job {job_id}: '{topic}'")
+        print(f"Work queue {work_queue.path}: " +
+              ", ".join(f"{count} {status}" for status, count in work_queue.stats().items()))
+        sys.exit(0)
+
+    team_kwargs = dict(max_workers=args.max_workers, writer_mode=args.writer_mode,
+                       prefetch_research=args.prefetch_research, review_mode=args.review_mode,
+                       hedge=args.hedge, agent_models=agent_models,
+                       speculative=args.speculate,
+                       topic_reuse=args.topic_reuse)
+    if args.worker and args.worker_processes > 1:
+        # Each process builds its own team and leases jobs independently; "spawn"
+        # starts them clean instead of forking this process's threads.
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=run_worker_process, name=f"content-worker-{index}",
+                                     args=(index, get_work_queue_config(), team_kwargs, args.drain))
+                     for index in range(args.worker_processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        sys.exit(0)
 
-    team = ContentTeam()
-    team.run(args.topic)
+    metrics_port = args.metrics_port if args.metrics_port is not None else get_metrics_config()['port']
+    if metrics_port:
+        metrics.serve_metrics(metrics_port, get_metrics_config()['host'])
+    with startup.timed("build ContentTeam"):
+        team = ContentTeam(**team_kwargs)
+    try:
+        if args.worker:
+            QueueWorker(WorkQueue(**get_work_queue_config()), team).run(drain=args.drain)
+        elif topics is None:
+            team.run(args.topic, bypass_cache=args.no_cache, resume=args.resume, incremental=args.incremental)
+        else:
+            BatchRunner(team, args.manifest, concurrency=args.concurrency, bypass_cache=args.no_cache).run(topics)
+    finally:
+        if args.startup_report:
+            startup.print_report()
@@ -0,0 +1,336 @@
+import json
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from storage import write_atomic
+
+# Upper bounds (in seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+def _escape_label_value(value):
+    """
+    Escapes a label value as the Prometheus text format requires: backslash,
+    double quote and newline.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and latency histograms, rendered in the Prometheus
+    text exposition format. Metrics are identified by name plus a label dict.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name: str, labels: dict = None, value: float = 1, help_text: str = ""):
+        with self._lock:
+            key = self._key(name, labels)
+            self._counters[key] = self._counters.get(key, 0) + value
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def set(self, name: str, value: float, labels: dict = None, help_text: str = ""):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def observe(self, name: str, value: float, labels: dict = None, help_text: str = ""):
+        with self._lock:
+            key = self._key(name, labels)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in pairs) + "}"
+
+    def render_prometheus(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for metric_type, metrics in (("counter", self._counters), ("gauge", self._gauges),
+                                         ("histogram", self._histograms)):
+                for name in sorted({name for name, _ in metrics}):
+                    if self._help.get(name):
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {metric_type}")
+                    for (metric_name, labels), value in sorted(metrics.items()):
+                        if metric_name != name:
+                            continue
+                        if metric_type != "histogram":
+                            lines.append(f"{name}{self._format_labels(labels)} {value}")
+                            continue
+                        cumulative = 0
+                        for bound, count in zip(value.buckets, value.counts):
+                            cumulative += count
+                            lines.append(f"{name}_bucket{self._format_labels(labels, [('le', bound)])} {cumulative}")
+                        lines.append(f"{name}_bucket{self._format_labels(labels, [('le', '+Inf')])} {value.count}")
+                        lines.append(f"{name}_sum{self._format_labels(labels)} {value.sum:.6f}")
+                        lines.append(f"{name}_count{self._format_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """
+        Atomically writes the metrics to a file, e.g. for the node_exporter textfile collector.
+        """
+        write_atomic(path, self.render_prometheus())
+
+
+registry = MetricsRegistry()
+
+
+class Trace:
+    """
+    Everything measured while producing one article: stage timings plus every
+    LLM and tool call. Written as JSON next to the article.
+    """
+
+    def __init__(self, topic: str):
+        self.topic = topic
+        self.started_at = time.time()
+        self.stages = {}
+        self.llm_calls = []
+        self.tool_calls = []
+        self.context_compressions = []
+        # The report of a review done with targeted edits, see ReviewerAgent.run_edits
+        self.review_edits = None
+        self._lock = threading.Lock()
+
+    def add_llm_call(self, record: dict):
+        with self._lock:
+            self.llm_calls.append(record)
+
+    def add_tool_call(self, record: dict):
+        with self._lock:
+            self.tool_calls.append(record)
+
+    def add_context_compression(self, record: dict):
+        with self._lock:
+            self.context_compressions.append(record)
+
+    def set_review_edits(self, report: dict):
+        with self._lock:
+            self.review_edits = dict(report)
+
+    def to_dict(self):
+        with self._lock:
+            review_edits = self.review_edits
+            llm_calls = list(self.llm_calls)
+            tool_calls = list(self.tool_calls)
+            compressions = list(self.context_compressions)
+
+        per_agent = {}
+        for call in llm_calls:
+            summary = per_agent.setdefault(call['agent'], {
+                'runs': 0, 'cached_runs': 0, 'llm_calls': 0, 'seconds': 0.0,
+                'input_tokens': 0, 'output_tokens': 0,
+            })
+            summary['runs'] += 1
+            summary['cached_runs'] += int(call['cached'])
+            summary['llm_calls'] += call['llm_calls']
+            summary['seconds'] = round(summary['seconds'] + call['seconds'], 3)
+            summary['input_tokens'] += call['input_tokens']
+            summary['output_tokens'] += call['output_tokens']
+
+        return {
+            'topic': self.topic,
+            'started_at': self.started_at,
+            'stages': {
+                name: {'start': round(start, 3), 'end': round(end, 3), 'seconds': round(end - start, 3)}
+                for name, (start, end) in self.stages.items()
+            },
+            'agents': per_agent,
+            'searches': {
+                'count': len(tool_calls),
+                'cached': sum(1 for call in tool_calls if call['cached']),
+                'failed': sum(1 for call in tool_calls if call.get('error')),
+                'seconds': round(sum(call['seconds'] for call in tool_calls), 3),
+            },
+            'context': {
+                'compressed_prompts': len(compressions),
+                'original_tokens': sum(record['original_tokens'] for record in compressions),
+                'sent_tokens': sum(record['sent_tokens'] for record in compressions),
+                'saved_tokens': sum(record['original_tokens'] - record['sent_tokens'] for record in compressions),
+            },
+            'review_edits': review_edits,
+            'llm_calls': llm_calls,
+            'tool_calls': tool_calls,
+            'context_compressions': compressions,
+            'token_counts_are_estimates': True,
+        }
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+# The trace of the article being produced by the current thread (or task)
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def use_trace(trace: Trace):
+    """
+    Makes `trace` the current trace for the duration of the block.
+    """
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def submit(executor, fn, *args, **kwargs):
+    """
+    Submits work to a thread pool, carrying over the caller's current trace.
+    Context variables are not inherited by pool threads, so every pipeline
+    submission goes through here.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def record_llm_call(agent: str, seconds: float, cached: bool, llm_calls: int,
+                    input_tokens: int, output_tokens: int):
+    """
+    Records one agent run: into the aggregate metrics and the current article's trace.
+    """
+    labels = {'agent': agent}
+    registry.observe("content_team_agent_run_seconds", seconds, labels,
+                     "Wall time of one agent run, including tool calls.")
+    registry.inc("content_team_agent_runs_total", {**labels, 'cached': str(cached).lower()},
+                 help_text="Agent runs, by whether they were answered from the LLM cache.")
+    registry.inc("content_team_llm_calls_total", labels, llm_calls, "LLM requests sent.")
+    registry.inc("content_team_llm_tokens_total", {**labels, 'direction': 'input'}, input_tokens,
+                 "Estimated LLM tokens.")
+    registry.inc("content_team_llm_tokens_total", {**labels, 'direction': 'output'}, output_tokens,
+                 "Estimated LLM tokens.")
+
+    trace = current_trace()
+    if trace is not None:
+        trace.add_llm_call({
+            'agent': agent, 'seconds': round(seconds, 3), 'cached': cached, 'llm_calls': llm_calls,
+            'input_tokens': input_tokens, 'output_tokens': output_tokens,
+        })
+
+
+def record_tool_call(tool: str, seconds: float, cached: bool, detail: str = "", error: Exception = None):
+    """
+    Records one tool call, e.g. a Tavily search, and the exception it failed with, if any.
+    """
+    labels = {'tool': tool}
+    registry.observe("content_team_tool_call_seconds", seconds, labels, "Wall time of one tool call.")
+    registry.inc("content_team_tool_calls_total", {**labels, 'cached': str(cached).lower()},
+                 help_text="Tool calls, by whether they were answered from the cache.")
+    if error is not None:
+        registry.inc("content_team_tool_errors_total", {**labels, 'error': type(error).__name__},
+                     help_text="Failed tool calls, by exception type.")
+
+    trace = current_trace()
+    if trace is not None:
+        trace.add_tool_call({'tool': tool, 'seconds': round(seconds, 3), 'cached': cached, 'detail': detail,
+                             'error': f"{type(error).__name__}: {error}" if error is not None else None})
+
+
+def record_context_compression(agent: str, original_tokens: int, sent_tokens: int, detail: str = ""):
+    """
+    Records prompt context that was compressed to fit an agent's token budget.
+    """
+    labels = {'agent': agent}
+    registry.inc("content_team_context_tokens_total", {**labels, 'kind': 'original'}, original_tokens,
+                 "Estimated tokens of prompt context before and after compression.")
+    registry.inc("content_team_context_tokens_total", {**labels, 'kind': 'sent'}, sent_tokens,
+                 "Estimated tokens of prompt context before and after compression.")
+
+    trace = current_trace()
+    if trace is not None:
+        trace.add_context_compression({'agent': agent, 'original_tokens': original_tokens,
+                                       'sent_tokens': sent_tokens, 'detail': detail})
+
+
+def record_review_edits(report: dict):
+    """
+    Records a review done with targeted edits and the output tokens and time
+    it saved compared with a full rewrite, see ReviewerAgent.run_edits.
+    """
+    registry.inc("content_team_review_edits_total", {'outcome': 'fallback' if report['fallback'] else 'applied'},
+                 help_text="Reviews done with targeted edits, by whether they fell back to a full rewrite.")
+    registry.inc("content_team_review_tokens_saved_total", value=report['tokens_saved'],
+                 help_text="Estimated output tokens saved by reviewing with targeted edits.")
+    registry.inc("content_team_review_seconds_saved_total", value=report['latency_saved_seconds'],
+                 help_text="Estimated seconds saved by reviewing with targeted edits.")
+
+    trace = current_trace()
+    if trace is not None:
+        trace.set_review_edits(report)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1"):
+    """
+    Serves the metrics at http://<host>:<port>/metrics from a background thread.
+    Only local scrapers can reach it unless `host` is set to a wider address
+    such as "0.0.0.0".
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep scrapes out of the console
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"Metrics available at http://{host}:{port}/metrics")
+    return server
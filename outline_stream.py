@@ -0,0 +1,94 @@
+import json
+
+
+class OutlineStreamParser:
+    """
+    Finds the items of the "outline" list in a JSON answer while it is still streaming.
+
+    Feed it the answer's text piece by piece; each call returns the list items
+    whose closing quote arrived in that piece, so work on a section can start
+    long before the whole outline has been generated. Text around the JSON
+    (e.g. a markdown fence) is skipped. Only the first "outline" list is read,
+    and values inside it that are not strings are ignored.
+
+    The complete answer is still parsed by the caller; the items seen here are
+    a prediction of that result, not a replacement for it.
+    """
+
+    def __init__(self, key: str = "outline"):
+        self.key = key
+        self.count = 0
+        self.done = False
+        self._depth = 0
+        self._array_depth = None
+        self._in_string = False
+        self._escaped = False
+        self._string = []
+        # Set while the text so far ends with the key ('after_key') or the key and a colon
+        self._expecting = None
+
+    def feed(self, text: str):
+        """
+        Consumes the next piece of the answer.
+
+        Returns:
+            list: The outline items completed by this piece, in order.
+        """
+        items = []
+        for char in text:
+            if self.done:
+                break
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._close_string(items)
+                    continue
+                self._string.append(char)
+                continue
+
+            if char.isspace():
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string = []
+                # A string right after "key": is a value, not the list we want
+                self._expecting = None
+                continue
+
+            if char == ":" and self._expecting == "after_key":
+                self._expecting = "after_colon"
+                continue
+            if char == "[" and self._expecting == "after_colon" and self._array_depth is None:
+                self._depth += 1
+                self._array_depth = self._depth
+                self._expecting = None
+                continue
+
+            self._expecting = None
+            if char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                if self._array_depth is not None and self._depth == self._array_depth:
+                    self.done = True
+                self._depth = max(0, self._depth - 1)
+        return items
+
+    def _close_string(self, items: list):
+        raw = "".join(self._string)
+        try:
+            value = json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            value = None
+
+        if self._array_depth is not None:
+            # Only strings directly inside the list are items
+            if self._depth == self._array_depth and value is not None:
+                self.count += 1
+                items.append(value)
+            return
+        if value == self.key:
+            self._expecting = "after_key"
@@ -0,0 +1,323 @@
+import re
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+import metrics
+from config import get_upstream_config
+from events import Cancelled
+
+# How an upstream failure is handled, see classify_error
+THROTTLED = "throttled"    # the upstream asked us to slow down: back off, shrink concurrency, retry
+TRANSIENT = "transient"    # a timeout or server error: retry
+FATAL = "fatal"            # e.g. a bad request or an invalid key: retrying cannot help
+
+_THROTTLE_MARKERS = ("rate limit", "ratelimit", "throttl", "too many requests", "limit exceeded", "quota")
+_TRANSIENT_MARKERS = ("timeout", "timed out", "connection", "temporarily", "unavailable",
+                      "internal server error", "bad gateway")
+# Status codes quoted in a message; whole numbers only, so "34290 tokens" is not a 429
+_THROTTLE_STATUS = re.compile(r"\b429\b")
+_TRANSIENT_STATUS = re.compile(r"\b(408|5\d\d)\b")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that keeps failing."""
+
+
+def classify_error(error: Exception):
+    """
+    Sorts an exception raised by an upstream client into THROTTLED, TRANSIENT or FATAL.
+
+    The SDKs involved (qwen-agent, openai, tavily, requests) all raise different
+    types. A numeric HTTP status on the usual attributes decides on its own;
+    otherwise the message is checked for well-known phrases and status codes.
+    """
+    code = None
+    for attribute in ("status_code", "status", "code"):
+        value = getattr(error, attribute, None)
+        if value is not None:
+            code = str(value)
+            break
+    response = getattr(error, "response", None)
+    if (code is None or not code.isdigit()) and response is not None:
+        code = str(getattr(response, "status_code", "") or "") or code
+
+    if code is not None and code.isdigit():
+        status = int(code)
+        if status == 429:
+            return THROTTLED
+        if status == 408 or status >= 500:
+            return TRANSIENT
+        if status >= 400:
+            return FATAL
+
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return TRANSIENT
+    # A non-numeric code, e.g. "Throttling" or "rate_limit_exceeded", is read like the message
+    message = f"{code or ''} {type(error).__name__} {error}".lower()
+    if _THROTTLE_STATUS.search(message) or any(marker in message for marker in _THROTTLE_MARKERS):
+        return THROTTLED
+    if _TRANSIENT_STATUS.search(message) or any(marker in message for marker in _TRANSIENT_MARKERS):
+        return TRANSIENT
+    return FATAL
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket. `rate` units are added per second, up to `capacity`.
+    A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1):
+        """
+        Blocks until `amount` units are available, then takes them.
+
+        Returns:
+            float: The seconds spent waiting.
+        """
+        if self.rate <= 0:
+            return 0.0
+        # A request larger than the whole bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def debit(self, amount: float):
+        """
+        Takes units without waiting, e.g. tokens only known once a response is in.
+        The balance may go negative, which delays later callers.
+        """
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+
+class AIMDLimiter:
+    """
+    Caps the number of concurrent calls, adapting the cap like TCP congestion
+    control: each success raises it by about one per window of calls (additive
+    increase), each throttling signal halves it (multiplicative decrease).
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, decrease_factor: float = 0.5):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.decrease_factor = decrease_factor
+        self.limit = float(self.maximum)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """
+        Waits for a free slot and holds it for the duration of the block.
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def on_success(self):
+        with self._condition:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def on_throttled(self):
+        with self._condition:
+            self.limit = max(self.minimum, self.limit * self.decrease_factor)
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream after `failure_threshold` consecutive failures.
+    After `reset_timeout` seconds, calls are let through again; the first
+    success closes the circuit and another failure opens it for a new period.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """
+        Returns:
+            bool: True if this failure opened the circuit.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.failure_threshold > 0 and self.failures >= self.failure_threshold:
+                was_open = self.opened_at is not None
+                self.opened_at = time.monotonic()
+                return not was_open
+            return False
+
+
+class Upstream:
+    """
+    Client-side protection for one external API, shared by every caller in the process.
+
+    Each call waits for its requests-per-second and tokens-per-minute budget
+    and a concurrency slot, and is retried with jittered exponential backoff
+    when it is throttled or fails transiently. Throttling also shrinks the
+    concurrency cap (see AIMDLimiter), and repeated failures open a circuit
+    breaker so callers fail fast instead of queueing behind a dead service.
+    """
+
+    def __init__(self, name: str, rps: float = 0, tpm: float = 0, max_concurrency: int = 8,
+                 max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 breaker_threshold: int = 5, breaker_reset: float = 30.0):
+        """
+        Args:
+            name (str): The label used in logs and metrics, e.g. "tavily".
+            rps (float): Requests per second; 0 means unlimited.
+            tpm (float): Tokens per minute; 0 means unlimited.
+            max_concurrency (int): The most calls in flight at once.
+            max_retries (int): Retries after the first attempt.
+            base_delay (float): The backoff before the first retry, doubled for each further one.
+            max_delay (float): The longest backoff.
+            breaker_threshold (int): Consecutive failures that open the circuit; 0 disables it.
+            breaker_reset (float): Seconds the circuit stays open.
+        """
+        self.name = name
+        self.requests = TokenBucket(rps)
+        self.tokens = TokenBucket(tpm / 60, capacity=tpm)
+        self.limiter = AIMDLimiter(max_concurrency)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._labels = {'upstream': name}
+        metrics.registry.set("content_team_upstream_concurrency_limit", self.limiter.limit, self._labels,
+                             "The adaptive cap on concurrent calls to an upstream.")
+
+    def backoff(self, attempt: int):
+        # "Full jitter": spreads out the retries of callers that failed together
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, func, *args, tokens: int = 0, can_retry=None, **kwargs):
+        """
+        Calls `func(*args, **kwargs)` within this upstream's budgets, retrying on failure.
+
+        Args:
+            func (callable): The call to make.
+            tokens (int): The estimated tokens the call uses, for the tokens-per-minute budget.
+            can_retry (callable): Optional check run before each retry, e.g. to refuse
+                retrying a call whose partial output was already streamed.
+
+        Returns:
+            The return value of `func`.
+
+        Raises:
+            CircuitOpenError: If the upstream has been failing and the circuit is open.
+            Exception: The last error, once it is fatal or the retries are used up.
+        """
+        attempt = 0
+        while True:
+            if self.breaker.is_open:
+                metrics.registry.inc("content_team_upstream_calls_total", {**self._labels, 'outcome': 'rejected'},
+                                     help_text="Calls to an upstream, by outcome.")
+                raise CircuitOpenError(f"The {self.name} circuit is open after repeated failures.")
+
+            waited = self.requests.acquire(1) + self.tokens.acquire(tokens)
+            if waited:
+                metrics.registry.observe("content_team_upstream_wait_seconds", waited, self._labels,
+                                         "Time spent waiting for the rate limit budget.")
+            try:
+                with self.limiter.slot():
+                    result = func(*args, **kwargs)
+            except Cancelled:
+                # Raised by our own callbacks, e.g. a losing hedge or a dropped
+                # speculative section; the upstream itself is fine
+                metrics.registry.inc("content_team_upstream_calls_total", {**self._labels, 'outcome': 'cancelled'})
+                raise
+            except Exception as e:
+                kind = classify_error(e)
+                if kind == THROTTLED:
+                    self.limiter.on_throttled()
+                    metrics.registry.inc("content_team_upstream_throttled_total", self._labels,
+                                         help_text="Calls an upstream rejected as rate limited.")
+                    metrics.registry.set("content_team_upstream_concurrency_limit", self.limiter.limit,
+                                         self._labels)
+
+                retry = kind != FATAL and attempt < self.max_retries and (can_retry is None or can_retry())
+                if kind != FATAL and not retry and self.breaker.record_failure():
+                    metrics.registry.inc("content_team_upstream_circuit_opened_total", self._labels,
+                                         help_text="Times an upstream's circuit breaker opened.")
+                    print(f"Error: Too many failed calls to {self.name}; pausing it for "
+                          f"{self.breaker.reset_timeout:.0f}s.")
+                if not retry:
+                    metrics.registry.inc("content_team_upstream_calls_total", {**self._labels, 'outcome': 'failed'})
+                    raise
+
+                delay = self.backoff(attempt)
+                attempt += 1
+                metrics.registry.inc("content_team_upstream_retries_total", self._labels,
+                                     help_text="Retried calls to an upstream.")
+                print(f"Warning: {self.name} call failed ({kind}: {e}). "
+                      f"Retry {attempt}/{self.max_retries} in {delay:.1f}s.")
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            self.limiter.on_success()
+            metrics.registry.set("content_team_upstream_concurrency_limit", self.limiter.limit, self._labels)
+            metrics.registry.inc("content_team_upstream_calls_total", {**self._labels, 'outcome': 'ok'},
+                                 help_text="Calls to an upstream, by outcome.")
+            return result
+
+
+_upstreams = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name: str):
+    """
+    Returns the process-wide Upstream for "llm" or "tavily", built from the
+    settings on first use.
+    """
+    with _upstreams_lock:
+        if name not in _upstreams:
+            _upstreams[name] = Upstream(name, **get_upstream_config(name))
+        return _upstreams[name]
@@ -0,0 +1,126 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import metrics
+
+
+class Stage:
+    def __init__(self, name: str, func, inputs=()):
+        """
+        A single step of the content pipeline.
+
+        Args:
+            name (str): A unique name for the stage. Its result is passed to
+                downstream stages under this name.
+            func (callable): The work to run. It is called with one keyword
+                argument per input stage, holding that stage's result.
+            inputs (iterable): The names of the stages this stage depends on.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+
+
+class StageScheduler:
+    """
+    Runs a small DAG of stages, starting each one as soon as all of its inputs
+    have finished. Independent stages (e.g. image generation and writing) run
+    side by side on a thread pool.
+    """
+
+    def __init__(self, stages: list, cancel_event=None):
+        """
+        Args:
+            stages (list): The Stage objects to run.
+            cancel_event (threading.Event): Set when a stage fails, so stages
+                still in flight can stop early instead of finishing for nothing.
+        """
+        self.cancel_event = cancel_event
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique.")
+        for stage in stages:
+            for dependency in stage.inputs:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'.")
+        self.timings = {}
+
+    def run(self):
+        """
+        Executes every stage and returns their results.
+
+        Returns:
+            dict: A mapping of stage name to the value its function returned.
+
+        Raises:
+            Exception: The first exception raised by any stage. Stages that have
+                not started yet are skipped, and `cancel_event` is set for the
+                ones still running.
+        """
+        self.timings = {}
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+        origin = time.perf_counter()
+
+        executor = ThreadPoolExecutor(max_workers=len(self.stages), thread_name_prefix="stage")
+        try:
+            while pending or running:
+                # Start every stage whose inputs are all available
+                for name, stage in list(pending.items()):
+                    if all(dependency in results for dependency in stage.inputs):
+                        kwargs = {dependency: results[dependency] for dependency in stage.inputs}
+                        running[metrics.submit(executor, self._run_stage, stage, kwargs, origin)] = name
+                        del pending[name]
+
+                if not running:
+                    raise RuntimeError(f"Stages can never start (cycle?): {', '.join(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+        except BaseException:
+            if self.cancel_event is not None:
+                self.cancel_event.set()
+            raise
+        finally:
+            # Do not block on stages still in flight if another stage failed
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    def _run_stage(self, stage: Stage, kwargs: dict, origin: float):
+        start = time.perf_counter() - origin
+        try:
+            return stage.func(**kwargs)
+        finally:
+            self.timings[stage.name] = (start, time.perf_counter() - origin)
+
+    def critical_path(self):
+        """
+        Returns the chain of stages that determined the total run time,
+        from the first stage to the last one to finish.
+        """
+        if not self.timings:
+            return []
+
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        path = [name]
+        while True:
+            finished_inputs = [d for d in self.stages[name].inputs if d in self.timings]
+            if not finished_inputs:
+                break
+            name = max(finished_inputs, key=lambda n: self.timings[n][1])
+            path.append(name)
+        return list(reversed(path))
+
+    def print_timings(self):
+        """
+        Prints the start and end time of every stage plus the critical path.
+        """
+        print("\n--- Stage Timings ---")
+        for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0]):
+            print(f"{name:<10} {start:8.2f}s -> {end:8.2f}s  ({end - start:.2f}s)")
+        print(f"Critical path: {' -> '.join(self.critical_path())}")
+        print("---------------------\n")
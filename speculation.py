@@ -0,0 +1,134 @@
+import threading
+
+import metrics
+from events import Cancelled
+
+
+class SpeculationCancelled(Cancelled):
+    """Raised inside a speculative section write that the final outline does not contain."""
+
+
+class SpeculativeSection:
+    """
+    One section being written from an outline item seen while the outline was
+    still streaming.
+
+    Its progress events are held back until the final outline adopts it, then
+    delivered under the section's final index. If it is never adopted, they
+    are dropped and the write stops at its next event.
+    """
+
+    def __init__(self, ctx, index: int, title: str):
+        self.ctx = ctx
+        self.index = index
+        self.title = title
+        self.future = None
+        self.adopted = False
+        self.cancelled = False
+        self._held = []
+        self._lock = threading.Lock()
+
+    def emit(self, kind: str, **data):
+        """
+        Stands in for RunContext.emit while the section is written.
+        """
+        with self._lock:
+            if self.cancelled:
+                raise SpeculationCancelled(f"The outline no longer contains '{self.title}'.")
+            if not self.adopted:
+                self.ctx.check_cancelled()
+                self._held.append((kind, data))
+                return
+        self.ctx.emit(kind, **{**data, 'index': self.index})
+
+    def adopt(self, index: int):
+        """
+        Makes this the section at `index` of the final outline and delivers its held events.
+        """
+        with self._lock:
+            self.index = index
+            for kind, data in self._held:
+                self.ctx.emit(kind, **{**data, 'index': index})
+            self._held = []
+            self.adopted = True
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            self._held = []
+        if self.future is not None:
+            self.future.cancel()
+
+
+class SpeculativeSections:
+    """
+    Starts writing outline items as the outline streams in, and reconciles them
+    with the final outline.
+
+    Every item is written as soon as its text is complete. When the final
+    outline is known, each of its sections adopts the running write of an item
+    with exactly the same text, wherever it was in the stream; items the final
+    outline does not contain are cancelled.
+    """
+
+    def __init__(self, ctx, start_write):
+        """
+        Args:
+            ctx (RunContext): The run the sections belong to.
+            start_write (callable): Called with (index, title, speculation); starts
+                writing the section and returns its Future. The write must report
+                progress through `speculation.emit` instead of `ctx.emit`.
+        """
+        self.ctx = ctx
+        self.start_write = start_write
+        self._sections = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def start(self, index: int, title: str):
+        """
+        Starts writing a streamed outline item.
+        """
+        if not title.strip():
+            return
+        # Raising here also stops the outline stream of a failed or cancelled run
+        self.ctx.check_cancelled()
+        with self._lock:
+            if self._closed:
+                return
+            speculation = SpeculativeSection(self.ctx, index, title)
+            speculation.future = self.start_write(index, title, speculation)
+            self._sections.append(speculation)
+        print(f"Speculatively writing section '{title}' while the outline streams.")
+        metrics.registry.inc("content_team_speculative_sections_total", {'outcome': 'started'},
+                             help_text="Sections written before the outline was complete, by outcome.")
+
+    def adopt(self, index: int, title: str):
+        """
+        Returns the speculative write of a final outline section, or None if
+        the section has to be written from scratch.
+        """
+        with self._lock:
+            for speculation in self._sections:
+                if speculation.title == title and not speculation.adopted and not speculation.cancelled:
+                    speculation.adopt(index)
+                    metrics.registry.inc("content_team_speculative_sections_total", {'outcome': 'adopted'})
+                    return speculation
+        return None
+
+    def cancel_unused(self):
+        """
+        Stops every speculative write that was not adopted; no more are started.
+
+        Returns:
+            int: The number of writes cancelled.
+        """
+        with self._lock:
+            self._closed = True
+            unused = [s for s in self._sections if not s.adopted and not s.cancelled]
+        for speculation in unused:
+            speculation.cancel()
+            metrics.registry.inc("content_team_speculative_sections_total", {'outcome': 'cancelled'})
+        if unused:
+            print(f"Cancelled {len(unused)} speculatively written section(s) the final outline does not contain.")
+        return len(unused)
@@ -0,0 +1,36 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# Measured from the moment this module is first imported, which main.py and app.py do first
+_process_start = time.perf_counter()
+_entries = []
+_lock = threading.Lock()
+
+
+@contextmanager
+def timed(label: str):
+    """
+    Records how long a startup step took, e.g. an import or building an agent.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        with _lock:
+            _entries.append((label, start - _process_start, end - start))
+
+
+def print_report():
+    """
+    Prints every recorded startup step with its offset from process start and its duration.
+    Agents are built lazily, so they appear with the offset of their first use.
+    """
+    with _lock:
+        entries = sorted(_entries, key=lambda entry: entry[1])
+    print("\n--- Startup Report ---")
+    for label, offset, duration in entries:
+        print(f"{label:<32} at {offset:7.3f}s  took {duration:7.3f}s")
+    print(f"{'total since start':<32} {time.perf_counter() - _process_start:10.3f}s")
+    print("----------------------\n")
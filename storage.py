@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+
+def topic_slug(topic: str):
+    """
+    Turns a topic into a file name part: letters, digits and dashes, with
+    spaces as underscores. Returns an empty string if nothing is left.
+    """
+    safe_topic = "".join(x for x in topic if x.isalnum() or x in " -").rstrip()
+    return safe_topic.replace(' ', '_')
+
+
+def write_atomic(path: str, text: str):
+    """
+    Writes a file so readers see either the old or the complete new content,
+    never a partial one: the text goes to a temporary file in the same folder,
+    which then replaces `path`.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+@contextmanager
+def sqlite_connection(path: str, row_factory=None):
+    """
+    Opens a short-lived SQLite connection for one operation, committed if the
+    block succeeds and rolled back if it raises. A connection per operation
+    keeps a store safe to share between threads and processes, and the
+    timeout waits out other writers holding the lock.
+    """
+    conn = sqlite3.connect(path, timeout=30)
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def init_wal_db(path: str):
+    """
+    Creates the folder of an SQLite database and switches it to WAL mode, so
+    readers and a writer in other processes do not block each other.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with sqlite_connection(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the project modules importable, as the agents do for themselves
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,52 @@
+import json
+import os
+
+from checkpoint import RunCheckpoint
+
+
+def test_stages_round_trip(tmp_path):
+    checkpoint = RunCheckpoint("Future of finance", tmp_path)
+    checkpoint.save_outline(["Intro", "Outlook"])
+    checkpoint.save_section("Intro", "Intro text")
+    checkpoint.save_review("draft", "polished")
+    checkpoint.save_image("https://example.com/cover.png")
+
+    reopened = RunCheckpoint("Future of finance", tmp_path)
+    assert reopened.load_outline() == ["Intro", "Outlook"]
+    assert reopened.load_section("Intro") == "Intro text"
+    assert reopened.load_section("Outlook") is None
+    assert reopened.load_review("draft") == "polished"
+    assert reopened.load_review("another draft") is None
+    assert reopened.load_image() == "https://example.com/cover.png"
+
+
+def test_topics_with_the_same_slug_get_separate_checkpoints(tmp_path):
+    first = RunCheckpoint("C++ tips", tmp_path)
+    second = RunCheckpoint("C tips", tmp_path)
+    first.save_outline(["Templates"])
+
+    assert first.directory != second.directory
+    assert second.load_outline() is None
+
+
+def test_topics_without_a_slug_get_separate_checkpoints(tmp_path):
+    first = RunCheckpoint("???", tmp_path)
+    second = RunCheckpoint("!!!", tmp_path)
+
+    assert first.directory != second.directory
+
+
+def test_checkpoints_of_another_topic_are_ignored(tmp_path):
+    checkpoint = RunCheckpoint("AI & ML", tmp_path)
+    with open(os.path.join(checkpoint.directory, "outline.json"), "w", encoding="utf-8") as f:
+        json.dump({"topic": "AI ML", "outline": ["Someone else's outline"]}, f)
+
+    assert checkpoint.load_outline() is None
+
+
+def test_unreadable_checkpoints_are_ignored(tmp_path):
+    checkpoint = RunCheckpoint("Future of finance", tmp_path)
+    with open(os.path.join(checkpoint.directory, "outline.json"), "w", encoding="utf-8") as f:
+        f.write("{not json")
+
+    assert checkpoint.load_outline() is None
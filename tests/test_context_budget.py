@@ -0,0 +1,45 @@
+from token_utils import estimate_tokens
+from tools.context_budget import compress_results, split_sentences
+
+FILLER = "Analysts published many general remarks about the wider economy this year."
+
+RESULTS = [
+    {"title": "Energy outlook", "url": "https://a.example",
+     "content": f"{FILLER} Solar capacity doubled in Spain. {FILLER}"},
+    {"title": "Economy review", "url": "https://b.example",
+     "content": f"{FILLER} {FILLER}"},
+    {"title": "Solar costs", "url": "https://c.example",
+     "content": f"Solar module prices fell again. {FILLER}"},
+]
+
+
+def test_split_sentences():
+    assert split_sentences("First one. Second one! Is it 3? 4 is next.") == [
+        "First one.", "Second one!", "Is it 3?", "4 is next.",
+    ]
+
+
+def test_results_that_fit_are_returned_unchanged():
+    assert compress_results(RESULTS, "solar", 10_000) is RESULTS
+    assert compress_results(RESULTS, "solar", 0) is RESULTS
+
+
+def test_relevant_sentences_are_kept_and_unrelated_results_dropped():
+    compressed = compress_results(RESULTS, "solar capacity", 80)
+    assert compressed == [
+        {**RESULTS[0], "content": "Solar capacity doubled in Spain."},
+        {**RESULTS[2], "content": "Solar module prices fell again."},
+    ]
+    assert RESULTS[0]["content"].startswith(FILLER)
+
+
+def test_the_best_sentence_is_kept_even_over_budget():
+    compressed = compress_results(RESULTS, "Spain", 1)
+    assert compressed == [{**RESULTS[0], "content": "Solar capacity doubled in Spain."}]
+
+
+def test_repeated_sentences_are_kept_once():
+    compressed = compress_results(RESULTS, "economy", 60)
+    contents = " ".join(result["content"] for result in compressed)
+    assert contents.count(FILLER) == 1
+    assert sum(estimate_tokens(result["content"]) for result in compressed) < 60
@@ -0,0 +1,38 @@
+import urllib.request
+
+from metrics import MetricsRegistry, serve_metrics
+
+
+def test_counters_and_histograms_render():
+    registry = MetricsRegistry()
+    registry.inc("llm_calls_total", {"agent": "writer"}, help_text="LLM calls")
+    registry.inc("llm_calls_total", {"agent": "writer"})
+    registry.observe("stage_seconds", 0.3, {"stage": "write"})
+
+    text = registry.render_prometheus()
+    assert "# HELP llm_calls_total LLM calls" in text
+    assert 'llm_calls_total{agent="writer"} 2' in text
+    assert 'stage_seconds_bucket{stage="write",le="0.25"} 0' in text
+    assert 'stage_seconds_bucket{stage="write",le="0.5"} 1' in text
+    assert 'stage_seconds_bucket{stage="write",le="+Inf"} 1' in text
+    assert 'stage_seconds_count{stage="write"} 1' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.inc("searches_total", {"query": 'say "hi"\\now\nplease'})
+
+    text = registry.render_prometheus()
+    assert 'searches_total{query="say \\"hi\\"\\\\now\\nplease"} 1' in text
+
+
+def test_endpoint_binds_to_localhost_by_default():
+    server = serve_metrics(0)
+    try:
+        host, port = server.server_address[:2]
+        assert host == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
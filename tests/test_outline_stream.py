@@ -0,0 +1,41 @@
+import json
+
+from outline_stream import OutlineStreamParser
+
+ANSWER = '```json\n{"title": "Outlook", "outline": ["Intro", "The \\"new\\" rules", "C:\\\\ drive", {"x": "nested"}, "End"], "notes": ["ignored"]}\n```'
+
+
+def feed_in_pieces(text, size):
+    parser = OutlineStreamParser()
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    return parser, items
+
+
+def test_items_are_read_from_a_whole_answer():
+    parser, items = feed_in_pieces(ANSWER, len(ANSWER))
+    assert items == ["Intro", 'The "new" rules', "C:\\ drive", "End"]
+    assert parser.done
+    assert parser.count == 4
+
+
+def test_items_match_the_final_parse_whatever_the_split():
+    expected = [item for item in json.loads(ANSWER.strip("`json\n"))["outline"] if isinstance(item, str)]
+    for size in range(1, 12):
+        _, items = feed_in_pieces(ANSWER, size)
+        assert items == expected
+
+
+def test_an_item_is_returned_once_its_closing_quote_arrives():
+    parser = OutlineStreamParser()
+    assert parser.feed('{"outline": ["Intro", "Out') == ["Intro"]
+    assert parser.feed('look\\') == []
+    assert parser.feed('"d') == []
+    assert parser.feed('"]}') == ['Outlook"d']
+    assert parser.done
+
+
+def test_a_string_value_named_like_the_key_is_not_the_list():
+    parser = OutlineStreamParser()
+    assert parser.feed('{"title": "outline", "sections": ["A"], "outline": ["B"]}') == ["B"]
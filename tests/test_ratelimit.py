@@ -0,0 +1,142 @@
+import time
+
+import pytest
+
+from events import RunCancelled
+from hedging import HedgeCancelled
+from ratelimit import (classify_error, CircuitBreaker, Upstream, CircuitOpenError,
+                       THROTTLED, TRANSIENT, FATAL)
+from speculation import SpeculationCancelled
+
+
+class StatusError(Exception):
+    def __init__(self, message, **attributes):
+        super().__init__(message)
+        self.__dict__.update(attributes)
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize("error, kind", [
+    (StatusError("slow down", status_code=429), THROTTLED),
+    (StatusError("upstream died", status_code=503), TRANSIENT),
+    (StatusError("request timeout", status=408), TRANSIENT),
+    (StatusError("bad request, rate limit mentioned", status_code=400), FATAL),
+    (StatusError("wrapped", response=Response(502)), TRANSIENT),
+    (StatusError("Requests rate limit exceeded", code="Throttling"), THROTTLED),
+    (Exception("Error code: 429 - too many"), THROTTLED),
+    (Exception("HTTP 503 from upstream"), TRANSIENT),
+    (TimeoutError("read timed out"), TRANSIENT),
+    (ConnectionError("reset by peer"), TRANSIENT),
+    (Exception("This model's maximum context length is 32768 tokens, you requested 34290 tokens"), FATAL),
+    (Exception("expected at most 10 items, got 15000"), FATAL),
+    (ValueError("Invalid API key"), FATAL),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    assert breaker.record_failure() is False
+    assert not breaker.is_open
+    assert breaker.record_failure() is True
+    assert breaker.is_open
+
+
+def test_circuit_breaker_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+
+    assert breaker.record_failure() is False
+    assert not breaker.is_open
+
+
+def test_circuit_breaker_half_opens_after_the_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.is_open
+
+    time.sleep(0.1)
+    # Calls are let through again; one more failure reopens the circuit at once
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+
+    time.sleep(0.1)
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.failures == 0
+
+
+def test_circuit_breaker_with_threshold_zero_never_opens():
+    breaker = CircuitBreaker(failure_threshold=0)
+    for _ in range(10):
+        breaker.record_failure()
+
+    assert not breaker.is_open
+
+
+def test_upstream_retries_transient_errors():
+    upstream = Upstream("test", base_delay=0, max_retries=2)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("connection reset")
+        return "ok"
+
+    assert upstream.call(flaky) == "ok"
+    assert len(calls) == 3
+
+
+def test_upstream_does_not_retry_fatal_errors():
+    upstream = Upstream("test", base_delay=0, max_retries=3, breaker_threshold=1)
+    calls = []
+
+    def invalid():
+        calls.append(1)
+        raise ValueError("Invalid API key")
+
+    with pytest.raises(ValueError):
+        upstream.call(invalid)
+    assert len(calls) == 1
+    assert not upstream.breaker.is_open
+
+
+def test_upstream_opens_the_circuit_once_retries_are_used_up():
+    upstream = Upstream("test", base_delay=0, max_retries=1, breaker_threshold=1)
+
+    def down():
+        raise ConnectionError("connection refused")
+
+    with pytest.raises(ConnectionError):
+        upstream.call(down)
+    with pytest.raises(CircuitOpenError):
+        upstream.call(down)
+
+
+@pytest.mark.parametrize("cancellation", [
+    SpeculationCancelled("The outline no longer contains 'Connection pooling and timeouts'."),
+    HedgeCancelled("connection unavailable"),
+    RunCancelled("The run was cancelled."),
+])
+def test_upstream_passes_cancellations_through_without_counting_them(cancellation):
+    upstream = Upstream("test", base_delay=0, max_retries=3, breaker_threshold=1)
+    calls = []
+
+    def cancelled():
+        calls.append(1)
+        raise cancellation
+
+    with pytest.raises(type(cancellation)):
+        upstream.call(cancelled)
+    assert len(calls) == 1
+    assert upstream.breaker.failures == 0
+    assert not upstream.breaker.is_open
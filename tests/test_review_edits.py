@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("qwen_agent")
+
+from agents.reviewer_agent import EditError, apply_edits, parse_edits
+
+
+def test_parse_edits_reads_the_list_around_surrounding_text():
+    edits = parse_edits('Here are the edits:\n[{"find": "teh", "replace": "the"}]\nDone.')
+    assert edits == [{"find": "teh", "replace": "the"}]
+
+
+@pytest.mark.parametrize("response", [
+    "No edits needed.",
+    "[{\"find\": \"teh\", \"replace\": }]",
+    "[{\"find\": \"teh\"}]",
+    "[\"teh\"]",
+])
+def test_parse_edits_rejects_malformed_answers(response):
+    with pytest.raises(EditError):
+        parse_edits(response)
+
+
+def test_apply_edits_applies_in_order():
+    draft = "Teh market grew. It grew fast."
+    edits = [{"find": "Teh", "replace": "The"}, {"find": "The market", "replace": "The stock market"}]
+    assert apply_edits(draft, edits) == "The stock market grew. It grew fast."
+
+
+def test_apply_edits_rejects_an_ambiguous_span():
+    with pytest.raises(EditError, match="2 times"):
+        apply_edits("It grew. It grew.", [{"find": "It grew.", "replace": "It rose."}])
+
+
+def test_apply_edits_rejects_a_missing_span():
+    with pytest.raises(EditError, match="0 times"):
+        apply_edits("It grew.", [{"find": "It shrank.", "replace": "It fell."}])
+
+
+def test_apply_edits_rejects_an_empty_span():
+    with pytest.raises(EditError, match="empty"):
+        apply_edits("It grew.", [{"find": "", "replace": "Intro. "}])
+
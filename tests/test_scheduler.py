@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from events import OUTLINE_READY, RunCancelled, RunContext
+from scheduler import Stage, StageScheduler
+
+
+def test_stages_run_in_dependency_order():
+    scheduler = StageScheduler([
+        Stage("outline", lambda: ["Intro"]),
+        Stage("write", lambda outline: [f"{title} text" for title in outline], inputs=["outline"]),
+        Stage("image", lambda: "cover.png"),
+        Stage("save", lambda write, image: (write, image), inputs=["write", "image"]),
+    ])
+
+    results = scheduler.run()
+    assert results["save"] == (["Intro text"], "cover.png")
+    assert scheduler.critical_path()[-1] == "save"
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError, match="unknown stage"):
+        StageScheduler([Stage("write", lambda outline: outline, inputs=["outline"])])
+
+
+def test_a_failing_stage_aborts_the_run():
+    context = RunContext()
+    started = threading.Event()
+    stopped = threading.Event()
+    downstream = []
+
+    def image():
+        started.wait(5)
+        raise RuntimeError("image service down")
+
+    def write():
+        # A long stage that checks for cancellation between steps, as the agents do
+        started.set()
+        while True:
+            if context.aborted.wait(0.01):
+                stopped.set()
+                context.check_cancelled()
+
+    scheduler = StageScheduler([
+        Stage("image", image),
+        Stage("write", write),
+        Stage("save", lambda image, write: downstream.append("save"), inputs=["image", "write"]),
+    ], cancel_event=context.aborted)
+
+    with pytest.raises(RuntimeError, match="image service down"):
+        scheduler.run()
+    assert context.aborted.is_set()
+    assert stopped.wait(5)
+    with pytest.raises(RunCancelled, match="another stage failed"):
+        context.check_cancelled()
+    assert downstream == []
+
+
+def test_a_cancelled_run_stops_with_run_cancelled():
+    cancel_event = threading.Event()
+    context = RunContext(cancel_event=cancel_event)
+    downstream = []
+
+    def outline():
+        cancel_event.set()
+        context.emit(OUTLINE_READY, outline=["Intro"])
+
+    scheduler = StageScheduler([
+        Stage("outline", outline),
+        Stage("write", lambda outline: downstream.append("write"), inputs=["outline"]),
+    ], cancel_event=context.aborted)
+
+    with pytest.raises(RunCancelled, match="was cancelled"):
+        scheduler.run()
+    assert context.aborted.is_set()
+    assert downstream == []
@@ -0,0 +1,39 @@
+from tools.snippet_index import SnippetIndex, tokenize
+
+DOCUMENTS = [
+    {"title": "Stock market news", "url": "https://a.example", "content": "Markets closed higher on Friday."},
+    {"title": "Solar power", "url": "https://b.example", "content": "Solar panels keep getting cheaper. Solar farms grow."},
+    {"title": "Battery storage", "url": "https://c.example", "content": "Grid batteries smooth solar output at night."},
+    {"title": "Wind power", "url": "https://d.example", "content": "Offshore wind farms are getting larger."},
+]
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The Future of Solar, in 2026!") == ["future", "solar", "2026"]
+
+
+def test_search_ranks_by_term_frequency_and_rarity():
+    index = SnippetIndex(DOCUMENTS)
+    results = index.search("solar farms")
+    # Only the solar document matches both terms; of the two that match one
+    # equally rare term, the shorter document scores higher
+    assert [document["url"] for document in results] == [
+        "https://b.example", "https://d.example", "https://c.example",
+    ]
+
+
+def test_search_leaves_out_unrelated_documents_and_respects_k():
+    index = SnippetIndex(DOCUMENTS)
+    assert index.search("quantum computing") == []
+    assert len(index.search("power", k=1)) == 1
+
+
+def test_titles_are_indexed():
+    index = SnippetIndex(DOCUMENTS)
+    assert index.search("stock")[0]["url"] == "https://a.example"
+
+
+def test_an_empty_index_finds_nothing():
+    index = SnippetIndex([])
+    assert len(index) == 0
+    assert index.search("solar") == []
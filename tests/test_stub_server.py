@@ -0,0 +1,41 @@
+from benchmarks.stub_server import StubModel, StubProfile
+
+
+def reviewer_request(prompt: str):
+    return {'messages': [{'role': 'system', 'content': "You are a meticulous editor."},
+                         {'role': 'user', 'content': prompt}]}
+
+
+def test_full_review_echoes_the_draft():
+    model = StubModel(StubProfile())
+    text, tool_call = model.respond(reviewer_request("# Draft\n\nFirst paragraph."))
+
+    assert text == "# Draft\n\nFirst paragraph."
+    assert tool_call is None
+
+
+def test_chunk_review_returns_only_the_chunk():
+    # The prompt layout of ReviewerAgent.polish_chunk
+    prompt = "\n\n".join([
+        "This is one part of a blog post titled 'Solar'.",
+        "For context only, the preceding part ends with:\n<<<\nEarlier text.\n>>>",
+        "For context only, the following part starts with:\n<<<\nLater text.\n>>>",
+        "Polish only the text below. Do not repeat or rewrite the context, "
+        "and keep the markdown structure.\n\n## Section 2\n\nChunk text.\n\nMore chunk text.",
+    ])
+    text, _ = StubModel(StubProfile()).respond(reviewer_request(prompt))
+
+    assert text == "## Section 2\n\nChunk text.\n\nMore chunk text."
+
+
+def test_transition_returns_only_the_second_paragraph():
+    # The prompt layout of ReviewerAgent.smooth_transition
+    prompt = (
+        "In a blog post titled 'Solar', this paragraph:\n<<<\nThe end of part one.\n>>>\n\n"
+        "is followed by this paragraph:\n<<<\nThe start of part two.\n>>>\n\n"
+        "Rewrite only the second paragraph so that it follows on naturally from the first. "
+        "Change as little as possible and respond with the rewritten second paragraph only."
+    )
+    text, _ = StubModel(StubProfile()).respond(reviewer_request(prompt))
+
+    assert text == "The start of part two."
@@ -0,0 +1,86 @@
+import os
+import time
+
+import pytest
+
+from topic_index import TopicIndex, normalize_topic, words_conflict
+
+
+@pytest.fixture
+def index(tmp_path):
+    return TopicIndex(os.path.join(tmp_path, "topics.sqlite3"))
+
+
+def test_normalize_topic_drops_case_punctuation_and_stopwords():
+    assert normalize_topic("The Future of Finance!") == normalize_topic("future of finance")
+
+
+@pytest.mark.parametrize("first, second", [
+    ("future finance", "future finance 2026"),
+    ("future finance", "future finances"),
+    ("finance future", "future finance"),
+])
+def test_added_qualifiers_do_not_conflict(first, second):
+    assert not words_conflict(first, second)
+
+
+@pytest.mark.parametrize("first, second", [
+    ("benefits remote work employees", "benefits remote work employers"),
+    ("climate change impacts agriculture", "climate change impacts aquaculture"),
+    ("iphone 14 review", "iphone 15 review"),
+    ("future finance 2025", "future finance 2026"),
+])
+def test_swapped_words_conflict(first, second):
+    assert words_conflict(first, second)
+
+
+@pytest.mark.parametrize("topic", [
+    "The future of finance in 2026",
+    "future of finances",
+    "The Future of Finance!",
+])
+def test_find_matches_variations_of_a_stored_topic(index, topic):
+    index.add("Future of finance", ["Intro", "Outlook"], [{'url': "https://example.com"}])
+
+    match = index.find(topic)
+
+    assert match is not None
+    assert match['topic'] == "Future of finance"
+    assert match['outline'] == ["Intro", "Outlook"]
+    assert match['research'] == [{'url': "https://example.com"}]
+    assert match['similarity'] >= index.threshold
+
+
+@pytest.mark.parametrize("stored, topic", [
+    ("Benefits of remote work for employees", "Benefits of remote work for employers"),
+    ("Climate change impacts on agriculture", "Climate change impacts on aquaculture"),
+    ("iPhone 14 review", "iPhone 15 review"),
+    ("Future of finance", "Quantum computing basics"),
+])
+def test_find_rejects_different_topics(index, stored, topic):
+    index.add(stored, ["Intro"])
+
+    assert index.find(topic) is None
+
+
+def test_find_ignores_expired_topics(tmp_path):
+    index = TopicIndex(os.path.join(tmp_path, "topics.sqlite3"), max_age_seconds=0.01)
+    index.add("Future of finance", ["Intro"])
+    time.sleep(0.05)
+
+    assert index.find("Future of finance") is None
+
+
+def test_add_replaces_the_outline_of_the_same_topic(index):
+    index.add("Future of finance", ["Old"])
+    index.add("The future of finance", ["New"])
+
+    assert len(index) == 1
+    assert index.find("Future of finance")['outline'] == ["New"]
+
+
+def test_other_instances_see_added_topics(index):
+    other = TopicIndex(index.path, refresh_seconds=0)
+    index.add("Future of finance", ["Intro"])
+
+    assert other.find("future of finance")['outline'] == ["Intro"]
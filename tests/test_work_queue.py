@@ -0,0 +1,78 @@
+import pytest
+
+import work_queue
+from work_queue import DONE, FAILED, LEASED, QUEUED, WorkQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(work_queue.time, "time", lambda: now[0])
+    return now
+
+
+def test_jobs_are_leased_oldest_first_and_once(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    first = queue.enqueue("Future of finance")
+    queue.enqueue("Solar power")
+
+    job = queue.lease("worker-a")
+    assert (job["id"], job["status"], job["worker"], job["attempts"]) == (first, LEASED, "worker-a", 1)
+    assert queue.lease("worker-b")["topic"] == "Solar power"
+    assert queue.lease("worker-c") is None
+
+    queue.complete(first, "worker-a", "outputs/finance.md")
+    assert queue.stats() == {QUEUED: 0, LEASED: 1, DONE: 1, FAILED: 0}
+
+
+def test_an_expired_lease_is_taken_over(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=60)
+    job_id = queue.enqueue("Future of finance")
+    queue.lease("worker-a")
+
+    clock[0] += 30
+    assert queue.heartbeat(job_id, "worker-a")
+    clock[0] += 59
+    assert queue.lease("worker-b") is None
+
+    clock[0] += 2
+    job = queue.lease("worker-b")
+    assert (job["id"], job["worker"], job["attempts"]) == (job_id, "worker-b", 2)
+    # The first worker lost the lease and can no longer finish the job
+    assert not queue.heartbeat(job_id, "worker-a")
+    queue.complete(job_id, "worker-a")
+    assert queue.stats()[LEASED] == 1
+
+
+def test_a_job_whose_workers_keep_dying_is_abandoned(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=60, max_attempts=2)
+    queue.enqueue("Future of finance")
+
+    assert queue.lease("worker-a")["attempts"] == 1
+    clock[0] += 61
+    assert queue.lease("worker-b")["attempts"] == 2
+    clock[0] += 61
+    assert queue.lease("worker-c") is None
+    assert queue.stats() == {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 1}
+
+
+def test_failed_attempts_are_retried_up_to_max_attempts(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    job_id = queue.enqueue("Future of finance")
+
+    queue.lease("worker-a")
+    queue.fail(job_id, "worker-a", "model server down")
+    assert queue.stats()[QUEUED] == 1
+
+    queue.lease("worker-a")
+    queue.fail(job_id, "worker-a", "model server down")
+    assert queue.stats()[FAILED] == 1
+    assert queue.lease("worker-a") is None
+
+
+def test_a_fatal_failure_is_not_retried(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    job_id = queue.enqueue("Future of finance")
+    queue.lease("worker-a")
+    queue.fail(job_id, "worker-a", "invalid topic", retry=False)
+    assert queue.stats()[FAILED] == 1
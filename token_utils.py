@@ -0,0 +1,74 @@
+import re
+
+# Runs of letters/digits, single CJK characters, or single punctuation marks
+_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+|[぀-ヿ㐀-鿿가-힯]|[^\sA-Za-z0-9]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates how many tokens a text uses, without loading a real tokenizer.
+
+    Words are split into roughly four-character pieces, which is close to how
+    BPE tokenizers treat English, and every CJK character or punctuation mark
+    counts as one token. The estimate is meant for budgeting and reporting,
+    not for billing.
+    """
+    if not text:
+        return 0
+
+    count = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        count += (len(piece) + 3) // 4 if piece[0].isascii() and piece[0].isalnum() else 1
+    return count
+
+
+def estimate_message_tokens(messages: list) -> int:
+    """
+    Estimates the tokens of a chat message list, including a small per-message overhead.
+    """
+    total = 0
+    for message in messages:
+        content = message.get('content') or ''
+        if isinstance(content, list):
+            content = ''.join(item.get('text', '') for item in content if isinstance(item, dict))
+        function_call = message.get('function_call')
+        if function_call:
+            content += str(function_call.get('name', '')) + str(function_call.get('arguments', ''))
+        total += estimate_tokens(content) + 4
+    return total
+
+
+def plan_chunks(sections: list, token_budget: int):
+    """
+    Groups consecutive sections into chunks of at most `token_budget` estimated
+    tokens. A section larger than the budget gets a chunk of its own.
+
+    Returns:
+        list: The chunks, each a list of sections, in article order.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for section in sections:
+        section_tokens = estimate_tokens(section)
+        if current and current_tokens + section_tokens > token_budget:
+            chunks.append(current)
+            current = []
+            current_tokens = 0
+        current.append(section)
+        current_tokens += section_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def text_edge(text: str, token_budget: int, from_end: bool):
+    """
+    Returns roughly `token_budget` tokens worth of whole words from the start or end of a text.
+    """
+    words = text.split()
+    # English averages about 0.75 words per token
+    word_count = max(1, int(token_budget * 0.75))
+    if len(words) <= word_count:
+        return text.strip()
+    return ("... " + " ".join(words[-word_count:])) if from_end else (" ".join(words[:word_count]) + " ...")
@@ -0,0 +1,87 @@
+import re
+import math
+from collections import Counter
+
+from token_utils import estimate_tokens
+from tools.snippet_index import tokenize
+
+# A sentence ends at ., ! or ? followed by whitespace and something that can start a sentence
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+
+
+def split_sentences(text: str):
+    """
+    Splits a snippet into sentences. Good enough for extractive selection; it
+    does not try to handle every abbreviation.
+    """
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text or "") if sentence.strip()]
+
+
+def _overhead_tokens(result: dict):
+    # The title and URL lines that come with every result, see TavilySearchTool.format_results
+    return estimate_tokens(f"Title: {result.get('title')}\nURL: {result.get('url')}\nSnippet: \n---")
+
+
+def compress_results(results: list, query: str, token_budget: int):
+    """
+    Shrinks search results to about `token_budget` estimated tokens by keeping
+    only the snippet sentences most relevant to the query.
+
+    Sentences are scored by the IDF-weighted query terms they contain, so rare
+    topic words count more than common ones, and picked best first while they
+    fit. Sentences matching nothing only fill room left in results that were
+    already chosen, earliest first, and a sentence chosen once is not repeated. Each
+    result keeps its title and URL and its chosen sentences in their original
+    order; a result with no sentence chosen is dropped. The best sentence is
+    always kept, even if it alone exceeds the budget.
+
+    Args:
+        results (list): Tavily result dicts with 'title', 'url' and 'content'.
+        query (str): What the context is for, e.g. the section topic.
+        token_budget (int): The target size; 0 or less disables compression.
+
+    Returns:
+        list: New result dicts, or `results` itself if they already fit.
+    """
+    if token_budget <= 0 or not results:
+        return results
+    if sum(_overhead_tokens(r) + estimate_tokens(r.get('content') or '') for r in results) <= token_budget:
+        return results
+
+    sentences = []
+    for result_position, result in enumerate(results):
+        for sentence_position, sentence in enumerate(split_sentences(result.get('content') or '')):
+            sentences.append((result_position, sentence_position, sentence, set(tokenize(sentence))))
+
+    document_frequency = Counter(term for *_, terms in sentences for term in terms)
+    idf = {term: math.log(1 + len(sentences) / frequency) for term, frequency in document_frequency.items()}
+    query_terms = set(tokenize(query))
+
+    def rank(item):
+        result_position, sentence_position, _, terms = item
+        score = sum(idf[term] for term in query_terms & terms)
+        return (-score, sentence_position, result_position)
+
+    chosen = {}
+    seen = set()
+    used = 0
+    for item in sorted(sentences, key=rank):
+        result_position, sentence_position, sentence, _ = item
+        relevant = rank(item)[0] < 0
+        if sentence.lower() in seen or (chosen and not relevant and result_position not in chosen):
+            continue
+        cost = estimate_tokens(sentence) + 1
+        if result_position not in chosen:
+            cost += _overhead_tokens(results[result_position])
+        if chosen and used + cost > token_budget:
+            continue
+        chosen.setdefault(result_position, []).append((sentence_position, sentence))
+        seen.add(sentence.lower())
+        used += cost
+
+    compressed = []
+    for result_position, result in enumerate(results):
+        if result_position in chosen:
+            content = " ".join(sentence for _, sentence in sorted(chosen[result_position]))
+            compressed.append({**result, 'content': content})
+    return compressed
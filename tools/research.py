@@ -0,0 +1,72 @@
+import re
+
+import metrics
+
+from tools.snippet_index import SnippetIndex
+
+# Outline items often carry labels like "Section 2:" or "I." that only add noise to a search
+SECTION_LABEL_PATTERN = re.compile(r"^\s*(?:(?:section|part|chapter)\s*\d+|[ivx]+|\d+)\s*[:.)-]\s*", re.IGNORECASE)
+
+def build_search_query(section_topic: str, template: str = "{topic}"):
+    """
+    Derives a search query from an outline item, without asking the LLM.
+
+    Args:
+        section_topic (str): The outline item, e.g. "Section 2: Enhanced Code Quality".
+        template (str): A query-expansion template containing "{topic}",
+            e.g. "{topic} latest statistics and examples".
+
+    Returns:
+        str: The search query.
+    """
+    topic = SECTION_LABEL_PATTERN.sub("", section_topic).strip() or section_topic.strip()
+    return template.format(topic=topic)
+
+def prefetch_research(topic: str, outline: list, executor, search_pool,
+                      query_template: str = "{topic}", max_results: int = 5):
+    """
+    Researches a whole article up front: one search for the topic and one per
+    outline item, all issued concurrently. Results are de-duplicated by URL and
+    indexed, so each section can pick its best passages without searching again.
+
+    Args:
+        topic (str): The article topic.
+        outline (list): The outline items.
+        executor: The thread pool the searches run on.
+        search_pool (AgentPool): Lends out TavilySearchTool instances to the workers.
+        query_template (str): The query-expansion template, see `build_search_query`.
+        max_results (int): The number of results requested per query.
+
+    Returns:
+        SnippetIndex: The index over every unique result.
+    """
+    queries = []
+    for query in [topic] + [build_search_query(item, query_template) for item in outline]:
+        if query.lower() not in (q.lower() for q in queries):
+            queries.append(query)
+
+    def search(query):
+        with search_pool.acquire() as search_tool:
+            return search_tool.search(query, max_results=max_results)
+
+    futures = [(query, metrics.submit(executor, search, query)) for query in queries]
+
+    documents = {}
+    for query, future in futures:
+        try:
+            response = future.result()
+        except Exception as e:
+            # One failed query only costs us its results, not the research stage
+            print(f"Error: Research query '{query}' failed. Error: {e}")
+            continue
+        for result in response.get('results', []):
+            url = result.get('url')
+            if not url:
+                continue
+            # The same page can come back with different snippets; keep the longest
+            known = documents.get(url)
+            if known is None or len(result.get('content') or '') > len(known.get('content') or ''):
+                documents[url] = result
+
+    print(f"Research: {len(queries)} queries returned {len(documents)} unique results.")
+    return SnippetIndex(list(documents.values()))
@@ -0,0 +1,114 @@
+import json
+import time
+import hashlib
+
+from storage import sqlite_connection, init_wal_db
+
+
+class SearchCache:
+    """
+    A persistent, TTL-based cache for search results, stored in SQLite.
+
+    Entries are keyed on the normalized query plus the search parameters.
+    When the cache grows past `max_entries`, the least recently used entries
+    are evicted. Every operation opens its own short-lived connection and the
+    database runs in WAL mode, so several threads or processes can share the
+    same cache file.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_entries: int = 10000):
+        """
+        Args:
+            path (str): The location of the SQLite database file.
+            ttl_seconds (float): How long an entry stays valid after it was stored.
+            max_entries (int): The maximum number of entries kept on disk.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        init_wal_db(path)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO stats (name, value) VALUES ('hits', 0), ('misses', 0)")
+
+    def _connect(self):
+        return sqlite_connection(self.path)
+
+    @staticmethod
+    def make_key(query: str, **params):
+        """
+        Builds a cache key from a query and its search parameters.
+        Queries that only differ in case or whitespace share the same key.
+        """
+        normalized_query = " ".join(query.lower().split())
+        payload = json.dumps({"query": normalized_query, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Returns the cached value for `key`, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'misses'")
+                return None
+
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'hits'")
+        return json.loads(row[0])
+
+    def set(self, key: str, value):
+        """
+        Stores a JSON-serializable value and evicts expired and least recently used entries.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str):
+        """
+        Removes a single entry, if present.
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def stats(self):
+        """
+        Returns the hit and miss counters shared by every user of this cache file,
+        along with the current number of entries.
+        """
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            counters["entries"] = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return counters
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters.
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("UPDATE stats SET value = 0")
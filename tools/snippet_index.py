@@ -0,0 +1,72 @@
+import re
+import math
+from collections import Counter
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Common words that only add noise to lexical matching
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in into is it its of on or that the "
+    "their this to was were what when where which who why will with your you".split()
+)
+
+
+def tokenize(text: str):
+    """
+    Lower-cases a text and splits it into words, dropping stopwords.
+    """
+    return [word for word in _WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+
+class SnippetIndex:
+    """
+    An in-memory BM25 index over search results.
+
+    Each document is a Tavily result dict with 'title', 'url' and 'content'.
+    The title is indexed together with the content so short snippets still
+    match on their headline.
+    """
+
+    def __init__(self, documents: list, k1: float = 1.5, b: float = 0.75):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+
+        self._term_counts = []
+        self._lengths = []
+        document_frequency = Counter()
+        for document in documents:
+            terms = Counter(tokenize(f"{document.get('title', '')} {document.get('content', '')}"))
+            self._term_counts.append(terms)
+            self._lengths.append(sum(terms.values()))
+            document_frequency.update(terms.keys())
+
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0
+        total = len(documents)
+        self._idf = {
+            term: math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def __len__(self):
+        return len(self.documents)
+
+    def score(self, query_terms: list, position: int):
+        terms = self._term_counts[position]
+        length_norm = 1 - self.b + self.b * (self._lengths[position] / (self._average_length or 1))
+        score = 0.0
+        for term in query_terms:
+            frequency = terms.get(term)
+            if frequency:
+                score += self._idf[term] * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+        return score
+
+    def search(self, query: str, k: int = 4):
+        """
+        Returns the `k` documents that best match the query, best first.
+        Documents that share no terms with the query are left out.
+        """
+        query_terms = set(tokenize(query))
+        scored = [(self.score(query_terms, position), position) for position in range(len(self.documents))]
+        ranked = sorted((item for item in scored if item[0] > 0), key=lambda item: (-item[0], item[1]))
+        return [self.documents[position] for _, position in ranked[:k]]
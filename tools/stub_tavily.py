@@ -0,0 +1,45 @@
+import time
+import hashlib
+
+
+class StubTavilyClient:
+    """
+    A stand-in for TavilyClient that answers every search locally.
+
+    Results are derived from the query alone, so repeated runs see exactly the
+    same research, and each search waits `latency` seconds to mimic the real
+    API. Selected with TAVILY_BACKEND=stub; used by the offline benchmarks.
+    """
+
+    def __init__(self, latency: float = 0.5, snippet_words: int = 60):
+        """
+        Args:
+            latency (float): Seconds each search takes.
+            snippet_words (int): The length of each result's content.
+        """
+        self.latency = latency
+        self.snippet_words = snippet_words
+        self.searches = 0
+
+    def search(self, query: str, search_depth: str = "basic", max_results: int = 5, **kwargs):
+        """
+        Returns a response shaped like Tavily's: a dict with a 'results' list.
+        """
+        self.searches += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        words = query.split() or ["topic"]
+        results = []
+        for rank in range(max_results):
+            digest = hashlib.sha256(f"{query}|{rank}".encode("utf-8")).hexdigest()[:12]
+            # Cycle through the query words so the snippets stay relevant to the query
+            content = " ".join(words[i % len(words)] if i % 3 == 0 else f"finding{(i + rank) % 17}"
+                               for i in range(self.snippet_words))
+            results.append({
+                'title': f"{query} ({rank + 1})",
+                'url': f"https://example.com/{digest}",
+                'content': f"Result {rank + 1} about {query}: {content}.",
+                'score': round(1.0 - rank * 0.1, 2),
+            })
+        return {'query': query, 'results': results}
@@ -1,7 +1,19 @@
-import os
 import json
-from tavily import TavilyClient
+import time
 from qwen_agent.tools.base import BaseTool, register_tool
+from tools.search_cache import SearchCache
+from config import get_search_cache_config, get_settings
+import metrics
+from ratelimit import get_upstream
+from hedging import get_hedger
+from token_utils import estimate_tokens
+from tools.context_budget import compress_results
+
+# What the model sees when a search fails, e.g. while the Tavily circuit breaker is open
+SEARCH_FAILED_MESSAGE = (
+    "The search failed and returned no sources. Do not invent sources or links; "
+    "write only what you can state confidently without them."
+)
 
 @register_tool('tavily_search')
 class TavilySearchTool(BaseTool):
@@ -22,10 +34,114 @@ class TavilySearchTool(BaseTool):
         'required': True
     }]
 
+    # Search settings, also part of the cache key
+    search_depth = "basic"
+    max_results = 3
+
     def __init__(self, cfg: dict = {}):
+        """
+        Args:
+            cfg (dict): The qwen-agent tool config. 'hedge' (bool) duplicates slow
+                searches, see hedging.Hedger; it defaults to HEDGE_ENABLED.
+                'context_budget' (int) caps the estimated tokens of the results handed
+                to the model, see `build_context`; it defaults to 0, no limit.
+        """
         super().__init__(cfg)
-        # Initialize the Tavily client with the API key from environment variables
-        self.client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+        settings = get_settings()
+        hedge = (cfg or {}).get('hedge')
+        self.hedge = settings.hedge_enabled if hedge is None else hedge
+        self.context_budget = (cfg or {}).get('context_budget') or 0
+        if settings.tavily_backend == "stub":
+            # Offline, deterministic results for benchmarks (TAVILY_BACKEND=stub)
+            from tools.stub_tavily import StubTavilyClient
+            self.client = StubTavilyClient(latency=settings.tavily_stub_latency)
+        else:
+            # Imported here so the Tavily SDK is only loaded once a search tool is needed
+            from tavily import TavilyClient
+
+            # Initialize the Tavily client with the API key from environment variables
+            self.client = TavilyClient(api_key=settings.tavily_api_key or None)
+
+        # Repeated queries are answered from the on-disk cache when it is enabled
+        cache_config = get_search_cache_config()
+        self.cache = SearchCache(**cache_config) if cache_config else None
+
+    def search(self, query: str, max_results: int = None):
+        """
+        Runs a Tavily search, serving repeated queries from the cache.
+
+        Args:
+            query (str): The search query.
+            max_results (int): Overrides the default number of results.
+
+        Returns:
+            dict: The raw Tavily response.
+        """
+        params = {'search_depth': self.search_depth, 'max_results': max_results or self.max_results}
+        start = time.perf_counter()
+        cached = False
+        def fetch(cancelled=None, is_hedge=False):
+            # Live searches share the Tavily rate limit, retries and circuit breaker
+            return get_upstream("tavily").call(self.client.search, query=query, **params)
+
+        def live_search():
+            return get_hedger("search").call(fetch) if self.hedge else fetch()
+
+        try:
+            if self.cache is None:
+                response = live_search()
+            else:
+                key = SearchCache.make_key(query, **params)
+                response = self.cache.get(key)
+                cached = response is not None
+                if not cached:
+                    response = live_search()
+                    self.cache.set(key, response)
+        except Exception as e:
+            metrics.record_tool_call(self.name, time.perf_counter() - start, cached=False, detail=query, error=e)
+            raise
+        metrics.record_tool_call(self.name, time.perf_counter() - start, cached=cached, detail=query)
+        return response
+
+    @staticmethod
+    def format_results(results: list) -> str:
+        """
+        Formats search results into a clean string for the LLM.
+        """
+        formatted_results = []
+        for result in results:
+            formatted_results.append(
+                f"Title: {result.get('title')}\n"
+                f"URL: {result.get('url')}\n"
+                f"Snippet: {result.get('content')}\n"
+                "---"
+            )
+
+        if not formatted_results:
+            return "No search results found."
+
+        return "\n".join(formatted_results)
+
+    def build_context(self, results: list, query: str, agent_name: str = "writer") -> str:
+        """
+        Formats search results for a prompt. Results larger than the context budget
+        are compressed to the sentences most relevant to `query`, and the tokens
+        saved are reported.
+        """
+        formatted = self.format_results(results)
+        if not self.context_budget:
+            return formatted
+
+        compressed = compress_results(results, query, self.context_budget)
+        if compressed is results:
+            return formatted
+        original_tokens = estimate_tokens(formatted)
+        formatted = self.format_results(compressed)
+        sent_tokens = estimate_tokens(formatted)
+        print(f"Context: Compressed the search results for '{query}' from {original_tokens} to "
+              f"{sent_tokens} estimated tokens ({original_tokens - sent_tokens} saved).")
+        metrics.record_context_compression(agent_name, original_tokens, sent_tokens, detail=query)
+        return formatted
 
     def call(self, params: str, **kwargs) -> str:
         """
@@ -39,22 +155,14 @@ class TavilySearchTool(BaseTool):
                 return 'Error: The search query cannot be empty.'
 
             # Perform the search
-            response = self.client.search(query=query, search_depth="basic", max_results=3)
-
-            # Format the results into a clean string for the LLM
-            formatted_results = []
-            for result in response.get('results', []):
-                formatted_results.append(
-                    f"Title: {result.get('title')}\n"
-                    f"URL: {result.get('url')}\n"
-                    f"Snippet: {result.get('content')}\n"
-                    "---"
-                )
-            
-            if not formatted_results:
-                return "No search results found."
-
-            return "\n".join(formatted_results)
+            response = self.search(query)
+
+            # Format the results into a clean string for the LLM, within its budget
+            return self.build_context(response.get('results', []), query)
 
         except Exception as e:
-            return f"An error occurred during the search: {str(e)}"
+            # The failure is already in the run trace (see `search`). The model is told
+            # plainly that it has no sources, without error details it could paraphrase
+            # into the article.
+            print(f"Error: Tavily search failed. Error: {e}")
+            return SEARCH_FAILED_MESSAGE
@@ -0,0 +1,227 @@
+import re
+import json
+import time
+import array
+import hashlib
+import threading
+from functools import lru_cache
+
+from storage import sqlite_connection, init_wal_db
+from tools.snippet_index import STOPWORDS
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_topic(topic: str):
+    """
+    Lower-cases a topic and drops punctuation and stopwords, so "The Future of
+    Finance!" and "future of finance" compare as equal.
+    """
+    return " ".join(word for word in _WORD_PATTERN.findall(topic.lower()) if word not in STOPWORDS)
+
+
+def shingles(text: str, size: int = 3):
+    """
+    Returns the set of overlapping `size`-character pieces of a text. Character
+    shingles also match topics that differ in inflection, e.g. "trend" and "trends".
+    """
+    padded = f" {text} "
+    return {padded[i:i + size] for i in range(max(1, len(padded) - size + 1))}
+
+
+@lru_cache(maxsize=65536)
+def _shingle_hashes(shingle: str, num_perm: int):
+    # One extendable-output digest gives `num_perm` independent 32-bit hashes at
+    # once. Few distinct shingles occur in topics, so they are computed once each.
+    return array.array("I", hashlib.shake_128(shingle.encode("utf-8")).digest(4 * num_perm))
+
+
+def content_words(normalized: str):
+    """
+    Returns the set of words of a normalized topic, with a plural "s" dropped so
+    "trend" and "trends" count as the same word.
+    """
+    return {word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+            for word in normalized.split()}
+
+
+def words_conflict(first: str, second: str):
+    """
+    Whether two normalized topics ask for different articles even though their
+    shingles are alike: each has a word the other lacks, i.e. a word or number
+    was swapped rather than added, e.g. "remote work employees" and "remote
+    work employers", or "iphone 14" and "iphone 15". A topic that only adds
+    qualifiers to the other, e.g. "future finance" and "future finance 2026",
+    does not conflict; the similarity threshold decides how much may be added.
+    """
+    first_words = content_words(first)
+    second_words = content_words(second)
+    return not (first_words <= second_words or second_words <= first_words)
+
+
+def jaccard(first: set, second: set):
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+class TopicIndex:
+    """
+    Finds earlier articles on nearly the same topic, so their outline and
+    research can be reused instead of generated again.
+
+    Topics are compared by the Jaccard similarity of their character shingles,
+    and never match if they name different numbers or a word was swapped (see
+    `words_conflict`), so only rewordings of a topic, or the topic with a few
+    qualifiers added, are reused. Stored topics older than
+    `max_age_seconds` are not reused, since their research goes stale.
+    To avoid comparing a new topic with every stored one, each topic gets a
+    MinHash signature, split into bands that are hashed into buckets
+    (locality-sensitive hashing): only topics sharing a bucket with the new one
+    are compared. A lookup costs a signature and a few dictionary probes, well
+    under a millisecond even with tens of thousands of topics.
+
+    Topics, outlines and research are stored in SQLite; the buckets are kept in
+    memory and pick up rows added by other processes at most `refresh_seconds` later.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.7, max_age_seconds: float = 86400, num_perm: int = 64,
+                 bands: int = 16, refresh_seconds: float = 1.0):
+        """
+        Args:
+            path (str): The location of the SQLite database file.
+            threshold (float): The smallest shingle Jaccard similarity (0-1) that counts as the same topic.
+            max_age_seconds (float): How long a stored outline and its research may be reused;
+                None keeps them forever.
+            num_perm (int): The length of the MinHash signatures.
+            bands (int): The number of LSH bands; `num_perm` must be a multiple of it.
+                More bands find less similar candidates, at the cost of more comparisons.
+            refresh_seconds (float): How often lookups check the database for new topics.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.path = path
+        self.threshold = threshold
+        self.max_age_seconds = max_age_seconds
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.refresh_seconds = refresh_seconds
+
+        self._buckets = [{} for _ in range(bands)]
+        self._entries = {}
+        self._last_id = 0
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+        init_wal_db(path)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS topics ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " normalized TEXT NOT NULL UNIQUE,"
+                " topic TEXT NOT NULL,"
+                " signature TEXT NOT NULL,"
+                " outline TEXT NOT NULL,"
+                " research TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite_connection(self.path)
+
+    def signature(self, normalized: str):
+        """
+        Returns the MinHash signature of a normalized topic: for each of the
+        `num_perm` hash functions, the smallest hash of any of its shingles.
+        """
+        hashes = [_shingle_hashes(shingle, self.num_perm) for shingle in shingles(normalized)]
+        return list(map(min, zip(*hashes)))
+
+    def _band_keys(self, signature: list):
+        return [hash(tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def _refresh(self):
+        """
+        Adds topics stored since the last refresh, e.g. by another worker process, to the buckets.
+        """
+        now = time.monotonic()
+        if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+            return
+        self._refreshed_at = now
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, normalized, signature FROM topics WHERE id > ? ORDER BY id",
+                                (self._last_id,)).fetchall()
+        for entry_id, normalized, signature in rows:
+            self._entries[entry_id] = normalized
+            for band, key in enumerate(self._band_keys(json.loads(signature))):
+                self._buckets[band].setdefault(key, []).append(entry_id)
+            self._last_id = entry_id
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def find(self, topic: str):
+        """
+        Looks for a stored topic similar to `topic`.
+
+        Returns:
+            dict: The most similar stored topic at or above the threshold, with its
+                'topic', 'similarity', 'outline' and 'research' (a list of search
+                results, or None), or None if there is none or it has expired.
+        """
+        normalized = normalize_topic(topic)
+        if not normalized:
+            return None
+        with self._lock:
+            self._refresh()
+            candidates = set()
+            for band, key in enumerate(self._band_keys(self.signature(normalized))):
+                candidates.update(self._buckets[band].get(key, ()))
+
+            target = shingles(normalized)
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                if words_conflict(normalized, self._entries[entry_id]):
+                    continue
+                similarity = jaccard(target, shingles(self._entries[entry_id]))
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+        if best_id is None or best_similarity < self.threshold:
+            return None
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT topic, outline, research, updated_at FROM topics WHERE id = ?",
+                               (best_id,)).fetchone()
+        if row is None:
+            return None
+        if self.max_age_seconds is not None and time.time() - row[3] > self.max_age_seconds:
+            return None
+        return {
+            'topic': row[0],
+            'similarity': round(best_similarity, 3),
+            'outline': json.loads(row[1]),
+            'research': json.loads(row[2]) if row[2] else None,
+        }
+
+    def add(self, topic: str, outline: list, research: list = None):
+        """
+        Stores a topic's outline and, if it was prefetched, its research. A topic
+        that normalizes to a stored one replaces its outline and research.
+        """
+        normalized = normalize_topic(topic)
+        if not normalized or not outline:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO topics (normalized, topic, signature, outline, research, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(normalized) DO UPDATE SET topic = excluded.topic, outline = excluded.outline,"
+                " research = excluded.research, updated_at = excluded.updated_at",
+                (normalized, topic, json.dumps(self.signature(normalized)), json.dumps(outline, ensure_ascii=False),
+                 json.dumps(research, ensure_ascii=False) if research is not None else None, time.time()),
+            )
+        # The next lookup sees the new topic right away
+        self._refreshed_at = None
@@ -0,0 +1,264 @@
+import os
+import time
+import socket
+import sqlite3
+import threading
+
+import events
+from storage import sqlite_connection, init_wal_db
+
+# Job states
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class WorkQueue:
+    """
+    A durable queue of article topics, stored in SQLite, shared by any number of
+    worker processes.
+
+    A worker leases a job for `lease_seconds` and must renew the lease with
+    `heartbeat` while it works. If the worker crashes or hangs, the lease runs
+    out and the job is handed to another worker, up to `max_attempts` times.
+    Every operation uses its own connection and the database runs in WAL mode,
+    so processes on one host (or hosts sharing a filesystem with working
+    locks) can use the same file. The small interface is meant to be easy to
+    back with a networked queue later.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 120, max_attempts: int = 3):
+        """
+        Args:
+            path (str): The location of the SQLite database file.
+            lease_seconds (float): How long a lease lasts without a heartbeat.
+            max_attempts (int): How often a job is started before it is marked failed.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+
+        init_wal_db(path)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " topic TEXT NOT NULL,"
+                " bypass_cache INTEGER NOT NULL DEFAULT 0,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " worker TEXT,"
+                " lease_expires_at REAL,"
+                " enqueued_at REAL NOT NULL,"
+                " started_at REAL,"
+                " finished_at REAL,"
+                " output_path TEXT,"
+                " error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)")
+
+    def _connect(self):
+        return sqlite_connection(self.path, row_factory=sqlite3.Row)
+
+    def enqueue(self, topic: str, bypass_cache: bool = False):
+        """
+        Adds a topic to the queue.
+
+        Returns:
+            int: The job's id.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (topic, bypass_cache, status, enqueued_at) VALUES (?, ?, ?, ?)",
+                (topic, int(bypass_cache), QUEUED, time.time()),
+            )
+            return cursor.lastrowid
+
+    def lease(self, worker: str):
+        """
+        Claims the oldest available job: a queued one, or one whose lease expired.
+
+        Returns:
+            dict: The job's row, or None if there is nothing to do.
+        """
+        while True:
+            now = time.time()
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? OR (status = ? AND lease_expires_at < ?)"
+                    " ORDER BY id LIMIT 1",
+                    (QUEUED, LEASED, now),
+                ).fetchone()
+                if row is None:
+                    return None
+
+                if row["attempts"] >= self.max_attempts:
+                    # Its last worker died too; give up instead of crashing workers forever
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ? AND status = ?",
+                        (FAILED, now, f"Abandoned after {row['attempts']} attempts.", row["id"], row["status"]),
+                    )
+                    continue
+
+                # The status check makes the claim atomic: if another worker got
+                # there first, nothing is updated and we look again.
+                claimed = conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1,"
+                    " lease_expires_at = ?, started_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                    (LEASED, worker, now + self.lease_seconds, now, row["id"], row["status"], row["attempts"]),
+                ).rowcount
+            if claimed:
+                job = dict(row)
+                job.update(status=LEASED, worker=worker, attempts=row["attempts"] + 1)
+                return job
+
+    def heartbeat(self, job_id: int, worker: str):
+        """
+        Extends a lease.
+
+        Returns:
+            bool: False if the worker no longer holds the lease, e.g. because it
+                expired and another worker took the job over.
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, worker, LEASED),
+            ).rowcount == 1
+
+    def complete(self, job_id: int, worker: str, output_path: str = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, output_path = ?, error = NULL"
+                " WHERE id = ? AND worker = ? AND status = ?",
+                (DONE, time.time(), output_path, job_id, worker, LEASED),
+            )
+
+    def fail(self, job_id: int, worker: str, error: str, retry: bool = True):
+        """
+        Records a failed attempt. The job goes back into the queue while it has
+        attempts left and `retry` is set.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN ? AND attempts < ? THEN ? ELSE ? END,"
+                " finished_at = ?, error = ?, worker = NULL, lease_expires_at = NULL"
+                " WHERE id = ? AND worker = ? AND status = ?",
+                (int(retry), self.max_attempts, QUEUED, FAILED, time.time(), error, job_id, worker, LEASED),
+            )
+
+    def stats(self):
+        """
+        Returns the number of jobs in each state.
+        """
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self._connect() as conn:
+            for row in conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status"):
+                counts[row["status"]] = row["count"]
+        return counts
+
+
+def default_worker_id(index: int = 0):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+class QueueWorker:
+    """
+    Takes jobs from a WorkQueue and produces their articles with one ContentTeam,
+    heartbeating while each article is written.
+    """
+
+    def __init__(self, work_queue: WorkQueue, team, worker_id: str = None, poll_seconds: float = 2.0):
+        """
+        Args:
+            work_queue (WorkQueue): Where jobs come from.
+            team (ContentTeam): The team that writes the articles.
+            worker_id (str): A name unique across all workers. Defaults to host:pid:0.
+            poll_seconds (float): How long to wait before looking again when the queue is empty.
+        """
+        self.queue = work_queue
+        self.team = team
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_seconds = poll_seconds
+        # Renewing three times per lease tolerates a missed heartbeat or two
+        self.heartbeat_seconds = max(1.0, work_queue.lease_seconds / 3)
+
+    def run(self, drain: bool = False):
+        """
+        Processes jobs until interrupted, or until the queue is empty if `drain` is set.
+
+        Returns:
+            int: The number of jobs this worker handled.
+        """
+        print(f"Worker {self.worker_id}: waiting for jobs in {self.queue.path}")
+        handled = 0
+        while True:
+            job = self.queue.lease(self.worker_id)
+            if job is None:
+                if drain:
+                    print(f"Worker {self.worker_id}: the queue is empty, stopping after {handled} jobs.")
+                    return handled
+                time.sleep(self.poll_seconds)
+                continue
+            self.process(job)
+            handled += 1
+
+    def process(self, job: dict):
+        """
+        Produces the article for one leased job and records the outcome.
+        """
+        print(f"Worker {self.worker_id}: job {job['id']} (attempt {job['attempts']}): '{job['topic']}'")
+        outcome = {'output_path': None, 'halted': None}
+
+        def on_event(event):
+            if event.kind == events.SAVED:
+                # The markdown copy, or the article in the store if there is none
+                outcome['output_path'] = event.data["path"] or f"article {event.data['article_id']}"
+            elif event.kind == events.HALTED:
+                outcome['halted'] = event.data["message"]
+
+        # Heartbeat from a side thread; losing the lease stops the run, since
+        # another worker has already been given the job.
+        lost_lease = threading.Event()
+        finished = threading.Event()
+
+        def heartbeat():
+            while not finished.wait(self.heartbeat_seconds):
+                if not self.queue.heartbeat(job['id'], self.worker_id):
+                    print(f"Warning: Worker {self.worker_id} lost the lease on job {job['id']}; stopping it.")
+                    lost_lease.set()
+                    return
+
+        heartbeat_thread = threading.Thread(target=heartbeat, name=f"heartbeat-{job['id']}", daemon=True)
+        heartbeat_thread.start()
+        try:
+            self.team.run(job['topic'], bypass_cache=bool(job['bypass_cache']), on_event=on_event,
+                          cancel_event=lost_lease)
+        except Exception as e:
+            print(f"Error: Job {job['id']} failed. Error: {e}")
+            self.queue.fail(job['id'], self.worker_id, str(e))
+            return
+        finally:
+            finished.set()
+            heartbeat_thread.join()
+
+        if lost_lease.is_set():
+            return
+        if outcome['output_path']:
+            self.queue.complete(job['id'], self.worker_id, outcome['output_path'])
+            print(f"Worker {self.worker_id}: job {job['id']} done: {outcome['output_path']}")
+        else:
+            self.queue.fail(job['id'], self.worker_id, outcome['halted'] or "The article was not saved.")
+
+
+def run_worker_process(index: int, queue_config: dict, team_kwargs: dict, drain: bool):
+    """
+    The entry point of one worker process: builds its own ContentTeam and works the queue.
+    """
+    # Imported here so that importing this module does not load the pipeline
+    from main import ContentTeam
+
+    work_queue = WorkQueue(**queue_config)
+    team = ContentTeam(**team_kwargs)
+    return QueueWorker(work_queue, team, worker_id=default_worker_id(index)).run(drain=drain)